@@ -4,7 +4,10 @@ from .models import (
     ObjectTrend,
     SecurityAlert,
     AnalyticsInsight,
-    AIRecommendation
+    AIRecommendation,
+    AnalyticsJob,
+    UserAnomalyModel,
+    ObjectRiskRule
 )
 
 
@@ -120,3 +123,45 @@ class AIRecommendationAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         return qs.select_related('user')
+
+
+@admin.register(AnalyticsJob)
+class AnalyticsJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'detection', 'status', 'attempts', 'run_after', 
+                    'locked_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['detection__id', 'last_error']
+    readonly_fields = ['created_at', 'started_at', 'heartbeat_at', 'finished_at', 'stage_timings', 'last_error']
+    date_hierarchy = 'created_at'
+    
+    actions = ['retry_jobs']
+    
+    def retry_jobs(self, request, queryset):
+        from django.utils import timezone
+        # Une détection ne peut avoir qu'un job ouvert (contrainte d'unicité)
+        open_jobs = AnalyticsJob.objects.filter(status__in=('pending', 'running'))
+        retried = set()
+        for job in queryset.exclude(status__in=('pending', 'running')).exclude(
+                detection_id__in=open_jobs.values('detection_id')).order_by('-created_at'):
+            if job.detection_id not in retried:
+                AnalyticsJob.objects.filter(pk=job.pk).update(status='pending', attempts=0, run_after=timezone.now())
+                retried.add(job.detection_id)
+    retry_jobs.short_description = "Relancer les jobs"
+
+
+@admin.register(UserAnomalyModel)
+class UserAnomalyModelAdmin(admin.ModelAdmin):
+    list_display = ['user', 'engine', 'version', 'samples_trained', 
+                    'scored_since_training', 'trained_at', 'is_stale']
+    list_filter = ['engine']
+    search_fields = ['user__username']
+    exclude = ['model_data']
+    readonly_fields = ['version', 'samples_trained', 'scored_since_training', 'trained_at', 'updated_at', 'state']
+
+
+@admin.register(ObjectRiskRule)
+class ObjectRiskRuleAdmin(admin.ModelAdmin):
+    list_display = ['pattern', 'match_type', 'tier', 'is_active', 'updated_at']
+    list_filter = ['tier', 'match_type', 'is_active']
+    search_fields = ['pattern']
+    list_editable = ['tier', 'is_active']
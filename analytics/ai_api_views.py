@@ -320,7 +320,8 @@ def api_ai_risk_assessment(request):
     Évalue le niveau de risque global basé sur l'IA
     """
     try:
-        from detection.models import DetectionResult
+        from django.db.models.functions import Lower
+        from detection.models import DetectionResult, DetectedObject
         from analytics.models import SecurityAlert, ObjectTrend
         
         days = int(request.GET.get('days', 7))
@@ -358,14 +359,9 @@ def api_ai_risk_assessment(request):
         
         # Facteur 2: Objets dangereux détectés
         dangerous_objects = ['knife', 'gun', 'weapon', 'fire']
-        dangerous_count = 0
-        
-        for detection in detections:
-            data = detection.get_detection_data()
-            if data:
-                for obj in data:
-                    if obj.get('class', '').lower() in dangerous_objects:
-                        dangerous_count += 1
+        dangerous_count = DetectedObject.objects.filter(detection__in=detections).annotate(
+            class_lower=Lower('object_class')
+        ).filter(class_lower__in=dangerous_objects).count()
         
         if dangerous_count > 0:
             risk_score += min(dangerous_count * 10, 30)
@@ -5,6 +5,7 @@ Provides intelligent recommendations based on ML patterns, user behavior, and pr
 import numpy as np
 from django.utils import timezone
 from django.db.models import Count, Avg, Q, F, Sum
+from django.db.models.functions import Lower
 from datetime import timedelta, datetime
 from collections import defaultdict, Counter
 import logging
@@ -115,6 +116,12 @@ class AdvancedRecommendationEngine:
         
         return self.recommendations
     
+    def _detected_objects(self, detections):
+        """Objets (DetectedObject) des détections, pour agréger en base au lieu de parser detection_data"""
+        from detection.models import DetectedObject
+        
+        return DetectedObject.objects.filter(detection__in=detections)
+    
     def _build_behavior_profile(self, detections, alerts):
         """
         Construit un profil comportemental de l'utilisateur
@@ -138,13 +145,13 @@ class AdvancedRecommendationEngine:
         days_active = (timezone.now() - detections.first().uploaded_at).days or 1
         self.behavior_profile['detection_frequency'] = total_detections / days_active
         
-        # Types d'objets préférés
-        all_objects = []
-        for det in detections:
-            data = det.get_detection_data()
-            if data:
-                all_objects.extend([obj.get('class') for obj in data])
-        self.behavior_profile['common_objects'] = Counter(all_objects).most_common(5)
+        # Types d'objets préférés (agrégés en base sur DetectedObject)
+        common_objects = self._detected_objects(detections).values('object_class').annotate(
+            count=Count('id')
+        ).order_by('-count', 'object_class')[:5]
+        self.behavior_profile['common_objects'] = [
+            (row['object_class'], row['count']) for row in common_objects
+        ]
         
     def _calculate_risk_score(self, detections, alerts):
         """
@@ -162,13 +169,9 @@ class AdvancedRecommendationEngine:
         
         # Facteur 2: Objets dangereux détectés
         dangerous_objects = ['knife', 'gun', 'weapon', 'scissors', 'fire']
-        danger_count = 0
-        for det in detections:
-            data = det.get_detection_data()
-            if data:
-                for obj in data:
-                    if obj.get('class', '').lower() in dangerous_objects:
-                        danger_count += 1
+        danger_count = self._detected_objects(detections).annotate(
+            class_lower=Lower('object_class')
+        ).filter(class_lower__in=dangerous_objects).count()
         risk_points += min(danger_count * 10, 30)
         
         # Facteur 3: Activité nocturne suspecte (22h-6h)
@@ -264,15 +267,9 @@ class AdvancedRecommendationEngine:
             return
         
         # Analyser la confiance moyenne
-        all_confidences = []
-        for det in detections:
-            data = det.get_detection_data()
-            if data:
-                all_confidences.extend([obj.get('confidence', 0) for obj in data])
+        avg_confidence = self._detected_objects(detections).aggregate(avg=Avg('confidence'))['avg']
         
-        if all_confidences:
-            avg_confidence = np.mean(all_confidences)
-            
+        if avg_confidence is not None:
             if avg_confidence < 0.6:
                 self.recommendations.append({
                     'type': self.RECOMMENDATION_TYPES['PERFORMANCE'],
@@ -427,14 +424,9 @@ class AdvancedRecommendationEngine:
         
         # Check for high-risk objects
         high_risk_objects = ['knife', 'gun', 'weapon', 'fire']
-        risky_detections = 0
-        
-        for detection in detections:
-            data = detection.get_detection_data()
-            if data:
-                for obj in data:
-                    if obj.get('class', '').lower() in high_risk_objects:
-                        risky_detections += 1
+        risky_detections = self._detected_objects(detections).annotate(
+            class_lower=Lower('object_class')
+        ).filter(class_lower__in=high_risk_objects).count()
         
         if risky_detections > 5:
             self.recommendations.append({
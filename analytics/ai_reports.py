@@ -8,7 +8,9 @@ from datetime import timedelta, datetime
 from collections import defaultdict
 import json
 from typing import Dict, List, Tuple, Optional
-from detection.models import DetectionResult
+from django.db.models import Avg, Count
+from django.db.models.functions import ExtractHour, TruncDate
+from detection.models import DetectionResult, DetectedObject
 from .models import DetectionAnalytics, ObjectTrend, SecurityAlert, AnalyticsInsight
 
 
@@ -133,25 +135,22 @@ class AIReportGenerator:
     
     def _analyze_trends(self, detections) -> Dict:
         """Analyse des tendances temporelles"""
-        # Grouper par objet
-        object_counts = defaultdict(int)
-        object_confidences = defaultdict(list)
-        hourly_counts = defaultdict(int)
-        daily_counts = defaultdict(int)
-        
-        for det in detections:
-            det_data = det.get_detection_data()
-            hour = det.uploaded_at.hour
-            day = det.uploaded_at.strftime('%Y-%m-%d')
-            
-            hourly_counts[hour] += 1
-            daily_counts[day] += 1
-            
-            if det_data:
-                for obj in det_data:
-                    obj_class = obj.get('class', 'unknown')
-                    object_counts[obj_class] += 1
-                    object_confidences[obj_class].append(obj.get('confidence', 0))
+        # Grouper par objet (agrégé en base sur DetectedObject)
+        per_class = DetectedObject.objects.filter(detection__in=detections).values('object_class').annotate(
+            count=Count('id'), avg_confidence=Avg('confidence')
+        ).order_by()
+        object_counts = {row['object_class']: row['count'] for row in per_class}
+        object_confidences = {row['object_class']: row['avg_confidence'] or 0 for row in per_class}
+        
+        hourly_counts = dict(
+            detections.order_by().values(hour=ExtractHour('uploaded_at')).annotate(count=Count('id'))
+            .values_list('hour', 'count')
+        )
+        daily_counts = {
+            day.strftime('%Y-%m-%d'): count for day, count in
+            detections.order_by().values(day=TruncDate('uploaded_at')).annotate(count=Count('id'))
+            .values_list('day', 'count')
+        }
         
         # Top objets
         top_objects = sorted(object_counts.items(), key=lambda x: x[1], reverse=True)[:10]
@@ -167,7 +166,7 @@ class AIReportGenerator:
                 {
                     'name': obj,
                     'count': count,
-                    'avg_confidence': round(sum(object_confidences[obj]) / len(object_confidences[obj]), 2) if object_confidences[obj] else 0,
+                    'avg_confidence': round(object_confidences[obj], 2),
                     'percentage': round((count / sum(object_counts.values())) * 100, 1) if object_counts else 0
                 }
                 for obj, count in top_objects
@@ -0,0 +1,387 @@
+"""
+Persisted per-user anomaly models
+The old pipeline refitted a StandardScaler + IsolationForest on the user's last
+7 days for every new detection. Models are now trained periodically (and once
+on first use), stored in UserAnomalyModel, and a new detection is only scored:
+    - isolation_forest: pickled scaler + forest, cached per process by version
+    - robust_zscore: per-feature median / MAD, updated online at each score
+      (no sklearn, O(features) per detection)
+Pickles are only loaded from UserAnomalyModel.model_data, which only this
+module writes; each payload carries an HMAC keyed on SECRET_KEY, so a blob
+written by anyone without the key (e.g. through direct database access) is
+refused instead of being unpickled.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from datetime import timedelta
+from threading import Lock
+import logging
+import pickle
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FEATURE_NAMES = [
+    'hour', 'day_of_week', 'objects_count', 'is_weekend', 'is_night',
+    'avg_confidence', 'unique_classes', 'max_class_count',
+]
+
+MIN_TRAINING_SAMPLES = 10
+MAX_TRAINING_SAMPLES = 5000
+
+
+def _features(dt, objects_detected, class_counts, confidence_sum):
+    total = sum(class_counts.values())
+    return {
+        'hour': dt.hour,
+        'day_of_week': dt.weekday(),
+        'objects_count': objects_detected,
+        'is_weekend': 1 if dt.weekday() >= 5 else 0,
+        'is_night': 1 if dt.hour < 6 or dt.hour > 22 else 0,
+        'avg_confidence': float(confidence_sum / total) if total else 0,
+        'unique_classes': len(class_counts),
+        'max_class_count': max(class_counts.values()) if class_counts else 0,
+    }
+
+
+def detection_features(detection):
+    """
+    Temporal and content features of one detection
+
+    Args:
+        detection: DetectionResult instance
+
+    Returns:
+        dict: FEATURE_NAMES -> value
+    """
+    class_counts = {}
+    confidence_sum = 0.0
+    for obj in detection.get_detection_data():
+        obj_class = obj.get('class', 'unknown')
+        class_counts[obj_class] = class_counts.get(obj_class, 0) + 1
+        confidence_sum += obj.get('confidence', 0)
+    return _features(detection.uploaded_at, detection.objects_detected, class_counts, confidence_sum)
+
+
+def bulk_detection_features(detections):
+    """
+    detection_features for many detections, object statistics aggregated
+    in the database (DetectedObject) instead of parsing detection_data
+
+    Args:
+        detections: QuerySet (may be sliced) or list of DetectionResult
+
+    Returns:
+        list: Feature dicts, in the order of detections
+    """
+    from detection.models import DetectedObject
+
+    if hasattr(detections, 'values'):
+        objects = DetectedObject.objects.filter(detection__in=detections.values('pk'))
+    else:
+        objects = DetectedObject.objects.filter(detection_id__in=[d.pk for d in detections])
+
+    stats = {}
+    per_class = objects.values('detection_id', 'object_class').annotate(
+        count=Count('id'), confidence_sum=Sum('confidence')
+    ).order_by()
+    for row in per_class:
+        class_counts, confidence_sum = stats.setdefault(row['detection_id'], ({}, [0.0]))
+        class_counts[row['object_class']] = row['count']
+        confidence_sum[0] += row['confidence_sum'] or 0
+
+    features = []
+    for detection in detections:
+        class_counts, confidence_sum = stats.get(detection.pk, ({}, [0.0]))
+        features.append(_features(detection.uploaded_at, detection.objects_detected, class_counts, confidence_sum[0]))
+    return features
+
+
+def feature_vector(features):
+    """Features dict -> float64 row in FEATURE_NAMES order"""
+    return np.array([features[name] for name in FEATURE_NAMES], dtype=np.float64)
+
+
+def explain_features(features):
+    """Génère une explication pour l'anomalie"""
+    reasons = []
+
+    if features['is_night'] == 1:
+        reasons.append('Detection during unusual hours (night)')
+
+    if features['objects_count'] > 10:
+        reasons.append(f'Unusually high object count ({features["objects_count"]})')
+
+    if features['unique_classes'] > 5:
+        reasons.append(f'High diversity of objects ({features["unique_classes"]} classes)')
+
+    if features['avg_confidence'] < 0.5:
+        reasons.append(f'Low confidence score ({features["avg_confidence"]:.2f})')
+
+    return ' | '.join(reasons) if reasons else 'Pattern deviation from normal behavior'
+
+
+class RobustZScoreModel:
+    """
+    Modified z-score |x - median| / (1.4826 * MAD) per feature
+    When the MAD is 0 (e.g. binary features), 1.2533 * mean absolute deviation
+    is used instead. Median and deviations follow new samples online with
+    fixed-size steps, so the model keeps adapting between trainings.
+    """
+
+    def __init__(self, median, mad, meanad, threshold=3.5, learning_rate=0.02):
+        """
+        Args:
+            median, mad, meanad (array-like): Per-feature statistics
+            threshold (float): Modified z-score above which a detection is an anomaly
+            learning_rate (float): Online step, as a fraction of the feature scale
+        """
+        self.median = np.asarray(median, dtype=np.float64)
+        self.mad = np.asarray(mad, dtype=np.float64)
+        self.meanad = np.asarray(meanad, dtype=np.float64)
+        self.threshold = threshold
+        self.learning_rate = learning_rate
+
+    @classmethod
+    def fit(cls, X, **kwargs):
+        median = np.median(X, axis=0)
+        deviation = np.abs(X - median)
+        return cls(median, np.median(deviation, axis=0), deviation.mean(axis=0), **kwargs)
+
+    def scale(self):
+        return np.maximum(np.where(self.mad > 0, 1.4826 * self.mad, 1.2533 * self.meanad), 1e-6)
+
+    def zscores(self, x):
+        return np.abs(x - self.median) / self.scale()
+
+    def score(self, x):
+        """
+        Returns:
+            tuple: (is_anomaly, anomaly_score 0-1, per-feature z-scores)
+        """
+        z = self.zscores(x)
+        worst = float(z.max())
+        return worst > self.threshold, min(1.0, worst / (2 * self.threshold)), z
+
+    def update(self, x):
+        """Stochastic median / deviation step towards a new sample"""
+        step = self.learning_rate * self.scale()
+        self.median += step * np.sign(x - self.median)
+        deviation = np.abs(x - self.median)
+        self.mad = np.maximum(self.mad + step * np.sign(deviation - self.mad), 0)
+        self.meanad += self.learning_rate * (deviation - self.meanad)
+
+    def to_state(self):
+        return {
+            'median': self.median.tolist(),
+            'mad': self.mad.tolist(),
+            'meanad': self.meanad.tolist(),
+            'threshold': self.threshold,
+            'learning_rate': self.learning_rate,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(**state)
+
+
+class IsolationForestModel:
+    """StandardScaler + IsolationForest fitted once, then only scored"""
+
+    def __init__(self, contamination=0.1):
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+
+        self.scaler = StandardScaler()
+        self.forest = IsolationForest(contamination=contamination, random_state=42, n_estimators=100)
+
+    @classmethod
+    def fit(cls, X, contamination=0.1):
+        model = cls(contamination)
+        model.forest.fit(model.scaler.fit_transform(X))
+        return model
+
+    def score(self, x):
+        """
+        Returns:
+            tuple: (is_anomaly, anomaly_score, None)
+        """
+        row = self.scaler.transform(x.reshape(1, -1))
+        is_anomaly = self.forest.decision_function(row)[0] < 0
+        return bool(is_anomaly), float(abs(self.forest.score_samples(row)[0])), None
+
+
+def _engine():
+    return getattr(settings, 'ANALYTICS_ANOMALY_ENGINE', 'isolation_forest')
+
+
+# Modèles désérialisés par processus: {user_id: (version, IsolationForestModel)}
+_model_cache = {}
+_model_cache_lock = Lock()
+
+_SIGNATURE_SALT = 'analytics.anomaly_models'
+_SIGNATURE_SIZE = 32  # SHA-256
+
+
+def _dump_model(model):
+    """Pickle a model, prefixed with its HMAC"""
+    payload = pickle.dumps(model)
+    return salted_hmac(_SIGNATURE_SALT, payload, algorithm='sha256').digest() + payload
+
+
+def _load_model(data):
+    """
+    Unpickle a model written by _dump_model
+
+    Raises:
+        ValueError: The signature does not match (not written by this application)
+    """
+    data = bytes(data)
+    signature, payload = data[:_SIGNATURE_SIZE], data[_SIGNATURE_SIZE:]
+    if not constant_time_compare(signature, salted_hmac(_SIGNATURE_SALT, payload, algorithm='sha256').digest()):
+        raise ValueError('Invalid anomaly model signature')
+    return pickle.loads(payload)
+
+
+def _load_forest(record):
+    with _model_cache_lock:
+        cached = _model_cache.get(record.user_id)
+        if cached is None or cached[0] != record.version:
+            cached = (record.version, _load_model(record.model_data))
+            _model_cache[record.user_id] = cached
+        return cached[1]
+
+
+def train_user_model(user, engine=None, exclude_id=None):
+    """
+    (Re)train the anomaly model of a user on recent history
+
+    Args:
+        user: User instance
+        engine (str): 'isolation_forest' or 'robust_zscore' (default: settings.ANALYTICS_ANOMALY_ENGINE)
+        exclude_id (int): Detection left out of the training set (the one being scored)
+
+    Returns:
+        UserAnomalyModel: Saved model, None if the user has too little history
+    """
+    from detection.models import DetectionResult
+    from .models import UserAnomalyModel
+
+    engine = engine or _engine()
+    history_days = getattr(settings, 'ANALYTICS_ANOMALY_HISTORY_DAYS', 30)
+    detections = DetectionResult.objects.filter(
+        user=user, uploaded_at__gte=timezone.now() - timedelta(days=history_days)
+    ).only('uploaded_at', 'objects_detected').order_by('-uploaded_at')
+    if exclude_id is not None:
+        detections = detections.exclude(pk=exclude_id)
+
+    rows = [feature_vector(f) for f in bulk_detection_features(detections[:MAX_TRAINING_SAMPLES])]
+    if len(rows) < MIN_TRAINING_SAMPLES:
+        return None
+    X = np.vstack(rows)
+
+    model_data, state = None, {}
+    if engine == 'isolation_forest':
+        try:
+            model_data = _dump_model(IsolationForestModel.fit(X, getattr(settings, 'ANOMALY_CONTAMINATION', 0.1)))
+        except ImportError:
+            logger.warning("scikit-learn not installed, falling back to the robust z-score anomaly model")
+            engine = 'robust_zscore'
+    if engine == 'robust_zscore':
+        state = RobustZScoreModel.fit(X).to_state()
+
+    record, _ = UserAnomalyModel.objects.get_or_create(user=user)
+    record.engine = engine
+    record.model_data = model_data
+    record.state = state
+    record.version += 1
+    record.samples_trained = len(rows)
+    record.scored_since_training = 0
+    record.trained_at = timezone.now()
+    record.save()
+
+    logger.info(f"Anomaly model v{record.version} ({engine}) trained for {user.username} on {len(rows)} detections")
+    return record
+
+
+def score_detection(detection):
+    """
+    Score a new detection against the user's persisted model
+    The model is trained on first use; afterwards only retrain_stale_models() trains.
+    The online robust_zscore update locks the model row (select_for_update), so
+    concurrent job workers scoring the same user apply their updates in turn.
+
+    Args:
+        detection: DetectionResult instance
+
+    Returns:
+        dict: is_anomaly, anomaly_score, features, reason, engine, model_version, stale;
+              None when the user has too little history
+    """
+    from .models import UserAnomalyModel
+
+    record = UserAnomalyModel.objects.filter(user_id=detection.user_id).first()
+    if record is None or record.trained_at is None:
+        record = train_user_model(detection.user, exclude_id=detection.id)
+        if record is None:
+            return None
+
+    features = detection_features(detection)
+    x = feature_vector(features)
+
+    reason = explain_features(features)
+
+    if record.engine == 'robust_zscore':
+        with transaction.atomic():
+            record = UserAnomalyModel.objects.select_for_update().get(pk=record.pk)
+            model = RobustZScoreModel.from_state(record.state)
+            is_anomaly, score, z = model.score(x)
+            if reason == 'Pattern deviation from normal behavior':
+                worst = int(np.argmax(z))
+                reason = f'Unusual {FEATURE_NAMES[worst]} ({x[worst]:g}, typical {model.median[worst]:.2f})'
+            model.update(x)
+            record.state = model.to_state()
+            record.scored_since_training += 1
+            record.save(update_fields=['state', 'scored_since_training'])
+    else:
+        try:
+            forest = _load_forest(record)
+        except ValueError:
+            logger.warning(f"Refusing anomaly model v{record.version} of user {record.user_id}: bad signature, retraining")
+            record = train_user_model(detection.user, exclude_id=detection.id)
+            if record is None:
+                return None
+            return score_detection(detection)
+        is_anomaly, score, _ = forest.score(x)
+        UserAnomalyModel.objects.filter(pk=record.pk).update(scored_since_training=F('scored_since_training') + 1)
+        record.scored_since_training += 1
+
+    return {
+        'is_anomaly': bool(is_anomaly),
+        'anomaly_score': score,
+        'features': features,
+        'reason': reason,
+        'engine': record.engine,
+        'model_version': record.version,
+        'stale': record.is_stale(),
+    }
+
+
+def retrain_stale_models(force=False):
+    """
+    Retrain every stale (or, with force, every) user anomaly model
+
+    Returns:
+        int: Models retrained
+    """
+    from .models import UserAnomalyModel
+
+    retrained = 0
+    for record in UserAnomalyModel.objects.select_related('user'):
+        if force or record.is_stale():
+            if train_user_model(record.user, engine=_engine()) is not None:
+                retrained += 1
+    return retrained
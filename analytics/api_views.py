@@ -430,6 +430,22 @@ def api_health_check(request):
     })
 
 
+@login_required
+@require_http_methods(["GET"])
+def api_jobs_status(request):
+    """
+    GET /analytics/api/jobs/status/
+    Profondeur de la file AnalyticsJob et durée moyenne de chaque étape
+    """
+    from .jobs import queue_stats
+    
+    return JsonResponse({
+        'status': 'success',
+        'data': queue_stats(),
+        'timestamp': timezone.now().isoformat()
+    })
+
+
 @login_required
 @require_http_methods(["GET"])
 def api_quick_insights(request):
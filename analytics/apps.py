@@ -1,4 +1,7 @@
 from django.apps import AppConfig
+from django.conf import settings
+import os
+import sys
 
 
 class AnalyticsConfig(AppConfig):
@@ -9,3 +12,10 @@ class AnalyticsConfig(AppConfig):
     def ready(self):
         """Import signals when app is ready"""
         import analytics.signals
+        
+        # 'thread' backend: resume the queued jobs (retries) when the development server starts
+        if getattr(settings, 'ANALYTICS_JOB_BACKEND', 'db') == 'thread' and len(sys.argv) > 1 \
+                and sys.argv[0].endswith('manage.py') and sys.argv[1] == 'runserver':
+            if os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv:
+                from .jobs import start_thread_worker
+                start_thread_worker()
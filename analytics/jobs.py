@@ -0,0 +1,309 @@
+"""
+DB-backed job queue for the post-detection analytics pipeline
+A committed DetectionResult enqueues one AnalyticsJob (transaction.on_commit);
+workers claim jobs with a conditional UPDATE (safe with several workers on
+SQLite or PostgreSQL, no Redis needed), run the pipeline stage by stage,
+record per-stage timings, and retry failures with exponential backoff.
+Backends (settings.ANALYTICS_JOB_BACKEND):
+    - db (default): jobs wait for `python manage.py analytics_worker`; without
+      a running worker no analytics, alerts or notifications are produced
+    - thread: a background thread of the saving process works the queue
+      (runserver / single-process deployments), retries included
+    - celery: jobs are also dispatched to analytics.tasks.process_analytics_job
+"""
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+from threading import Event, Lock, Thread
+import logging
+import os
+import socket
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+
+def _backend():
+    return getattr(settings, 'ANALYTICS_JOB_BACKEND', 'db')
+
+
+def pipeline_stages():
+    """
+    Ordered (name, function(detection)) stages of the analytics pipeline
+
+    Returns:
+        list: Stage name / callable pairs
+    """
+    from .services import SecurityAlertService
+    from . import signals
+
+    return [
+        ('update_analytics', signals._update_analytics),
+        ('security_alerts', SecurityAlertService.analyze_detection),
+        ('anomalies', signals._check_for_anomalies),
+        ('suspicious_objects', signals._analyze_suspicious_objects),
+        ('object_trends', signals._update_object_trends),
+    ]
+
+
+def enqueue_detection_analytics(detection_id):
+    """
+    Queue the analytics pipeline for a detection (at most one open job per detection)
+
+    Args:
+        detection_id (int): DetectionResult primary key
+
+    Returns:
+        AnalyticsJob: The queued job, None if one is already pending or running
+    """
+    from .models import AnalyticsJob
+
+    try:
+        # Savepoint: the unique constraint on open jobs decides between concurrent commits
+        with transaction.atomic():
+            job = AnalyticsJob.objects.create(
+                detection_id=detection_id,
+                max_attempts=getattr(settings, 'ANALYTICS_JOB_MAX_ATTEMPTS', 5),
+            )
+    except IntegrityError:
+        return None
+
+    backend = _backend()
+    if backend == 'thread':
+        start_thread_worker()
+    elif backend == 'celery':
+        from .tasks import process_analytics_job, CELERY_AVAILABLE
+        if CELERY_AVAILABLE:
+            try:
+                process_analytics_job.delay(job.id)
+            except Exception as e:
+                # The job stays in the table: a DB worker (or a later retry) picks it up
+                logger.warning(f"Celery dispatch failed for analytics job {job.id}: {e}")
+    return job
+
+
+def enqueue_on_commit(detection_id):
+    """Enqueue the analytics job once the current transaction commits (immediately in autocommit)"""
+    transaction.on_commit(lambda: enqueue_detection_analytics(detection_id))
+
+
+def worker_id():
+    """Identifier stored in AnalyticsJob.locked_by"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseLost(Exception):
+    """The job was requeued and claimed by another worker (see requeue_stale)"""
+
+
+def claim_job(job_id, worker=None):
+    """
+    Atomically move a due pending job to running
+
+    Returns:
+        bool: True if this worker owns the job now
+    """
+    from .models import AnalyticsJob
+
+    now = timezone.now()
+    return AnalyticsJob.objects.filter(
+        pk=job_id, status='pending', run_after__lte=now
+    ).update(
+        status='running',
+        locked_by=worker or worker_id(),
+        started_at=now,
+        heartbeat_at=now,
+        attempts=F('attempts') + 1,
+    ) == 1
+
+
+def claim_jobs(limit=10, worker=None):
+    """
+    Claim up to limit due pending jobs, oldest first
+
+    Returns:
+        list: Claimed job ids
+    """
+    from .models import AnalyticsJob
+
+    candidates = AnalyticsJob.objects.filter(
+        status='pending', run_after__lte=timezone.now()
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+    return [job_id for job_id in candidates if claim_job(job_id, worker)]
+
+
+def _owned(job, worker):
+    """Jobs still leased by worker (empty once requeue_stale took the job back)"""
+    from .models import AnalyticsJob
+
+    return AnalyticsJob.objects.filter(pk=job.pk, status='running', locked_by=worker)
+
+
+def run_job(job_id, claimed=False, worker=None):
+    """
+    Run the pipeline of a job; completed stages of earlier attempts are skipped
+
+    Each stage runs in one transaction with its checkpoint, so a stage that
+    fails (or whose worker dies) leaves no partial side effects and is rerun
+    as a whole. The checkpoint also renews the worker's lease: a worker whose
+    job was requeued in the meantime rolls back its stage and stops.
+
+    Args:
+        job_id (int): AnalyticsJob primary key
+        claimed (bool): The caller already claimed the job (claim_jobs)
+        worker (str): Lease holder (default: worker_id()), as passed to claim_jobs
+
+    Returns:
+        str: Final status of the job ('done', 'pending' for a retry, 'failed'),
+             None if the job could not be claimed or its lease was lost
+    """
+    from .models import AnalyticsJob
+
+    worker = worker or worker_id()
+    if not claimed and not claim_job(job_id, worker):
+        return None
+
+    job = AnalyticsJob.objects.select_related('detection').get(pk=job_id)
+    timings = dict(job.stage_timings)
+
+    for name, stage in pipeline_stages():
+        if name in timings:
+            continue
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                stage(job.detection)
+                timings[name] = round((time.perf_counter() - start) * 1000, 2)
+                if not _owned(job, worker).update(stage_timings=timings, heartbeat_at=timezone.now()):
+                    raise LeaseLost()
+        except LeaseLost:
+            logger.warning(f"Analytics job {job.pk} lost its lease during {name}, stopping")
+            return None
+        except Exception as e:
+            timings.pop(name, None)
+            return _fail(job, worker, timings, f"{name}: {e}\n{traceback.format_exc()}")
+
+    if not _owned(job, worker).update(
+            status='done', stage_timings=timings, last_error='', finished_at=timezone.now()):
+        return None
+    logger.info(f"Analytics job {job.pk} done for detection {job.detection_id}: {timings}")
+    return 'done'
+
+
+def _fail(job, worker, timings, error):
+    """Schedule a retry with exponential backoff, or give up after max_attempts"""
+    if job.attempts >= job.max_attempts:
+        status, run_after = 'failed', job.run_after
+        logger.error(f"Analytics job {job.pk} failed permanently: {error}")
+    else:
+        delay = getattr(settings, 'ANALYTICS_JOB_RETRY_DELAY', 30) * 2 ** (job.attempts - 1)
+        status, run_after = 'pending', timezone.now() + timedelta(seconds=delay)
+        logger.warning(f"Analytics job {job.pk} attempt {job.attempts} failed, retry in {delay}s: {error}")
+
+    if not _owned(job, worker).update(
+            status=status, run_after=run_after, stage_timings=timings,
+            last_error=error[-5000:], finished_at=timezone.now() if status == 'failed' else None):
+        return None
+    return status
+
+
+def requeue_stale(timeout=None):
+    """
+    Put back running jobs whose worker died (no heartbeat for timeout seconds)
+    A slow but alive worker that loses its job this way notices it at its next
+    checkpoint and rolls back (see run_job), so a job never completes twice.
+
+    Returns:
+        int: Jobs requeued
+    """
+    from .models import AnalyticsJob
+
+    timeout = timeout or getattr(settings, 'ANALYTICS_JOB_STALE_SECONDS', 600)
+    return AnalyticsJob.objects.filter(
+        status='running', heartbeat_at__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status='pending', run_after=timezone.now(), locked_by='')
+
+
+def process_due_jobs(limit=20, worker=None):
+    """
+    Claim and run up to limit due jobs (one poll of a worker)
+
+    Returns:
+        list: (job id, final status) pairs
+    """
+    worker = worker or worker_id()
+    return [(job_id, run_job(job_id, claimed=True, worker=worker)) for job_id in claim_jobs(limit, worker)]
+
+
+# Worker thread of the 'thread' backend, woken up by each new job
+_thread_worker = None
+_thread_worker_lock = Lock()
+_thread_worker_wakeup = Event()
+
+
+def start_thread_worker():
+    """Start (once per process) the background thread working the queue, and wake it up"""
+    global _thread_worker
+    with _thread_worker_lock:
+        if _thread_worker is None or not _thread_worker.is_alive():
+            _thread_worker = Thread(target=_thread_worker_loop, name='analytics-jobs', daemon=True)
+            _thread_worker.start()
+    _thread_worker_wakeup.set()
+
+
+def _thread_worker_loop():
+    """Same loop as the analytics_worker command; due retries are picked up at each poll"""
+    worker = worker_id()
+    while True:
+        _thread_worker_wakeup.clear()
+        processed = []
+        try:
+            close_old_connections()
+            requeue_stale()
+            processed = process_due_jobs(worker=worker)
+        except Exception as e:
+            logger.error(f"Analytics worker thread error: {e}")
+        finally:
+            close_old_connections()
+        if not processed:
+            _thread_worker_wakeup.wait(getattr(settings, 'ANALYTICS_JOB_POLL_INTERVAL', 1.0))
+
+
+def queue_stats(recent=200):
+    """
+    Queue depth and per-stage timings for monitoring
+
+    Args:
+        recent (int): Finished jobs used for the timing averages
+
+    Returns:
+        dict: counts by status, oldest pending age, per-stage avg/max ms
+    """
+    from django.db.models import Count, Min
+    from .models import AnalyticsJob
+
+    counts = {status: 0 for status, _ in AnalyticsJob.STATUS_CHOICES}
+    for row in AnalyticsJob.objects.values('status').annotate(count=Count('id')):
+        counts[row['status']] = row['count']
+
+    oldest = AnalyticsJob.objects.filter(status='pending').aggregate(oldest=Min('created_at'))['oldest']
+
+    samples = {}
+    for timings in AnalyticsJob.objects.filter(status='done').order_by('-finished_at').values_list(
+            'stage_timings', flat=True)[:recent]:
+        for name, ms in timings.items():
+            samples.setdefault(name, []).append(ms)
+
+    return {
+        'backend': _backend(),
+        'queue_depth': counts['pending'] + counts['running'],
+        'counts': counts,
+        'oldest_pending_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else None,
+        'stage_timings_ms': {
+            name: {'avg': round(sum(values) / len(values), 2), 'max': max(values), 'samples': len(values)}
+            for name, values in samples.items()
+        },
+    }
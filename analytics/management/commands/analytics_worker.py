@@ -0,0 +1,56 @@
+"""
+Django management command processing the AnalyticsJob queue
+Several workers can run side by side: jobs are claimed with a conditional UPDATE.
+Usage:
+    python manage.py analytics_worker
+    python manage.py analytics_worker --once --batch 50
+    python manage.py analytics_worker --stats
+"""
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from analytics import jobs
+import json
+import time
+
+
+class Command(BaseCommand):
+    help = 'Process queued post-detection analytics jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Process the due jobs then exit')
+        parser.add_argument('--batch', type=int, default=20, help='Jobs claimed per poll')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds between polls when the queue is empty')
+        parser.add_argument('--stats', action='store_true', help='Print queue depth and stage timings then exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(jobs.queue_stats(), indent=2, default=str))
+            return
+
+        worker = jobs.worker_id()
+        self.stdout.write(self.style.SUCCESS(f'\n🚀 Analytics worker {worker} started\n'))
+
+        processed = 0
+        try:
+            while True:
+                close_old_connections()
+                requeued = jobs.requeue_stale()
+                if requeued:
+                    self.stdout.write(f'♻️ Requeued {requeued} stale job(s)')
+
+                claimed = jobs.process_due_jobs(options['batch'], worker)
+                for job_id, status in claimed:
+                    processed += 1
+                    if status == 'done':
+                        self.stdout.write(f'   ✅ Job #{job_id} done')
+                    else:
+                        self.stdout.write(self.style.WARNING(f'   ⚠️ Job #{job_id} {status}'))
+
+                if options['once'] and len(claimed) < options['batch']:
+                    break
+                if not claimed:
+                    time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ {processed} job(s) processed\n'))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_airecommendation'),
+        ('detection', '0003_camerazone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Not picked up before this time (retry backoff)')),
+                ('stage_timings', models.JSONField(blank=True, default=dict)),
+                ('last_error', models.TextField(blank=True)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('detection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_jobs', to='detection.detectionresult')),
+            ],
+            options={
+                'verbose_name': 'Analytics Job',
+                'verbose_name_plural': 'Analytics Jobs',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='analytics_a_status_3026cd_idx')],
+            },
+        ),
+    ]
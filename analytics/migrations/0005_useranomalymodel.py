@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_analyticsjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAnomalyModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('engine', models.CharField(choices=[('isolation_forest', 'Isolation Forest'), ('robust_zscore', 'Robust z-score (online)')], default='isolation_forest', max_length=20)),
+                ('model_data', models.BinaryField(blank=True, null=True)),
+                ('state', models.JSONField(blank=True, default=dict)),
+                ('version', models.PositiveIntegerField(default=0, help_text='Incremented at each training')),
+                ('samples_trained', models.PositiveIntegerField(default=0)),
+                ('scored_since_training', models.PositiveIntegerField(default=0)),
+                ('trained_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='anomaly_model', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Anomaly Model',
+                'verbose_name_plural': 'User Anomaly Models',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_useranomalymodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsClassCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('object_class', models.CharField(max_length=100)),
+                ('analytics', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_counts', to='analytics.detectionanalytics')),
+            ],
+            options={
+                'unique_together': {('analytics', 'object_class')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsHourCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('analytics', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hour_counts', to='analytics.detectionanalytics')),
+            ],
+            options={
+                'unique_together': {('analytics', 'hour')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_analytics_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObjectRiskRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pattern', models.CharField(help_text='Object class (or part of it), case-insensitive', max_length=100, unique=True)),
+                ('match_type', models.CharField(choices=[('exact', 'Exact class name'), ('contains', 'Class name contains')], default='contains', max_length=10)),
+                ('tier', models.CharField(choices=[('high_risk', 'High risk'), ('suspicious', 'Suspicious'), ('monitored', 'Monitored'), ('normal', 'Normal')], max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Object Risk Rule',
+                'verbose_name_plural': 'Object Risk Rules',
+                'ordering': ['tier', 'pattern'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:04
+
+from django.db import migrations, models
+
+
+def close_duplicate_open_jobs(apps, schema_editor):
+    """Keep the oldest open job of each detection so the constraint can be created"""
+    AnalyticsJob = apps.get_model('analytics', 'AnalyticsJob')
+    seen = set()
+    for job in AnalyticsJob.objects.filter(status__in=['pending', 'running']).order_by('created_at', 'id'):
+        if job.detection_id in seen:
+            AnalyticsJob.objects.filter(pk=job.pk).update(status='failed', last_error='Duplicate open job')
+        seen.add(job.detection_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_analyticsjob_heartbeat_at'),
+        ('detection', '0004_detectedobject'),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_open_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='analyticsjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('detection',), name='analytics_job_one_open_per_detection'),
+        ),
+    ]
@@ -9,6 +9,7 @@ from sklearn.cluster import DBSCAN
 from sklearn.preprocessing import StandardScaler
 from datetime import datetime, timedelta
 from django.utils import timezone
+from .anomaly_models import bulk_detection_features, explain_features
 import logging
 
 logger = logging.getLogger(__name__)
@@ -58,45 +59,7 @@ class AnomalyDetector:
         Returns:
             DataFrame avec features extraites
         """
-        features = []
-        
-        for detection in detections:
-            # Extraction de features temporelles et contextuelles
-            dt = detection.uploaded_at
-            
-            feature_dict = {
-                'hour': dt.hour,
-                'day_of_week': dt.weekday(),
-                'objects_count': detection.objects_detected,
-                'is_weekend': 1 if dt.weekday() >= 5 else 0,
-                'is_night': 1 if dt.hour < 6 or dt.hour > 22 else 0,
-            }
-            
-            # Analyse des objets détectés
-            detection_data = detection.get_detection_data()
-            if detection_data:
-                # Nombre d'objets par classe
-                classes_count = {}
-                confidences = []
-                
-                for obj in detection_data:
-                    obj_class = obj.get('class', 'unknown')
-                    confidence = obj.get('confidence', 0)
-                    
-                    classes_count[obj_class] = classes_count.get(obj_class, 0) + 1
-                    confidences.append(confidence)
-                
-                feature_dict['avg_confidence'] = np.mean(confidences) if confidences else 0
-                feature_dict['unique_classes'] = len(classes_count)
-                feature_dict['max_class_count'] = max(classes_count.values()) if classes_count else 0
-            else:
-                feature_dict['avg_confidence'] = 0
-                feature_dict['unique_classes'] = 0
-                feature_dict['max_class_count'] = 0
-            
-            features.append(feature_dict)
-        
-        return pd.DataFrame(features)
+        return pd.DataFrame(bulk_detection_features(detections))
     
     def detect_anomalies(self, detections):
         """
@@ -152,21 +115,7 @@ class AnomalyDetector:
     
     def _explain_anomaly(self, features):
         """Génère une explication pour l'anomalie"""
-        reasons = []
-        
-        if features['is_night'] == 1:
-            reasons.append('Detection during unusual hours (night)')
-        
-        if features['objects_count'] > 10:
-            reasons.append(f'Unusually high object count ({features["objects_count"]})')
-        
-        if features['unique_classes'] > 5:
-            reasons.append(f'High diversity of objects ({features["unique_classes"]} classes)')
-        
-        if features['avg_confidence'] < 0.5:
-            reasons.append(f'Low confidence score ({features["avg_confidence"]:.2f})')
-        
-        return ' | '.join(reasons) if reasons else 'Pattern deviation from normal behavior'
+        return explain_features(features)
     
     def cluster_detections(self, detections, eps=0.5, min_samples=5):
         """
@@ -1,7 +1,7 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Avg, Q, F
 from datetime import timedelta
 import json
 
@@ -71,7 +71,11 @@ class DetectionAnalytics(models.Model):
         return f"{self.user.username} - {self.period_type} - {self.period_start.date()}"
     
     def get_objects_by_class(self):
-        """Parse JSON objects by class"""
+        """Objects by class: atomic counters when present, JSON column otherwise"""
+        if self.pk:
+            counts = dict(self.class_counts.values_list('object_class', 'count'))
+            if counts:
+                return counts
         try:
             return json.loads(self.objects_by_class)
         except json.JSONDecodeError:
@@ -82,7 +86,11 @@ class DetectionAnalytics(models.Model):
         self.objects_by_class = json.dumps(data)
     
     def get_detections_by_hour(self):
-        """Parse JSON detections by hour"""
+        """Detections by hour: atomic counters when present, JSON column otherwise"""
+        if self.pk:
+            counts = {str(hour): count for hour, count in self.hour_counts.values_list('hour', 'count')}
+            if counts:
+                return counts
         try:
             return json.loads(self.detections_by_hour)
         except json.JSONDecodeError:
@@ -92,6 +100,20 @@ class DetectionAnalytics(models.Model):
         """Store detections by hour as JSON"""
         self.detections_by_hour = json.dumps(data)
     
+    def rebuild_counters(self, detections_by_hour, objects_by_class):
+        """Replace the counter rows after a full recomputation of the period"""
+        with transaction.atomic():
+            self.hour_counts.all().delete()
+            self.class_counts.all().delete()
+            AnalyticsHourCount.objects.bulk_create([
+                AnalyticsHourCount(analytics=self, hour=int(hour), count=count)
+                for hour, count in detections_by_hour.items()
+            ])
+            AnalyticsClassCount.objects.bulk_create([
+                AnalyticsClassCount(analytics=self, object_class=obj_class, count=count)
+                for obj_class, count in objects_by_class.items()
+            ])
+    
     def get_detections_by_weekday(self):
         """Parse JSON detections by weekday"""
         try:
@@ -137,6 +159,60 @@ class DetectionAnalytics(models.Model):
         return 'low'
 
 
+class AnalyticsCounter(models.Model):
+    """
+    Atomic counter attached to a DetectionAnalytics period
+    Incremented with a single UPDATE ... SET count = count + n, so concurrent
+    detections never overwrite each other
+    """
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def increment(cls, amount=1, **key):
+        """
+        Add amount to the counter identified by key, creating it if needed
+        
+        Args:
+            amount (int): Increment
+            **key: analytics_id plus the counter key field (hour / object_class)
+        """
+        if cls.objects.filter(**key).update(count=F('count') + amount):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(count=amount, **key)
+        except IntegrityError:
+            # Créé entre-temps par une autre détection
+            cls.objects.filter(**key).update(count=F('count') + amount)
+
+
+class AnalyticsHourCount(AnalyticsCounter):
+    """Detections per hour of a DetectionAnalytics period"""
+    analytics = models.ForeignKey(DetectionAnalytics, on_delete=models.CASCADE, related_name='hour_counts')
+    hour = models.PositiveSmallIntegerField()
+    
+    class Meta:
+        unique_together = ['analytics', 'hour']
+    
+    def __str__(self):
+        return f"{self.analytics} - {self.hour}h: {self.count}"
+
+
+class AnalyticsClassCount(AnalyticsCounter):
+    """Objects per class of a DetectionAnalytics period"""
+    analytics = models.ForeignKey(DetectionAnalytics, on_delete=models.CASCADE, related_name='class_counts')
+    object_class = models.CharField(max_length=100)
+    
+    class Meta:
+        unique_together = ['analytics', 'object_class']
+    
+    def __str__(self):
+        return f"{self.analytics} - {self.object_class}: {self.count}"
+
+
 class ObjectTrend(models.Model):
     """
     Tracks trends for specific object classes over time
@@ -458,3 +534,136 @@ class AIRecommendation(models.Model):
         self.was_helpful = was_helpful
         self.user_feedback = feedback_text
         self.save()
+
+
+class AnalyticsJob(models.Model):
+    """
+    Durable queue entry for the post-detection analytics pipeline
+    Created when a DetectionResult with objects is committed, processed by
+    the analytics_worker command (or a Celery worker) instead of the request
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    detection = models.ForeignKey(
+        'detection.DetectionResult',
+        on_delete=models.CASCADE,
+        related_name='analytics_jobs'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not picked up before this time (retry backoff)")
+    
+    # Per-stage durations in ms; completed stages are skipped on retry
+    stage_timings = models.JSONField(default=dict, blank=True)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    # Lease of the worker in locked_by, renewed at each stage checkpoint
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Analytics Job'
+        verbose_name_plural = 'Analytics Jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+        constraints = [
+            # At most one open job per detection, even with concurrent commits
+            models.UniqueConstraint(
+                fields=['detection'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='analytics_job_one_open_per_detection',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Job #{self.id} - detection #{self.detection_id} ({self.status})"
+
+
+class UserAnomalyModel(models.Model):
+    """
+    Persisted per-user anomaly model (see analytics/anomaly_models.py)
+    Trained periodically on the user's history; new detections are only scored
+    """
+    ENGINE_CHOICES = [
+        ('isolation_forest', 'Isolation Forest'),
+        ('robust_zscore', 'Robust z-score (online)'),
+    ]
+    
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='anomaly_model'
+    )
+    engine = models.CharField(max_length=20, choices=ENGINE_CHOICES, default='isolation_forest')
+    
+    # Pickled scaler + estimator (isolation_forest) / per-feature statistics (robust_zscore)
+    model_data = models.BinaryField(null=True, blank=True)
+    state = models.JSONField(default=dict, blank=True)
+    
+    # Suivi de fraîcheur
+    version = models.PositiveIntegerField(default=0, help_text="Incremented at each training")
+    samples_trained = models.PositiveIntegerField(default=0)
+    scored_since_training = models.PositiveIntegerField(default=0)
+    trained_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'User Anomaly Model'
+        verbose_name_plural = 'User Anomaly Models'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.engine} v{self.version}"
+    
+    def is_stale(self, max_age_hours=None, max_scored=None):
+        """Too old, or too many detections scored since the last training"""
+        if max_age_hours is None:
+            max_age_hours = getattr(settings, 'ANALYTICS_ANOMALY_MAX_AGE_HOURS', 24)
+        if max_scored is None:
+            max_scored = getattr(settings, 'ANALYTICS_ANOMALY_RETRAIN_AFTER', 500)
+        if self.trained_at is None:
+            return True
+        return (timezone.now() - self.trained_at > timedelta(hours=max_age_hours)
+                or self.scored_since_training >= max_scored)
+    is_stale.boolean = True
+
+
+class ObjectRiskRule(models.Model):
+    """
+    Database override of the object risk taxonomy (see analytics/risk_taxonomy.py)
+    A rule replaces the built-in rule with the same pattern, or adds a new one
+    """
+    TIER_CHOICES = [
+        ('high_risk', 'High risk'),
+        ('suspicious', 'Suspicious'),
+        ('monitored', 'Monitored'),
+        ('normal', 'Normal'),
+    ]
+    MATCH_CHOICES = [
+        ('exact', 'Exact class name'),
+        ('contains', 'Class name contains'),
+    ]
+    
+    pattern = models.CharField(max_length=100, unique=True, help_text="Object class (or part of it), case-insensitive")
+    match_type = models.CharField(max_length=10, choices=MATCH_CHOICES, default='contains')
+    tier = models.CharField(max_length=20, choices=TIER_CHOICES)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['tier', 'pattern']
+        verbose_name = 'Object Risk Rule'
+        verbose_name_plural = 'Object Risk Rules'
+    
+    def __str__(self):
+        return f"{self.pattern} ({self.match_type}) -> {self.tier}"
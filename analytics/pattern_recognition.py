@@ -6,6 +6,7 @@ from django.db.models import Count, Avg, Q
 from django.utils import timezone
 from datetime import timedelta, time
 from collections import defaultdict, Counter
+from detection.models import DetectedObject
 import logging
 
 logger = logging.getLogger(__name__)
@@ -193,15 +194,15 @@ class PatternRecognizer:
         cooccurrences = defaultdict(int)
         object_counts = defaultdict(int)
         
-        for detection in detections:
-            detection_data = detection.get_detection_data()
-            if not detection_data:
-                continue
-            
-            # Extraire les classes d'objets
-            objects = [obj.get('class', 'unknown') for obj in detection_data]
-            object_set = set(objects)
-            
+        # Classes distinctes de chaque détection, lues dans DetectedObject
+        classes_by_detection = defaultdict(set)
+        detected = DetectedObject.objects.filter(detection__in=detections).values_list(
+            'detection_id', 'object_class'
+        ).distinct().order_by()
+        for detection_id, obj_class in detected:
+            classes_by_detection[detection_id].add(obj_class)
+        
+        for object_set in classes_by_detection.values():
             # Compter chaque objet
             for obj in object_set:
                 object_counts[obj] += 1
@@ -0,0 +1,165 @@
+"""
+Object risk taxonomy: single source of truth for object class -> risk tier
+Used by the analytics pipeline (alerts, period analytics, trends) and by
+notification scoring. Built-in rules can be overridden or extended with
+ObjectRiskRule rows.
+Lookup order for a (normalized) class name:
+    1. exact rules
+    2. 'normal' contains rules (exclusions, e.g. 'hydrant')
+    3. contains rules, most severe tier first, one precompiled regex per tier
+Results are memoized per class name; the taxonomy is rebuilt when a rule
+changes (signal) or after RISK_TAXONOMY_TTL seconds (other processes).
+"""
+from django.conf import settings
+from threading import Lock
+import re
+import time
+
+# Du plus grave au moins grave
+RISK_TIERS = ('high_risk', 'suspicious', 'monitored', 'normal')
+
+DEFAULT_CONTAINS_RULES = {
+    'high_risk': ['gun', 'weapon', 'fire', 'knife'],
+    'suspicious': ['scissors', 'broken glass', 'crowbar', 'bat'],
+    # Objets de surveillance (sévérité MEDIUM pour SMS)
+    'monitored': ['person', 'car', 'dog', 'cat', 'motorcycle', 'truck'],
+}
+
+DEFAULT_EXACT_RULES = {
+    'person unknown': 'high_risk',
+    # Classes COCO contenant un motif sans en être un
+    'fire hydrant': 'normal',
+    'hot dog': 'normal',
+    'carrot': 'normal',
+}
+
+_MEMO_MAX_SIZE = 4096
+
+
+def normalize(obj_class):
+    """'Broken_Glass ' -> 'broken glass'"""
+    return ' '.join(str(obj_class).lower().replace('_', ' ').replace('-', ' ').split())
+
+
+def _compile(patterns):
+    if not patterns:
+        return None
+    # Motifs les plus longs d'abord pour que l'alternance préfère 'broken glass' à 'glass'
+    return re.compile('|'.join(re.escape(p) for p in sorted(patterns, key=len, reverse=True)))
+
+
+class RiskTaxonomy:
+    """Memoized class name -> risk tier lookup"""
+
+    def __init__(self, exact_rules, contains_rules):
+        """
+        Args:
+            exact_rules (dict): Class name -> tier
+            contains_rules (dict): Tier -> list of substrings
+        """
+        self.exact = {normalize(name): tier for name, tier in exact_rules.items()}
+        self.contains = [
+            (tier, _compile([normalize(p) for p in contains_rules.get(tier, [])]))
+            for tier in ('normal',) + RISK_TIERS[:-1]
+        ]
+        self.contains = [(tier, regex) for tier, regex in self.contains if regex is not None]
+        self._memo = {}
+
+    def tier(self, obj_class):
+        """
+        Args:
+            obj_class (str): Detected object class
+
+        Returns:
+            str: 'high_risk', 'suspicious', 'monitored' or 'normal'
+        """
+        tier = self._memo.get(obj_class)
+        if tier is None:
+            tier = self._classify(normalize(obj_class))
+            if len(self._memo) >= _MEMO_MAX_SIZE:
+                self._memo.clear()
+            self._memo[obj_class] = tier
+        return tier
+
+    def _classify(self, name):
+        tier = self.exact.get(name)
+        if tier is not None:
+            return tier
+        for tier, regex in self.contains:
+            if regex.search(name):
+                return tier
+        return 'normal'
+
+
+def build_taxonomy(rules=()):
+    """
+    Built-in rules overridden by ObjectRiskRule rows (same pattern = replaced)
+
+    Args:
+        rules (iterable): Active ObjectRiskRule instances
+
+    Returns:
+        RiskTaxonomy: Taxonomy
+    """
+    by_pattern = {}
+    for tier, patterns in DEFAULT_CONTAINS_RULES.items():
+        for pattern in patterns:
+            by_pattern[normalize(pattern)] = ('contains', tier)
+    for pattern, tier in DEFAULT_EXACT_RULES.items():
+        by_pattern[normalize(pattern)] = ('exact', tier)
+    for rule in rules:
+        by_pattern[normalize(rule.pattern)] = (rule.match_type, rule.tier)
+
+    exact, contains = {}, {}
+    for pattern, (match_type, tier) in by_pattern.items():
+        if match_type == 'exact':
+            exact[pattern] = tier
+        else:
+            contains.setdefault(tier, []).append(pattern)
+    return RiskTaxonomy(exact, contains)
+
+
+# Instance globale
+_taxonomy = None
+_taxonomy_loaded_at = 0.0
+_taxonomy_lock = Lock()
+
+
+def get_taxonomy():
+    """
+    Returns (or builds) the shared taxonomy, including the database rules
+
+    Returns:
+        RiskTaxonomy: Taxonomy
+    """
+    global _taxonomy, _taxonomy_loaded_at
+    ttl = getattr(settings, 'RISK_TAXONOMY_TTL', 60)
+    if _taxonomy is None or time.monotonic() - _taxonomy_loaded_at > ttl:
+        with _taxonomy_lock:
+            if _taxonomy is None or time.monotonic() - _taxonomy_loaded_at > ttl:
+                from .models import ObjectRiskRule
+
+                _taxonomy = build_taxonomy(ObjectRiskRule.objects.filter(is_active=True))
+                _taxonomy_loaded_at = time.monotonic()
+    return _taxonomy
+
+
+def invalidate():
+    """Drop the shared taxonomy (a rule changed)"""
+    global _taxonomy
+    with _taxonomy_lock:
+        _taxonomy = None
+
+
+def classify(obj_class):
+    """Risk tier of an object class"""
+    return get_taxonomy().tier(obj_class)
+
+
+def is_high_risk(obj_class):
+    return classify(obj_class) == 'high_risk'
+
+
+def is_suspicious(obj_class):
+    """Suspicious or worse (high-risk objects are also suspicious)"""
+    return classify(obj_class) in ('high_risk', 'suspicious')
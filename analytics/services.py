@@ -1,11 +1,12 @@
 """
 Analytics Services - Business logic for detection analytics
 """
-from django.db.models import Count, Avg, Sum, Q
+from django.db.models import Count, Avg, Sum, Min, Max, Q
+from django.db.models.functions import ExtractHour, Lower
 from django.utils import timezone
 from datetime import timedelta, datetime
-from collections import defaultdict
-from detection.models import DetectionResult
+from detection.models import DetectionResult, DetectedObject
+from .risk_taxonomy import classify, is_high_risk, is_suspicious
 from .models import (
     DetectionAnalytics, 
     ObjectTrend, 
@@ -15,21 +16,6 @@ from .models import (
 import json
 
 
-# Objets considérés comme suspects/à risque
-SUSPICIOUS_OBJECTS = [
-    'knife', 'scissors', 'gun', 'weapon', 'fire',
-    'broken glass', 'crowbar', 'bat'
-]
-
-HIGH_RISK_OBJECTS = [
-    'gun', 'weapon', 'fire', 'knife'
-]
-
-# Objets de surveillance (sévérité MEDIUM pour SMS)
-MONITORED_OBJECTS = [
-    'person', 'car', 'dog', 'cat', 'motorcycle', 'truck'
-]
-
 # Heures normales d'activité (8h-22h)
 NORMAL_ACTIVITY_HOURS = range(8, 22)
 
@@ -72,35 +58,33 @@ class AnalyticsEngine:
             uploaded_at__lt=period_end
         )
         
-        # Calculer les statistiques
-        total_detections = detections.count()
-        total_objects = sum(d.objects_detected for d in detections)
+        # Calculer les statistiques (agrégées en base)
+        totals = detections.aggregate(count=Count('id'), objects=Sum('objects_detected'))
+        total_detections = totals['count']
+        total_objects = totals['objects'] or 0
         avg_objects = total_objects / total_detections if total_detections > 0 else 0
         
-        # Analyser les objets par classe
-        objects_by_class = defaultdict(int)
-        detections_by_hour = defaultdict(int)
-        suspicious_count = 0
-        high_risk_count = 0
+        # Objets par classe (DetectedObject) et détections par heure
+        objects_by_class = dict(
+            DetectedObject.objects.filter(user=user, detected_at__gte=period_start, detected_at__lt=period_end)
+            .values(obj_class=Lower('object_class')).annotate(count=Count('id'))
+            .values_list('obj_class', 'count')
+        )
+        detections_by_hour = {
+            str(hour): count for hour, count in
+            detections.order_by().values(hour=ExtractHour('uploaded_at')).annotate(count=Count('id'))
+            .values_list('hour', 'count')
+        }
         
-        for detection in detections:
-            # Heure de détection
-            hour = detection.uploaded_at.hour
-            detections_by_hour[str(hour)] += 1
-            
-            # Analyser les objets détectés
-            detection_data = detection.get_detection_data()
-            for obj in detection_data:
-                obj_class = obj.get('class', 'unknown').lower()
-                objects_by_class[obj_class] += 1
-                
-                # Vérifier si l'objet est suspect
-                if any(suspect in obj_class for suspect in SUSPICIOUS_OBJECTS):
-                    suspicious_count += 1
-                
-                # Vérifier si l'objet est à haut risque
-                if any(risk in obj_class for risk in HIGH_RISK_OBJECTS):
-                    high_risk_count += 1
+        # Objets suspects / à haut risque, comptés par classe
+        suspicious_count = sum(
+            count for obj_class, count in objects_by_class.items()
+            if is_suspicious(obj_class)
+        )
+        high_risk_count = sum(
+            count for obj_class, count in objects_by_class.items()
+            if is_high_risk(obj_class)
+        )
         
         # Créer ou mettre à jour l'analytics
         analytics, created = DetectionAnalytics.objects.update_or_create(
@@ -118,6 +102,7 @@ class AnalyticsEngine:
                 'high_risk_detections': high_risk_count,
             }
         )
+        analytics.rebuild_counters(detections_by_hour, objects_by_class)
         
         return analytics
     
@@ -126,43 +111,32 @@ class AnalyticsEngine:
         """
         Update object trends based on recent detections
         """
-        # Analyser les 30 derniers jours
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        recent_detections = DetectionResult.objects.filter(
-            user=user,
-            uploaded_at__gte=thirty_days_ago
-        )
+        # Analyser les 30 derniers jours, par classe, en une requête
+        now = timezone.now()
+        thirty_days_ago = now - timedelta(days=30)
+        midpoint = now - timedelta(days=15)
         
-        # Compter les occurrences par classe
-        object_counts = defaultdict(lambda: {
-            'count': 0,
-            'first': None,
-            'last': None,
-            'timestamps': []
-        })
-        
-        for detection in recent_detections:
-            detection_data = detection.get_detection_data()
-            for obj in detection_data:
-                obj_class = obj.get('class', 'unknown')
-                object_counts[obj_class]['count'] += 1
-                object_counts[obj_class]['timestamps'].append(detection.uploaded_at)
-                
-                if object_counts[obj_class]['first'] is None:
-                    object_counts[obj_class]['first'] = detection.uploaded_at
-                object_counts[obj_class]['last'] = detection.uploaded_at
+        object_counts = DetectedObject.objects.filter(
+            user=user,
+            detected_at__gte=thirty_days_ago
+        ).values('object_class').annotate(
+            count=Count('id'),
+            first=Min('detected_at'),
+            last=Max('detected_at'),
+            recent=Count('id', filter=Q(detected_at__gte=midpoint)),
+            unusual_hours=Count('id', filter=~Q(detected_at__hour__in=list(NORMAL_ACTIVITY_HOURS))),
+        ).order_by()
         
         # Mettre à jour les tendances
-        for obj_class, data in object_counts.items():
-            if data['count'] == 0:
-                continue
+        for data in object_counts:
+            obj_class = data['object_class']
             
-            # Calculer la tendance
-            trend_direction = AnalyticsEngine._calculate_trend(data['timestamps'])
+            # Calculer la tendance (15 premiers jours vs 15 derniers)
+            trend_direction = AnalyticsEngine._calculate_trend(data['count'] - data['recent'], data['recent'])
             
             # Détecter les anomalies
             is_anomaly, anomaly_score = AnalyticsEngine._detect_anomaly(
-                obj_class, data['count'], data['timestamps']
+                obj_class, data['count'], data['unusual_hours']
             )
             
             # Créer ou mettre à jour la tendance
@@ -180,18 +154,13 @@ class AnalyticsEngine:
             )
     
     @staticmethod
-    def _calculate_trend(timestamps):
+    def _calculate_trend(first_half_count, second_half_count):
         """
-        Calculate trend direction based on timestamps
+        Calculate trend direction from the detections of two consecutive periods
         """
-        if len(timestamps) < 3:
+        if first_half_count + second_half_count < 3:
             return 'stable'
         
-        # Diviser en deux périodes
-        mid_point = len(timestamps) // 2
-        first_half_count = mid_point
-        second_half_count = len(timestamps) - mid_point
-        
         # Comparer les deux périodes
         if second_half_count > first_half_count * 1.5:
             return 'increasing'
@@ -201,12 +170,17 @@ class AnalyticsEngine:
             return 'stable'
     
     @staticmethod
-    def _detect_anomaly(obj_class, count, timestamps):
+    def _detect_anomaly(obj_class, count, unusual_hours):
         """
         Detect anomalies in detection patterns
+        
+        Args:
+            obj_class: Object class
+            count: Detections of the class
+            unusual_hours: Detections outside NORMAL_ACTIVITY_HOURS
         """
         # Anomalie si objet à haut risque détecté
-        if any(risk in obj_class.lower() for risk in HIGH_RISK_OBJECTS):
+        if is_high_risk(obj_class):
             return True, 0.9
         
         # Anomalie si détection fréquente inhabituelle
@@ -214,8 +188,7 @@ class AnalyticsEngine:
             return True, 0.7
         
         # Anomalie si détections à des heures inhabituelles
-        unusual_hours = sum(1 for ts in timestamps if ts.hour not in NORMAL_ACTIVITY_HOURS)
-        if unusual_hours > len(timestamps) * 0.5:
+        if unusual_hours > count * 0.5:
             return True, 0.6
         
         return False, 0.0
@@ -298,23 +271,24 @@ class SecurityAlertService:
         for obj in detection_data:
             obj_class = obj.get('class', 'unknown').lower()
             confidence = obj.get('confidence', 0)
+            tier = classify(obj_class)
             
             # Objet à haut risque
-            if any(risk in obj_class for risk in HIGH_RISK_OBJECTS):
+            if tier == 'high_risk':
                 high_risk_objects.append({
                     'class': obj_class,
                     'confidence': confidence
                 })
             
             # Objet suspect
-            elif any(suspect in obj_class for suspect in SUSPICIOUS_OBJECTS):
+            elif tier == 'suspicious':
                 suspicious_objects.append({
                     'class': obj_class,
                     'confidence': confidence
                 })
             
             # Objet sous surveillance
-            elif any(monitor in obj_class for monitor in MONITORED_OBJECTS):
+            elif tier == 'monitored':
                 monitored_objects.append({
                     'class': obj_class,
                     'confidence': confidence
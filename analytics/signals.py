@@ -2,12 +2,15 @@
 Django Signals for Automatic Integration
 Detection -> Analytics -> Notifications Pipeline
 """
-from django.db.models.signals import post_save
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
+from collections import Counter
 from detection.models import DetectionResult
-from .services import AnalyticsEngine, SecurityAlertService
+from .jobs import enqueue_on_commit
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +19,7 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=DetectionResult)
 def process_detection_analytics(sender, instance, created, **kwargs):
     """
-    Process analytics and alerts when a new detection is created
+    Queue analytics and alerts processing when a new detection is created
     Enhanced with ML anomaly detection and intelligent notifications
     """
     print(f"🔔 SIGNAL TRIGGERED - Detection #{instance.id}, created={created}, objects={instance.objects_detected}")
@@ -34,198 +37,159 @@ def process_detection_analytics(sender, instance, created, **kwargs):
     # Marquer comme traité
     instance._analytics_processed = True
     
-    logger.info(f"Processing new detection: {instance.id}")
+    logger.info(f"Queueing analytics for detection: {instance.id}")
     
-    try:
-        # 1. Mettre à jour les analytics quotidiennes
-        _update_analytics(instance)
-        
-        # 2. Analyser pour alertes de sécurité
-        SecurityAlertService.analyze_detection(instance)
-        
-        # 3. Vérifier les anomalies ML
-        _check_for_anomalies(instance)
-        
-        # 4. Analyser les objets suspects
-        _analyze_suspicious_objects(instance)
-        
-        # 5. Mettre à jour les tendances
-        _update_object_trends(instance)
-        
-    except Exception as e:
-        logger.error(f"Error processing detection {instance.id}: {e}")
+    # Le pipeline (analytics, alertes, anomalies, objets suspects, tendances)
+    # tourne hors de la requête: un AnalyticsJob est créé une fois la
+    # transaction validée, puis traité par analytics_worker (voir analytics/jobs.py)
+    enqueue_on_commit(instance.id)
 
 
 def _update_analytics(detection):
-    """Met à jour les analytics quotidiennes"""
-    from analytics.models import DetectionAnalytics
+    """
+    Met à jour les analytics quotidiennes
+    Compteurs incrémentés en base (F()), sans lecture-modification-écriture du JSON
+    """
+    from analytics.models import DetectionAnalytics, AnalyticsHourCount, AnalyticsClassCount
     
-    try:
-        today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        analytics, created = DetectionAnalytics.objects.get_or_create(
-            user=detection.user,
-            period_type='daily',
-            period_start=today,
-            defaults={
-                'period_end': today + timedelta(days=1),
-                'total_detections': 0,
-                'total_objects_detected': 0,
-                'avg_objects_per_detection': 0.0,
-            }
-        )
-        
-        # Mettre à jour les compteurs
-        analytics.total_detections += 1
-        analytics.total_objects_detected += detection.objects_detected
-        analytics.avg_objects_per_detection = analytics.total_objects_detected / analytics.total_detections
-        
-        # Mettre à jour les détections par heure
-        hour = detection.uploaded_at.hour
-        detections_by_hour = analytics.get_detections_by_hour()
-        detections_by_hour[str(hour)] = detections_by_hour.get(str(hour), 0) + 1
-        analytics.set_detections_by_hour(detections_by_hour)
-        
-        # Mettre à jour les objets par classe
-        objects_by_class = analytics.get_objects_by_class()
-        detection_data = detection.get_detection_data()
-        
-        for obj in detection_data:
-            obj_class = obj.get('class', 'unknown')
-            objects_by_class[obj_class] = objects_by_class.get(obj_class, 0) + 1
-        
-        analytics.set_objects_by_class(objects_by_class)
-        analytics.save()
-        
-        logger.info(f"Analytics updated for detection {detection.id}")
-        
-    except Exception as e:
-        logger.error(f"Failed to update analytics: {e}")
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    analytics, created = DetectionAnalytics.objects.get_or_create(
+        user=detection.user,
+        period_type='daily',
+        period_start=today,
+        defaults={
+            'period_end': today + timedelta(days=1),
+            'total_detections': 0,
+            'total_objects_detected': 0,
+            'avg_objects_per_detection': 0.0,
+        }
+    )
+    
+    # Mettre à jour les compteurs (la moyenne est calculée à partir des anciennes valeurs de la ligne)
+    objects = detection.objects_detected
+    DetectionAnalytics.objects.filter(pk=analytics.pk).update(
+        total_detections=F('total_detections') + 1,
+        total_objects_detected=F('total_objects_detected') + objects,
+        avg_objects_per_detection=Cast(F('total_objects_detected') + objects, FloatField()) / (F('total_detections') + 1),
+        updated_at=timezone.now(),
+    )
+    
+    # Mettre à jour les détections par heure
+    AnalyticsHourCount.increment(analytics_id=analytics.pk, hour=detection.uploaded_at.hour)
+    
+    # Mettre à jour les objets par classe
+    objects_by_class = Counter(obj.get('class', 'unknown') for obj in detection.get_detection_data())
+    for obj_class, count in objects_by_class.items():
+        AnalyticsClassCount.increment(count, analytics_id=analytics.pk, object_class=obj_class)
+    
+    logger.info(f"Analytics updated for detection {detection.id}")
 
 
 def _check_for_anomalies(detection):
-    """Vérifie si la détection est une anomalie"""
+    """Vérifie si la détection est une anomalie (score du modèle persisté de l'utilisateur)"""
     from analytics.models import SecurityAlert
-    from analytics.ml_models import AnomalyDetector
+    from analytics.anomaly_models import score_detection
     
-    try:
-        recent_detections = DetectionResult.objects.filter(
-            user=detection.user,
-            uploaded_at__gte=timezone.now() - timedelta(days=7)
-        ).order_by('uploaded_at')
-        
-        if recent_detections.count() < 10:
-            return
-        
-        detector = AnomalyDetector()
-        result = detector.detect_anomalies(recent_detections)
-        
-        detection_ids = [a['detection_id'] for a in result.get('anomalies', [])]
-        
-        if detection.id in detection_ids:
-            anomaly_info = next(a for a in result['anomalies'] if a['detection_id'] == detection.id)
-            
-            alert = SecurityAlert.objects.create(
-                user=detection.user,
-                detection=detection,
-                alert_type='anomaly',
-                severity='high' if anomaly_info['anomaly_score'] > 0.8 else 'medium',
-                title='Anomalous Detection Pattern',
-                message=f"Unusual detection pattern: {anomaly_info['reason']}",
-            )
-            alert.set_context_data({
-                'anomaly_score': anomaly_info['anomaly_score'],
-                'features': anomaly_info['features'],
-                'reason': anomaly_info['reason']
-            })
-            alert.save()
-            
-            logger.info(f"Anomaly alert created for detection {detection.id}")
-            # Notification envoyée automatiquement via le signal post_save
+    # Pas de réentraînement ici: le modèle est seulement évalué (voir retrain_ml_models)
+    anomaly_info = score_detection(detection)
     
-    except Exception as e:
-        logger.error(f"Anomaly check failed: {e}")
+    if anomaly_info and anomaly_info['is_anomaly']:
+        alert = SecurityAlert.objects.create(
+            user=detection.user,
+            detection=detection,
+            alert_type='anomaly',
+            severity='high' if anomaly_info['anomaly_score'] > 0.8 else 'medium',
+            title='Anomalous Detection Pattern',
+            message=f"Unusual detection pattern: {anomaly_info['reason']}",
+        )
+        alert.set_context_data({
+            'anomaly_score': anomaly_info['anomaly_score'],
+            'features': anomaly_info['features'],
+            'reason': anomaly_info['reason'],
+            'engine': anomaly_info['engine'],
+            'model_version': anomaly_info['model_version'],
+        })
+        alert.save()
+        
+        logger.info(f"Anomaly alert created for detection {detection.id}")
+        # Notification envoyée automatiquement via le signal post_save
 
 
 def _analyze_suspicious_objects(detection):
     """Analyse les objets suspects"""
     from analytics.models import SecurityAlert
+    from analytics.risk_taxonomy import classify
     
-    SUSPICIOUS_OBJECTS = ['gun', 'weapon', 'knife', 'fire', 'scissors', 'crowbar']
-    HIGH_RISK_OBJECTS = ['gun', 'weapon', 'fire']
+    detection_data = detection.get_detection_data()
+    suspicious_objects = []
+    has_high_risk = False
     
-    try:
-        detection_data = detection.get_detection_data()
-        suspicious_objects = []
+    for obj in detection_data:
+        tier = classify(obj.get('class', ''))
+        if tier in ('high_risk', 'suspicious'):
+            suspicious_objects.append(obj)
+            has_high_risk = has_high_risk or tier == 'high_risk'
+    
+    if suspicious_objects:
+        severity = 'critical' if has_high_risk else 'high'
         
-        for obj in detection_data:
-            obj_class = obj.get('class', '').lower()
-            if any(suspect in obj_class for suspect in SUSPICIOUS_OBJECTS):
-                suspicious_objects.append(obj)
+        alert = SecurityAlert.objects.create(
+            user=detection.user,
+            detection=detection,
+            alert_type='suspicious_object',
+            severity=severity,
+            title=f'Suspicious Object: {suspicious_objects[0]["class"]}',
+            message=f'Detected {len(suspicious_objects)} suspicious object(s).',
+        )
+        alert.set_context_data({'suspicious_objects': suspicious_objects})
+        alert.save()
         
-        if suspicious_objects:
-            has_high_risk = any(
-                any(risk in obj.get('class', '').lower() for risk in HIGH_RISK_OBJECTS)
-                for obj in suspicious_objects
-            )
-            
-            severity = 'critical' if has_high_risk else 'high'
-            
-            alert = SecurityAlert.objects.create(
-                user=detection.user,
-                detection=detection,
-                alert_type='suspicious_object',
-                severity=severity,
-                title=f'Suspicious Object: {suspicious_objects[0]["class"]}',
-                message=f'Detected {len(suspicious_objects)} suspicious object(s).',
-            )
-            alert.set_context_data({'suspicious_objects': suspicious_objects})
-            alert.save()
-            
-            # Notification envoyée automatiquement via le signal post_save
-    
-    except Exception as e:
-        logger.error(f"Suspicious object analysis failed: {e}")
+        # Notification envoyée automatiquement via le signal post_save
 
 
 def _update_object_trends(detection):
     """Met à jour les tendances d'objets"""
     from analytics.models import ObjectTrend
     
-    try:
-        detection_data = detection.get_detection_data()
+    detection_data = detection.get_detection_data()
+    
+    for obj in detection_data:
+        obj_class = obj.get('class', 'unknown')
+        
+        trend, created = ObjectTrend.objects.get_or_create(
+            user=detection.user,
+            object_class=obj_class,
+            defaults={
+                'first_detected': detection.uploaded_at,
+                'last_detected': detection.uploaded_at,
+                'detection_count': 1,
+            }
+        )
         
-        for obj in detection_data:
-            obj_class = obj.get('class', 'unknown')
+        if not created:
+            trend.last_detected = detection.uploaded_at
+            trend.detection_count += 1
+            
+            days_active = (trend.last_detected - trend.first_detected).days + 1
+            avg_per_day = trend.detection_count / max(days_active, 1)
             
-            trend, created = ObjectTrend.objects.get_or_create(
-                user=detection.user,
-                object_class=obj_class,
-                defaults={
-                    'first_detected': detection.uploaded_at,
-                    'last_detected': detection.uploaded_at,
-                    'detection_count': 1,
-                }
-            )
+            if avg_per_day > 5:
+                trend.trend_direction = 'increasing'
+            elif avg_per_day < 1:
+                trend.trend_direction = 'decreasing'
+            else:
+                trend.trend_direction = 'stable'
             
-            if not created:
-                trend.last_detected = detection.uploaded_at
-                trend.detection_count += 1
-                
-                days_active = (trend.last_detected - trend.first_detected).days + 1
-                avg_per_day = trend.detection_count / max(days_active, 1)
-                
-                if avg_per_day > 5:
-                    trend.trend_direction = 'increasing'
-                elif avg_per_day < 1:
-                    trend.trend_direction = 'decreasing'
-                else:
-                    trend.trend_direction = 'stable'
-                
-                trend.save()
+            trend.save()
+
+
+@receiver([post_save, post_delete], sender='analytics.ObjectRiskRule')
+def invalidate_risk_taxonomy(sender, **kwargs):
+    """Rebuild the object risk taxonomy after a rule change"""
+    from analytics.risk_taxonomy import invalidate
     
-    except Exception as e:
-        logger.error(f"Trend update failed: {e}")
+    invalidate()
 
 
 def _create_notification_from_alert(alert):
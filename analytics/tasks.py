@@ -152,3 +152,35 @@ def evaluate_prediction_accuracy():
         
         except Exception as e:
             logger.error(f"Failed to evaluate predictions for {user.username}: {e}")
+
+
+@shared_task
+def retrain_ml_models():
+    """
+    Retrain stale per-user anomaly models
+    Run hourly (models older than ANALYTICS_ANOMALY_MAX_AGE_HOURS or having
+    scored ANALYTICS_ANOMALY_RETRAIN_AFTER detections are retrained)
+    """
+    from analytics.anomaly_models import retrain_stale_models
+    
+    retrained = retrain_stale_models()
+    logger.info(f"Retrained {retrained} anomaly model(s)")
+    return retrained
+
+
+@shared_task
+def process_analytics_job(job_id):
+    """
+    Run one queued AnalyticsJob (ANALYTICS_JOB_BACKEND = 'celery')
+    Retries are rescheduled at the job's run_after
+    """
+    from analytics.jobs import run_job
+    from analytics.models import AnalyticsJob
+    
+    status = run_job(job_id)
+    
+    if status == 'pending' and CELERY_AVAILABLE:
+        run_after = AnalyticsJob.objects.values_list('run_after', flat=True).get(pk=job_id)
+        process_analytics_job.apply_async((job_id,), eta=run_after)
+    
+    return status
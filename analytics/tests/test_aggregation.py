@@ -0,0 +1,81 @@
+"""
+Tests des agrégations en base sur DetectedObject
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from detection.models import DetectionResult
+from analytics.models import ObjectTrend, SecurityAlert
+from analytics.services import AnalyticsEngine
+from analytics.pattern_recognition import PatternRecognizer
+from analytics.ai_reports import AIReportGenerator
+from analytics.ai_recommendation_system import AdvancedRecommendationEngine
+import json
+
+User = get_user_model()
+
+
+class DetectedObjectAggregationTests(TestCase):
+    """Résultats des analyses calculés par values().annotate() au lieu du JSON"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='agguser', password='test123')
+        for objects in (['person', 'car'], ['person', 'Knife'], ['person', 'car'], ['person', 'car', 'car']):
+            self.create_detection(objects)
+    
+    def create_detection(self, objects_list):
+        detection_data = [{'class': obj, 'confidence': 0.5, 'box': [0, 0, 10, 10]} for obj in objects_list]
+        return DetectionResult.objects.create(
+            user=self.user,
+            original_image='detections/original/agg.jpg',
+            objects_detected=len(objects_list),
+            detection_data=json.dumps(detection_data),
+        )
+    
+    def test_period_analytics(self):
+        analytics = AnalyticsEngine.generate_period_analytics(self.user, 'daily')
+        
+        self.assertEqual(analytics.total_detections, 4)
+        self.assertEqual(analytics.total_objects_detected, 9)
+        self.assertEqual(analytics.get_objects_by_class(), {'person': 4, 'car': 4, 'knife': 1})
+        self.assertEqual(sum(analytics.get_detections_by_hour().values()), 4)
+        self.assertEqual(analytics.suspicious_objects_count, 1)
+        self.assertEqual(analytics.high_risk_detections, 1)
+    
+    def test_object_trends(self):
+        AnalyticsEngine.update_object_trends(self.user)
+        
+        trends = {t.object_class: t for t in ObjectTrend.objects.filter(user=self.user)}
+        self.assertEqual(trends['car'].detection_count, 4)
+        self.assertEqual(trends['person'].detection_count, 4)
+        self.assertTrue(trends['Knife'].is_anomaly)
+    
+    def test_object_associations(self):
+        detections = DetectionResult.objects.filter(user=self.user)
+        result = PatternRecognizer(self.user).identify_object_associations(detections)
+        
+        pairs = {(a['object_1'], a['object_2']): a['cooccurrence_count'] for a in result['associations']}
+        self.assertEqual(pairs, {('car', 'person'): 3})
+    
+    def test_report_trends(self):
+        detections = DetectionResult.objects.filter(user=self.user).order_by('uploaded_at')
+        trends = AIReportGenerator(self.user)._analyze_trends(detections)
+        
+        top = {o['name']: o for o in trends['top_objects']}
+        self.assertEqual(top['car']['count'], 4)
+        self.assertEqual(top['person']['avg_confidence'], 0.5)
+        self.assertEqual(sum(trends['hourly_distribution'].values()), 4)
+        self.assertEqual(sum(trends['daily_distribution'].values()), 4)
+    
+    def test_recommendation_profile_and_risk(self):
+        detections = DetectionResult.objects.filter(user=self.user)
+        # Hors des heures de nuit pour ne compter que le facteur objets dangereux
+        detections.update(uploaded_at=timezone.now().replace(hour=12))
+        alerts = SecurityAlert.objects.filter(user=self.user)
+        engine = AdvancedRecommendationEngine(self.user)
+        engine._build_behavior_profile(detections, alerts)
+        engine._calculate_risk_score(detections, alerts)
+        
+        self.assertEqual(engine.behavior_profile['common_objects'][:2], [('car', 4), ('person', 4)])
+        # 'Knife' compté malgré la casse : 10 points d'objet dangereux
+        self.assertEqual(engine.risk_score, 10)
@@ -0,0 +1,100 @@
+"""
+Tests des modèles d'anomalies persistés (analytics/anomaly_models.py)
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from datetime import timedelta
+from detection.models import DetectionResult
+from analytics.models import UserAnomalyModel
+from analytics import anomaly_models
+import json
+
+User = get_user_model()
+
+
+@override_settings(ANALYTICS_ANOMALY_ENGINE='robust_zscore')
+class RobustZScoreAnomalyTests(TestCase):
+    """Entraînement au premier usage, puis score seulement"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='anomalyuser', password='test123')
+        base = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        for i in range(30):
+            detection = self.create_detection(['person'] * (1 + i % 2))
+            DetectionResult.objects.filter(pk=detection.pk).update(
+                uploaded_at=base - timedelta(days=i % 5, hours=i % 4)
+            )
+    
+    def create_detection(self, objects_list):
+        detection_data = [{'class': obj, 'confidence': 0.9, 'box': [0, 0, 100, 100]} for obj in objects_list]
+        return DetectionResult.objects.create(
+            user=self.user,
+            original_image='detections/original/anomaly.jpg',
+            objects_detected=len(objects_list),
+            detection_data=json.dumps(detection_data),
+        )
+    
+    def test_trained_once_then_scored(self):
+        normal = self.create_detection(['person'])
+        result = anomaly_models.score_detection(normal)
+        
+        record = UserAnomalyModel.objects.get(user=self.user)
+        self.assertEqual(record.engine, 'robust_zscore')
+        self.assertEqual(record.version, 1)
+        self.assertEqual(record.samples_trained, 30)
+        self.assertEqual(record.scored_since_training, 1)
+        self.assertEqual(result['model_version'], 1)
+        
+        crowd = self.create_detection(['person'] * 15)
+        result = anomaly_models.score_detection(crowd)
+        
+        self.assertTrue(result['is_anomaly'])
+        self.assertIn('object count', result['reason'])
+        # Aucun réentraînement à l'évaluation
+        record.refresh_from_db()
+        self.assertEqual(record.version, 1)
+        self.assertEqual(record.scored_since_training, 2)
+    
+    def test_staleness(self):
+        anomaly_models.score_detection(self.create_detection(['person']))
+        record = UserAnomalyModel.objects.get(user=self.user)
+        self.assertFalse(record.is_stale())
+        self.assertTrue(record.is_stale(max_scored=1))
+        
+        UserAnomalyModel.objects.update(trained_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(anomaly_models.retrain_stale_models(), 1)
+        record.refresh_from_db()
+        self.assertEqual(record.version, 2)
+        self.assertEqual(record.scored_since_training, 0)
+    
+    def test_insufficient_history(self):
+        other = User.objects.create_user(username='newuser', password='test123')
+        detection = DetectionResult.objects.create(
+            user=other, original_image='detections/original/anomaly.jpg', objects_detected=1,
+        )
+        self.assertIsNone(anomaly_models.score_detection(detection))
+        self.assertFalse(UserAnomalyModel.objects.filter(user=other).exists())
+    
+    def test_online_update(self):
+        X = anomaly_models.np.array([[0.0], [1.0], [2.0], [1.0], [1.0]])
+        model = anomaly_models.RobustZScoreModel.fit(X)
+        self.assertEqual(model.median[0], 1.0)
+        
+        for _ in range(500):
+            model.update(anomaly_models.np.array([5.0]))
+        # La médiane suit la nouvelle distribution
+        self.assertGreater(model.median[0], 4.5)
+        restored = anomaly_models.RobustZScoreModel.from_state(model.to_state())
+        self.assertEqual(restored.median.tolist(), model.median.tolist())
+    
+    def test_signed_model_data(self):
+        data = anomaly_models._dump_model({'median': [1.0]})
+        self.assertEqual(anomaly_models._load_model(data), {'median': [1.0]})
+        
+        # Un pickle écrit sans la clé (accès direct à la base) n'est pas désérialisé
+        tampered = data[:anomaly_models._SIGNATURE_SIZE] + anomaly_models.pickle.dumps({'median': [2.0]})
+        with self.assertRaises(ValueError):
+            anomaly_models._load_model(tampered)
+        with self.assertRaises(ValueError):
+            anomaly_models._load_model(anomaly_models.pickle.dumps({'median': [1.0]}))
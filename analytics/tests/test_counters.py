@@ -0,0 +1,63 @@
+"""
+Tests des compteurs atomiques de DetectionAnalytics
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from detection.models import DetectionResult
+from analytics.models import DetectionAnalytics, AnalyticsHourCount, AnalyticsClassCount
+from analytics.signals import _update_analytics
+import json
+
+User = get_user_model()
+
+
+class AnalyticsCounterTests(TestCase):
+    """Incréments F() par heure et par classe"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='counteruser', password='test123')
+    
+    def create_detection(self, objects_list):
+        detection_data = [{'class': obj, 'confidence': 0.9, 'box': [0, 0, 100, 100]} for obj in objects_list]
+        return DetectionResult.objects.create(
+            user=self.user,
+            original_image='detections/original/counter.jpg',
+            objects_detected=len(objects_list),
+            detection_data=json.dumps(detection_data),
+        )
+    
+    def test_counters_accumulate(self):
+        first = self.create_detection(['person', 'person', 'car'])
+        second = self.create_detection(['person'])
+        _update_analytics(first)
+        _update_analytics(second)
+        
+        analytics = DetectionAnalytics.objects.get(user=self.user, period_type='daily')
+        self.assertEqual(analytics.total_detections, 2)
+        self.assertEqual(analytics.total_objects_detected, 4)
+        self.assertAlmostEqual(analytics.avg_objects_per_detection, 2.0)
+        self.assertEqual(analytics.get_objects_by_class(), {'person': 3, 'car': 1})
+        self.assertEqual(analytics.get_detections_by_hour(), {str(first.uploaded_at.hour): 2})
+        self.assertEqual(AnalyticsClassCount.objects.filter(analytics=analytics).count(), 2)
+    
+    def test_increment_existing_and_new(self):
+        analytics = DetectionAnalytics.objects.create(
+            user=self.user, period_type='daily',
+            period_start=timezone.now(), period_end=timezone.now(),
+        )
+        AnalyticsHourCount.increment(analytics_id=analytics.pk, hour=3)
+        AnalyticsHourCount.increment(2, analytics_id=analytics.pk, hour=3)
+        self.assertEqual(AnalyticsHourCount.objects.get(analytics=analytics, hour=3).count, 3)
+    
+    def test_rebuild_counters(self):
+        _update_analytics(self.create_detection(['dog']))
+        analytics = DetectionAnalytics.objects.get(user=self.user)
+        
+        analytics.rebuild_counters({'7': 4}, {'cat': 2})
+        self.assertEqual(analytics.get_detections_by_hour(), {'7': 4})
+        self.assertEqual(analytics.get_objects_by_class(), {'cat': 2})
+    
+    def test_json_fallback(self):
+        analytics = DetectionAnalytics(objects_by_class='{"bus": 1}')
+        self.assertEqual(analytics.get_objects_by_class(), {'bus': 1})
@@ -0,0 +1,155 @@
+"""
+Tests de la file AnalyticsJob (analytics/jobs.py)
+"""
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from unittest import mock
+from detection.models import DetectionResult
+from analytics.models import AnalyticsJob, DetectionAnalytics, ObjectTrend
+from analytics import jobs
+from analytics import signals
+from datetime import timedelta
+from django.utils import timezone
+import json
+
+User = get_user_model()
+
+
+@override_settings(ANALYTICS_JOB_BACKEND='db', ANALYTICS_JOB_RETRY_DELAY=0)
+class AnalyticsJobTests(TestCase):
+    """Mise en file au commit, étapes chronométrées, reprise après échec"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='jobuser', password='test123')
+    
+    def create_detection(self, objects_list):
+        detection_data = [{'class': obj, 'confidence': 0.9, 'box': [0, 0, 100, 100]} for obj in objects_list]
+        return DetectionResult.objects.create(
+            user=self.user,
+            original_image='detections/original/job.jpg',
+            objects_detected=len(objects_list),
+            detection_data=json.dumps(detection_data),
+        )
+    
+    def test_enqueued_on_commit_only(self):
+        """Le job n'existe qu'après la validation de la transaction"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            detection = self.create_detection(['person'])
+            self.assertFalse(AnalyticsJob.objects.exists())
+        
+        self.assertEqual(len(callbacks), 1)
+        job = AnalyticsJob.objects.get()
+        self.assertEqual(job.detection, detection)
+        self.assertEqual(job.status, 'pending')
+        
+        # Pas de second job tant que le premier est en attente
+        self.assertIsNone(jobs.enqueue_detection_analytics(detection.id))
+    
+    def test_empty_detection_not_enqueued(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_detection([])
+        self.assertFalse(AnalyticsJob.objects.exists())
+    
+    def test_worker_runs_stages(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_detection(['person', 'car'])
+        
+        claimed = jobs.claim_jobs(10, 'test-worker')
+        self.assertEqual(len(claimed), 1)
+        # Un job réclamé ne peut pas l'être une seconde fois
+        self.assertEqual(jobs.claim_jobs(10, 'other-worker'), [])
+        
+        self.assertEqual(jobs.run_job(claimed[0], claimed=True, worker='test-worker'), 'done')
+        
+        job = AnalyticsJob.objects.get()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(list(job.stage_timings), [name for name, _ in jobs.pipeline_stages()])
+        self.assertEqual(DetectionAnalytics.objects.get(user=self.user).total_detections, 1)
+        self.assertEqual(ObjectTrend.objects.filter(user=self.user).count(), 2)
+        
+        stats = jobs.queue_stats()
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['counts']['done'], 1)
+        self.assertIn('update_analytics', stats['stage_timings_ms'])
+    
+    def test_retry_skips_completed_stages(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_detection(['person'])
+        job = AnalyticsJob.objects.get()
+        
+        with mock.patch('analytics.signals._update_object_trends', side_effect=RuntimeError('db busy')):
+            self.assertEqual(jobs.run_job(job.id), 'pending')
+        
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('db busy', job.last_error)
+        self.assertNotIn('object_trends', job.stage_timings)
+        self.assertIn('update_analytics', job.stage_timings)
+        
+        # La reprise ne rejoue pas les étapes déjà terminées
+        self.assertEqual(jobs.run_job(job.id), 'done')
+        self.assertEqual(DetectionAnalytics.objects.get(user=self.user).total_detections, 1)
+        self.assertEqual(AnalyticsJob.objects.get().attempts, 2)
+    
+    def test_failed_after_max_attempts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_detection(['person'])
+        AnalyticsJob.objects.update(max_attempts=2)
+        job_id = AnalyticsJob.objects.get().id
+        
+        with mock.patch('analytics.signals._update_analytics', side_effect=RuntimeError('boom')):
+            self.assertEqual(jobs.run_job(job_id), 'pending')
+            self.assertEqual(jobs.run_job(job_id), 'failed')
+        
+        self.assertEqual(AnalyticsJob.objects.get().status, 'failed')
+    
+    def test_failed_stage_rolled_back(self):
+        """Une étape qui échoue après avoir écrit ne laisse aucun effet de bord"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_detection(['person'])
+        job_id = AnalyticsJob.objects.get().id
+        
+        update_analytics = signals._update_analytics
+        
+        def update_then_fail(detection):
+            update_analytics(detection)
+            raise RuntimeError('crash after write')
+        
+        with mock.patch('analytics.signals._update_analytics', side_effect=update_then_fail):
+            self.assertEqual(jobs.run_job(job_id), 'pending')
+        self.assertFalse(DetectionAnalytics.objects.filter(user=self.user, total_detections__gt=0).exists())
+        
+        self.assertEqual(jobs.run_job(job_id), 'done')
+        self.assertEqual(DetectionAnalytics.objects.get(user=self.user).total_detections, 1)
+    
+    def test_worker_stops_after_losing_lease(self):
+        """Un job repris par requeue_stale n'est pas exécuté deux fois"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_detection(['person'])
+        job_id = jobs.claim_jobs(10, 'slow-worker')[0]
+        
+        # Aucun checkpoint depuis longtemps: le job est remis en file et repris ailleurs
+        AnalyticsJob.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(timeout=60), 1)
+        self.assertEqual(jobs.claim_jobs(10, 'new-worker'), [job_id])
+        
+        self.assertIsNone(jobs.run_job(job_id, claimed=True, worker='slow-worker'))
+        self.assertEqual(AnalyticsJob.objects.get().stage_timings, {})
+        
+        self.assertEqual(jobs.run_job(job_id, claimed=True, worker='new-worker'), 'done')
+        self.assertEqual(DetectionAnalytics.objects.get(user=self.user).total_detections, 1)
+    
+    def test_thread_backend_runs_outside_the_request(self):
+        """Le backend thread réveille le worker en arrière-plan au lieu d'exécuter le job"""
+        with override_settings(ANALYTICS_JOB_BACKEND='thread'), \
+                mock.patch('analytics.jobs.start_thread_worker') as start_thread_worker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_detection(['person'])
+        
+        start_thread_worker.assert_called_once_with()
+        self.assertEqual(AnalyticsJob.objects.get().status, 'pending')
+        self.assertFalse(DetectionAnalytics.objects.filter(user=self.user).exists())
+        
+        # Même boucle que analytics_worker
+        self.assertEqual([status for _, status in jobs.process_due_jobs(worker='thread-worker')], ['done'])
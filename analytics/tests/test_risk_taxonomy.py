@@ -0,0 +1,52 @@
+"""
+Tests de la taxonomie de risque des objets (analytics/risk_taxonomy.py)
+"""
+from django.test import TestCase
+from analytics.models import ObjectRiskRule
+from analytics import risk_taxonomy
+
+
+class RiskTaxonomyTests(TestCase):
+    """Règles par défaut, surcharges en base et mémoïsation"""
+    
+    def setUp(self):
+        risk_taxonomy.invalidate()
+    
+    def tearDown(self):
+        risk_taxonomy.invalidate()
+    
+    def test_default_tiers(self):
+        classify = risk_taxonomy.classify
+        self.assertEqual(classify('gun'), 'high_risk')
+        self.assertEqual(classify('Kitchen Knife'), 'high_risk')
+        self.assertEqual(classify('person_unknown'), 'high_risk')
+        self.assertEqual(classify('Broken_Glass'), 'suspicious')
+        self.assertEqual(classify('baseball bat'), 'suspicious')
+        self.assertEqual(classify('person'), 'monitored')
+        self.assertEqual(classify('fire hydrant'), 'normal')
+        self.assertEqual(classify('chair'), 'normal')
+        
+        self.assertTrue(risk_taxonomy.is_suspicious('knife'))
+        self.assertFalse(risk_taxonomy.is_high_risk('scissors'))
+    
+    def test_database_rules(self):
+        ObjectRiskRule.objects.create(pattern='scissors', match_type='contains', tier='high_risk')
+        ObjectRiskRule.objects.create(pattern='drone', match_type='exact', tier='suspicious')
+        rule = ObjectRiskRule.objects.create(pattern='cat', match_type='contains', tier='normal')
+        
+        self.assertEqual(risk_taxonomy.classify('scissors'), 'high_risk')
+        self.assertEqual(risk_taxonomy.classify('Drone'), 'suspicious')
+        self.assertEqual(risk_taxonomy.classify('cat'), 'normal')
+        
+        # La suppression d'une règle restaure le comportement par défaut
+        rule.delete()
+        self.assertEqual(risk_taxonomy.classify('cat'), 'monitored')
+    
+    def test_inactive_rules_ignored(self):
+        ObjectRiskRule.objects.create(pattern='person', tier='high_risk', is_active=False)
+        self.assertEqual(risk_taxonomy.classify('person'), 'monitored')
+    
+    def test_memoized(self):
+        taxonomy = risk_taxonomy.build_taxonomy()
+        self.assertEqual(taxonomy.tier('Crowbar'), 'suspicious')
+        self.assertEqual(taxonomy._memo, {'Crowbar': 'suspicious'})
@@ -37,6 +37,7 @@ urlpatterns = [
     path('api/stats/summary/', api_views.api_stats_summary, name='api_stats_summary'),
     path('api/quick-insights/', api_views.api_quick_insights, name='api_quick_insights'),
     path('api/health/', api_views.api_health_check, name='api_health'),
+    path('api/jobs/status/', api_views.api_jobs_status, name='api_jobs_status'),
     
     # Tendances
     path('api/trends/', api_views.api_trends_list, name='api_trends_list'),
@@ -15,3 +15,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'argus.settings')
 
 application = get_asgi_application()
+
+# Load YOLOv5 before the first /detection/ request instead of during it
+from detection.apps import start_detector_warmup
+
+start_detector_warmup()
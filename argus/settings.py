@@ -177,3 +177,48 @@ load_dotenv()
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
+
+# Object detection (YOLOv5)
+DETECTION_BATCH_SIZE = int(os.getenv('DETECTION_BATCH_SIZE', 8))  # Images per forward pass for bulk uploads
+DETECTION_MODEL_DIR = Path(os.getenv('DETECTION_MODEL_DIR', BASE_DIR / 'models' / 'yolov5'))  # Local YOLOv5 code + weights
+DETECTION_ALLOW_HUB_DOWNLOAD = os.getenv('DETECTION_ALLOW_HUB_DOWNLOAD', 'True') == 'True'  # False on air-gapped hosts
+DETECTION_WARMUP_ON_STARTUP = os.getenv('DETECTION_WARMUP_ON_STARTUP', 'True') == 'True'
+DETECTION_BACKEND = os.getenv('DETECTION_BACKEND', 'torch')  # torch, torchscript, onnxruntime or onnxruntime-int8 (see export_detector / quantize_detector)
+SECURITY_INFERENCE_BATCH_SIZE = int(os.getenv('SECURITY_INFERENCE_BATCH_SIZE', 8))  # Frames from different cameras per forward pass
+SECURITY_STREAM_JPEG_QUALITY = int(os.getenv('SECURITY_STREAM_JPEG_QUALITY', 80))  # MJPEG quality, each frame is encoded once for all viewers
+SECURITY_EVENT_LOG = os.getenv('SECURITY_EVENT_LOG', str(MEDIA_ROOT / 'security' / 'detection_log.jsonl'))  # Append-only JSON-lines event log
+SECURITY_EVENT_LOG_MAX_BYTES = int(os.getenv('SECURITY_EVENT_LOG_MAX_BYTES', 10 * 1024 * 1024))  # Rotate at this size...
+SECURITY_EVENT_LOG_ROTATE_SECONDS = int(os.getenv('SECURITY_EVENT_LOG_ROTATE_SECONDS', 86400))  # ...or when the oldest entry is this old
+SECURITY_EVENT_LOG_BACKUPS = int(os.getenv('SECURITY_EVENT_LOG_BACKUPS', 5))  # Rotated files kept (.1 ... .N)
+SECURITY_SNAPSHOT_WORKERS = int(os.getenv('SECURITY_SNAPSHOT_WORKERS', 2))  # Background JPEG encode + write threads
+SECURITY_SNAPSHOT_QUEUE_SIZE = int(os.getenv('SECURITY_SNAPSHOT_QUEUE_SIZE', 64))  # Pending snapshots before new ones are dropped
+SECURITY_SNAPSHOT_JPEG_QUALITY = int(os.getenv('SECURITY_SNAPSHOT_JPEG_QUALITY', 90))
+SECURITY_SNAPSHOT_MIN_INTERVAL = float(os.getenv('SECURITY_SNAPSHOT_MIN_INTERVAL', 5))  # Seconds between snapshots of the same camera/track
+SECURITY_SNAPSHOT_HASH_THRESHOLD = int(os.getenv('SECURITY_SNAPSHOT_HASH_THRESHOLD', 5))  # dHash bits; closer snapshots are skipped as duplicates (-1 disables)
+SECURITY_DETECT_EVERY_N_FRAMES = int(os.getenv('SECURITY_DETECT_EVERY_N_FRAMES', 3))  # Tracker propagates boxes on the frames in between
+SECURITY_TRACK_IOU_THRESHOLD = float(os.getenv('SECURITY_TRACK_IOU_THRESHOLD', 0.3))
+SECURITY_TRACK_MAX_AGE = int(os.getenv('SECURITY_TRACK_MAX_AGE', 30))  # Frames without a match before a track ends
+SECURITY_TRACK_MIN_HITS = int(os.getenv('SECURITY_TRACK_MIN_HITS', 2))  # Matches before a track starts (filters flicker)
+SECURITY_MOTION_GATING = os.getenv('SECURITY_MOTION_GATING', 'False') == 'True'  # Run YOLO only when frame differencing sees change
+SECURITY_MOTION_ROI_CROP = os.getenv('SECURITY_MOTION_ROI_CROP', 'False') == 'True'  # ...and only on the changed region
+SECURITY_MOTION_THRESHOLD = int(os.getenv('SECURITY_MOTION_THRESHOLD', 25))
+SECURITY_MOTION_MIN_AREA = int(os.getenv('SECURITY_MOTION_MIN_AREA', 500))
+SECURITY_MOTION_MAX_IDLE_FRAMES = int(os.getenv('SECURITY_MOTION_MAX_IDLE_FRAMES', 150))  # Forced full-frame detection on still scenes
+FACE_DETECTOR_BACKEND = os.getenv('FACE_DETECTOR_BACKEND', 'yunet')  # yunet (OpenCV DNN) or haar; yunet falls back to haar without a model
+FACE_DETECTOR_MODEL = Path(os.getenv('FACE_DETECTOR_MODEL', BASE_DIR / 'models' / 'face_detection_yunet_2023mar.onnx'))  # From the OpenCV model zoo
+FACE_DETECTOR_SCORE_THRESHOLD = float(os.getenv('FACE_DETECTOR_SCORE_THRESHOLD', 0.8))
+DETECTION_EVENT_SINK_ENABLED = os.getenv('DETECTION_EVENT_SINK_ENABLED', 'True') == 'True'  # Motion events written off the capture thread
+DETECTION_EVENT_FLUSH_INTERVAL = float(os.getenv('DETECTION_EVENT_FLUSH_INTERVAL', 1.0))  # Seconds before queued events are inserted...
+DETECTION_EVENT_BATCH_SIZE = int(os.getenv('DETECTION_EVENT_BATCH_SIZE', 20))  # ...or as soon as this many are queued (one bulk_create)
+DETECTION_EVENT_QUEUE_SIZE = int(os.getenv('DETECTION_EVENT_QUEUE_SIZE', 256))  # Pending events before new ones are dropped
+DETECTION_SETTINGS_POLL_INTERVAL = float(os.getenv('DETECTION_SETTINGS_POLL_INTERVAL', 1.0))  # Seconds between CameraSettings version checks of a running detector
+ANALYTICS_JOB_BACKEND = os.getenv('ANALYTICS_JOB_BACKEND', 'db')  # db (run `python manage.py analytics_worker`, otherwise no analytics/alerts/notifications), thread (background thread of the web process) or celery
+ANALYTICS_JOB_MAX_ATTEMPTS = int(os.getenv('ANALYTICS_JOB_MAX_ATTEMPTS', 5))  # Attempts before a job is marked failed
+ANALYTICS_JOB_RETRY_DELAY = int(os.getenv('ANALYTICS_JOB_RETRY_DELAY', 30))  # Seconds before the first retry, doubled at each attempt
+ANALYTICS_JOB_STALE_SECONDS = int(os.getenv('ANALYTICS_JOB_STALE_SECONDS', 600))  # Running jobs without a stage checkpoint for this long are requeued (dead worker)
+ANALYTICS_JOB_POLL_INTERVAL = float(os.getenv('ANALYTICS_JOB_POLL_INTERVAL', 1.0))  # Seconds between queue polls of the 'thread' backend worker
+ANALYTICS_ANOMALY_ENGINE = os.getenv('ANALYTICS_ANOMALY_ENGINE', 'isolation_forest')  # isolation_forest (persisted, scored only) or robust_zscore (online, no sklearn)
+ANALYTICS_ANOMALY_HISTORY_DAYS = int(os.getenv('ANALYTICS_ANOMALY_HISTORY_DAYS', 30))  # Training window of the per-user anomaly models
+ANALYTICS_ANOMALY_MAX_AGE_HOURS = int(os.getenv('ANALYTICS_ANOMALY_MAX_AGE_HOURS', 24))  # A model older than this is stale...
+ANALYTICS_ANOMALY_RETRAIN_AFTER = int(os.getenv('ANALYTICS_ANOMALY_RETRAIN_AFTER', 500))  # ...or after scoring this many detections (run_analytics retrain)
+RISK_TAXONOMY_TTL = int(os.getenv('RISK_TAXONOMY_TTL', 60))  # Seconds before other processes pick up ObjectRiskRule changes
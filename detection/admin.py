@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DetectionResult
+from .models import DetectionResult, CameraZone, DetectedObject
 
 @admin.register(DetectionResult)
 class DetectionResultAdmin(admin.ModelAdmin):
@@ -7,3 +7,17 @@ class DetectionResultAdmin(admin.ModelAdmin):
     list_filter = ('uploaded_at',)
     search_fields = ('user__username',)
     readonly_fields = ('uploaded_at',)
+
+@admin.register(CameraZone)
+class CameraZoneAdmin(admin.ModelAdmin):
+    list_display = ('camera_id', 'name', 'zone_type', 'is_active', 'updated_at')
+    list_filter = ('zone_type', 'is_active', 'camera_id')
+    search_fields = ('camera_id', 'name')
+    readonly_fields = ('created_at', 'updated_at')
+
+@admin.register(DetectedObject)
+class DetectedObjectAdmin(admin.ModelAdmin):
+    list_display = ('object_class', 'confidence', 'detection', 'user', 'detected_at')
+    list_filter = ('object_class', 'detected_at')
+    search_fields = ('object_class', 'user__username')
+    raw_id_fields = ('detection',)
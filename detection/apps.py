@@ -1,6 +1,36 @@
 from django.apps import AppConfig
+from django.conf import settings
+import os
+import sys
+import threading
 
 
 class DetectionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'detection'
+    
+    def ready(self):
+        """Warm up the YOLOv5 model when the development server starts"""
+        # Production servers warm up from argus/wsgi.py / argus/asgi.py;
+        # under runserver only the autoreloader child serves requests
+        if len(sys.argv) > 1 and sys.argv[0].endswith('manage.py') and sys.argv[1] == 'runserver':
+            if os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv:
+                start_detector_warmup()
+
+
+def start_detector_warmup():
+    """Load the singleton detector in a background thread (DETECTION_WARMUP_ON_STARTUP)"""
+    if getattr(settings, 'DETECTION_WARMUP_ON_STARTUP', False):
+        threading.Thread(target=warm_up_detector, name='detector-warmup', daemon=True).start()
+
+
+def warm_up_detector():
+    """Load the singleton detector and run a dummy inference"""
+    try:
+        from .object_detector import get_detector
+        
+        detector = get_detector()
+        detector.warmup()
+        print(f"🔥 Detector warmed up in {detector.warmup_seconds:.2f}s")
+    except Exception as e:
+        print(f"❌ Detector warm-up failed: {e}")
@@ -0,0 +1,160 @@
+"""
+Helpers to compare detector variants (backends, quantized models)
+on a fixed set of images from MEDIA_ROOT
+"""
+from django.conf import settings
+from pathlib import Path
+import numpy as np
+import time
+from .result_decoder import box_iou, compare_detections
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def sample_images(limit=None):
+    """
+    Return the fixed evaluation image set: images at the top of MEDIA_ROOT,
+    then uploaded originals, sorted for reproducibility
+
+    Args:
+        limit (int): Maximum number of images (None for all)
+
+    Returns:
+        list: Image paths as strings
+    """
+    media_root = Path(settings.MEDIA_ROOT)
+    images = []
+    for directory in (media_root, media_root / 'detections' / 'original'):
+        if directory.is_dir():
+            images.extend(
+                str(p) for p in sorted(directory.iterdir())
+                if p.suffix.lower() in IMAGE_EXTENSIONS
+            )
+    return images[:limit] if limit else images
+
+
+def measure_latency(detector, images, runs=3):
+    """
+    Time detect_objects() on every image
+
+    Args:
+        detector (ObjectDetector): Detector to time
+        images (list): Image paths
+        runs (int): Timed passes over the image set (best pass is kept)
+
+    Returns:
+        float: Mean latency per image in milliseconds
+    """
+    # First pass is not timed (lazy initialisation, caches)
+    for image in images:
+        detector.detect_objects(image)
+
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        for image in images:
+            detector.detect_objects(image)
+        best = min(best, time.perf_counter() - start)
+
+    return best / max(len(images), 1) * 1000
+
+
+def compare_detectors(reference, candidate, images, iou_threshold=0.9, confidence_tolerance=0.05):
+    """
+    Compare the detections of two detectors image by image
+
+    Args:
+        reference (ObjectDetector): Reference detector (eager torch)
+        candidate (ObjectDetector): Detector under test
+        images (list): Image paths
+        iou_threshold (float): Minimum IoU for two boxes to match
+        confidence_tolerance (float): Maximum absolute confidence difference
+
+    Returns:
+        dict: Totals over the image set (matched, unmatched, min_iou,
+              max_confidence_delta, ok) and per-image reports
+    """
+    per_image = {}
+    for image in images:
+        per_image[image] = compare_detections(
+            reference.detect_objects(image)['detections'],
+            candidate.detect_objects(image)['detections'],
+            iou_threshold=iou_threshold,
+            confidence_tolerance=confidence_tolerance,
+        )
+
+    ious = [r['min_iou'] for r in per_image.values() if r['min_iou'] is not None]
+    return {
+        'matched': sum(r['matched'] for r in per_image.values()),
+        'unmatched': sum(r['unmatched'] for r in per_image.values()),
+        'min_iou': min(ious) if ious else None,
+        'max_confidence_delta': max((r['max_confidence_delta'] for r in per_image.values()), default=0.0),
+        'ok': all(r['ok'] for r in per_image.values()),
+        'images': per_image,
+    }
+
+
+def average_precision(reference, candidate, iou_threshold=0.5):
+    """
+    mAP@iou_threshold of a candidate detector, using the reference detector's
+    detections as ground truth (VOC-style all-point interpolation)
+
+    Args:
+        reference (list): Per-image lists of reference detection dicts
+        candidate (list): Per-image lists of candidate detection dicts (same order)
+        iou_threshold (float): IoU for a candidate box to count as a true positive
+
+    Returns:
+        dict: map, precision, recall
+    """
+    classes = {d['class'] for dets in reference for d in dets}
+    if not classes:
+        return {'map': None, 'precision': None, 'recall': None}
+
+    aps = []
+    total_tp = total_fp = total_gt = 0
+    for cls in sorted(classes):
+        predictions = []
+        gt_count = 0
+        for image_index, (ref_dets, cand_dets) in enumerate(zip(reference, candidate)):
+            gt_count += sum(1 for d in ref_dets if d['class'] == cls)
+            predictions.extend(
+                (d['confidence'], image_index, d['bbox']) for d in cand_dets if d['class'] == cls
+            )
+        predictions.sort(key=lambda p: p[0], reverse=True)
+
+        used = set()
+        tp_flags = []
+        for _, image_index, bbox in predictions:
+            best_j, best_iou = None, iou_threshold
+            for j, ref in enumerate(reference[image_index]):
+                if ref['class'] != cls or (image_index, j) in used:
+                    continue
+                iou = box_iou(bbox, ref['bbox'])
+                if iou >= best_iou:
+                    best_j, best_iou = j, iou
+            if best_j is not None:
+                used.add((image_index, best_j))
+            tp_flags.append(best_j is not None)
+
+        tp = np.cumsum(tp_flags) if tp_flags else np.zeros(0)
+        fp = np.cumsum([not f for f in tp_flags]) if tp_flags else np.zeros(0)
+        recall = tp / max(gt_count, 1)
+        precision = tp / np.maximum(tp + fp, 1)
+
+        # Area under the monotone precision envelope
+        mrec = np.concatenate(([0.0], recall, [1.0]))
+        mpre = np.concatenate(([1.0], precision, [0.0]))
+        mpre = np.flip(np.maximum.accumulate(np.flip(mpre)))
+        steps = np.where(mrec[1:] != mrec[:-1])[0]
+        aps.append(float(np.sum((mrec[steps + 1] - mrec[steps]) * mpre[steps + 1])))
+
+        total_tp += int(tp[-1]) if len(tp) else 0
+        total_fp += int(fp[-1]) if len(fp) else 0
+        total_gt += gt_count
+
+    return {
+        'map': float(np.mean(aps)),
+        'precision': total_tp / max(total_tp + total_fp, 1),
+        'recall': total_tp / max(total_gt, 1),
+    }
@@ -0,0 +1,335 @@
+"""
+Multi-camera security monitoring
+One CameraManager owns N SecurityCamera capture threads (USB indexes, RTSP URLs,
+video files) that all feed a single InferenceWorker, so the YOLOv5 model is loaded
+once per process and frames from different cameras share forward passes.
+"""
+from django.conf import settings
+from datetime import datetime
+from threading import Thread, Lock, Condition
+import time
+from .object_detector import SecurityCamera, get_detector
+from .snapshot_writer import get_snapshot_writer
+
+
+class InferenceWorker:
+    """
+    Single inference thread shared by every camera of a CameraManager
+
+    Cameras only signal that a frame is ready; the frame itself is taken from
+    the camera's LatestFrameBuffer when the batch is assembled, so inference
+    always runs on the newest frame and a camera producing faster than the
+    model keeps up drops its stale frames instead of building a backlog.
+    Ready cameras are stacked into one forward pass (up to max_batch_size).
+    """
+
+    def __init__(self, detector, max_batch_size=8):
+        """
+        Args:
+            detector (ObjectDetector): Shared detector
+            max_batch_size (int): Maximum number of frames per forward pass
+        """
+        self.detector = detector
+        self.max_batch_size = max(1, int(max_batch_size))
+
+        self._pending = {}  # camera_id -> camera with a frame ready
+        self._condition = Condition()
+        self._thread = None
+        self.is_running = False
+
+        # Statistics
+        self.batches = 0
+        self.frames_processed = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+    def start(self):
+        """Start the inference thread (no-op if already running)"""
+        with self._condition:
+            if self.is_running:
+                return
+            self.is_running = True
+        self._thread = Thread(target=self.run, name='inference-worker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the inference thread and drop pending frames"""
+        with self._condition:
+            self.is_running = False
+            self._pending.clear()
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def submit(self, camera):
+        """
+        Mark a camera as having a new frame in its frame buffer
+
+        Args:
+            camera (SecurityCamera): Camera the frame comes from
+        """
+        with self._condition:
+            self._pending.setdefault(camera.camera_id, camera)
+            self._condition.notify()
+
+    def discard(self, camera_id):
+        """Forget a camera's ready signal (used when it stops)"""
+        with self._condition:
+            self._pending.pop(camera_id, None)
+
+    def queue_depth(self):
+        """Number of cameras with a frame waiting for inference"""
+        with self._condition:
+            return len(self._pending)
+
+    def _take_batch(self):
+        """
+        Wait for ready cameras and take the newest frame of up to max_batch_size of them
+
+        Returns:
+            list: (camera, frame, captured_at) tuples
+        """
+        with self._condition:
+            while self.is_running and not self._pending:
+                self._condition.wait(timeout=0.5)
+
+            # Oldest submitters first; cameras left over keep their place for the next batch
+            camera_ids = list(self._pending)[:self.max_batch_size]
+            cameras = [self._pending.pop(camera_id) for camera_id in camera_ids]
+
+        # Frames are read at batch time: anything grabbed since submit() is used
+        batch = []
+        for camera in cameras:
+            item = camera.frame_buffer.take()
+            if item is not None:
+                batch.append((camera, *item))
+        return batch
+
+    def run(self):
+        """Inference loop: one forward pass per batch of frames"""
+        print("🧠 Inference worker started")
+
+        while self.is_running:
+            batch = self._take_batch()
+            if not batch:
+                continue
+
+            # Only cameras due for a detector run (and seeing motion, when gated)
+            # go through the model; the others propagate or hold their tracks
+            detect = []
+            skipped = 0
+            for camera, frame, captured_at in batch:
+                action, roi = camera.schedule_frame(frame)
+                if action == 'detect':
+                    detect.append((camera, frame, captured_at, roi))
+                    continue
+                skipped += 1
+                try:
+                    camera.apply_detections(frame, None, captured_at, hold=action == 'hold')
+                except Exception as e:
+                    print(f"❌ Failed to update tracks for camera {camera.camera_id}: {e}")
+            self.frames_processed += skipped
+
+            if not detect:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = self.detector.model([camera.crop_to_roi(frame, roi) for camera, frame, _, roi in detect])
+            except Exception as e:
+                print(f"❌ Batched inference failed: {e}")
+                continue
+            timestamp = datetime.now().isoformat()
+
+            for index, (camera, frame, captured_at, roi) in enumerate(detect):
+                boxes = camera.decode_detections(results.xyxy[index], roi)
+                try:
+                    camera.apply_detections(frame, {
+                        'boxes': boxes,
+                        'count': len(boxes),
+                        'timestamp': timestamp,
+                        'region': roi
+                    }, captured_at)
+                except Exception as e:
+                    print(f"❌ Failed to apply detections for camera {camera.camera_id}: {e}")
+
+            self.batches += 1
+            self.frames_processed += len(detect)
+            self.last_batch_size = len(detect)
+            self.last_batch_ms = (time.perf_counter() - start) * 1000
+
+        print("🧠 Inference worker stopped")
+
+    def get_stats(self):
+        """Worker statistics for status endpoints"""
+        return {
+            'is_running': self.is_running,
+            'queue_depth': self.queue_depth(),
+            'batches': self.batches,
+            'frames_processed': self.frames_processed,
+            'last_batch_size': self.last_batch_size,
+            'last_batch_ms': round(self.last_batch_ms, 1),
+        }
+
+
+class CameraManager:
+    """
+    Owns the security cameras of this process, keyed by camera id,
+    and the InferenceWorker they share
+    """
+
+    def __init__(self, detector=None, max_batch_size=None):
+        """
+        Args:
+            detector (ObjectDetector): Shared detector (defaults to the singleton)
+            max_batch_size (int): Frames per forward pass, defaults to
+                settings.SECURITY_INFERENCE_BATCH_SIZE
+        """
+        self._detector = detector
+        self.max_batch_size = max_batch_size or getattr(settings, 'SECURITY_INFERENCE_BATCH_SIZE', 8)
+        self.cameras = {}
+        self.worker = None
+        self.lock = Lock()
+
+    @property
+    def detector(self):
+        """Shared detector, loaded on first use"""
+        if self._detector is None:
+            self._detector = get_detector()
+        return self._detector
+
+    def _get_worker(self):
+        """Create the shared inference worker on first use (not started)"""
+        if self.worker is None:
+            self.worker = InferenceWorker(self.detector, self.max_batch_size)
+        return self.worker
+
+    def get_camera(self, camera_id):
+        """Return the camera with this id or None"""
+        with self.lock:
+            return self.cameras.get(camera_id)
+
+    def get_or_add_camera(self, camera_id, camera_source=0, target_classes=None):
+        """
+        Return the camera with this id, registering it if it does not exist
+
+        Args:
+            camera_id (str): Camera identifier
+            camera_source (int or str): Camera index, RTSP/HTTP URL or video file
+            target_classes (list): Object classes to detect
+
+        Returns:
+            SecurityCamera: Registered camera (not started)
+        """
+        with self.lock:
+            camera = self.cameras.get(camera_id)
+            if camera is None:
+                camera = SecurityCamera(
+                    camera_source=camera_source,
+                    detector=self.detector,
+                    target_classes=target_classes,
+                    camera_id=camera_id,
+                    inference_worker=self._get_worker()
+                )
+                self.cameras[camera_id] = camera
+            return camera
+
+    def start_camera(self, camera_id, camera_source=0, target_classes=None):
+        """
+        Start monitoring a camera (registering it if needed)
+
+        A stopped camera picks up the new source and target classes.
+
+        Returns:
+            bool: True if the camera is running
+        """
+        camera = self.get_or_add_camera(camera_id, camera_source, target_classes)
+        if camera.is_running:
+            return True
+
+        camera.camera_source = camera_source
+        if target_classes:
+            camera.target_classes = target_classes
+
+        with self.lock:
+            camera.inference_worker = self._get_worker()
+            camera.inference_worker.start()
+
+        return camera.start_monitoring_thread()
+
+    def stop_camera(self, camera_id):
+        """
+        Stop monitoring a camera
+
+        Returns:
+            bool: False if the camera is unknown
+        """
+        camera = self.get_camera(camera_id)
+        if camera is None:
+            return False
+
+        camera.stop_monitoring()
+        if self.worker is not None:
+            self.worker.discard(camera_id)
+
+        # Nothing left to infer: release the worker thread
+        with self.lock:
+            if self.worker is not None and not any(c.is_running for c in self.cameras.values()):
+                self.worker.stop()
+        return True
+
+    def remove_camera(self, camera_id):
+        """Stop a camera and forget it"""
+        self.stop_camera(camera_id)
+        with self.lock:
+            self.cameras.pop(camera_id, None)
+
+    def stop_all(self):
+        """Stop every camera and the inference worker"""
+        for camera_id in list(self.cameras):
+            self.stop_camera(camera_id)
+
+    def get_status(self):
+        """
+        Per-camera state plus shared worker statistics
+
+        Returns:
+            dict: cameras (list), worker (dict) and snapshot_writer (dict)
+        """
+        with self.lock:
+            cameras = list(self.cameras.values())
+
+        return {
+            'cameras': [
+                {
+                    'camera_id': camera.camera_id,
+                    'camera_source': str(camera.camera_source),
+                    'is_running': camera.is_running,
+                    'target_classes': camera.target_classes,
+                    **{k: v for k, v in camera.get_latest_detections().items() if k != 'detections'},
+                }
+                for camera in cameras
+            ],
+            'worker': self.worker.get_stats() if self.worker is not None else None,
+            'snapshot_writer': get_snapshot_writer().get_stats(),
+        }
+
+
+# Global camera manager instance
+_camera_manager = None
+_camera_manager_lock = Lock()
+
+def get_camera_manager():
+    """
+    Get or create the singleton CameraManager
+
+    Returns:
+        CameraManager: Camera manager instance
+    """
+    global _camera_manager
+    if _camera_manager is None:
+        with _camera_manager_lock:
+            if _camera_manager is None:
+                _camera_manager = CameraManager()
+    return _camera_manager
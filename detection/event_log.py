@@ -0,0 +1,402 @@
+"""
+Append-only security event log (JSON lines)
+Cameras hand entries to a background writer thread which appends them in
+batches, so inference threads never touch the disk. Files are rotated by size
+and age (detection_log.jsonl -> .1 -> .2 ...) and read back from the tail,
+newest first, without loading whole files.
+"""
+from django.conf import settings
+from datetime import datetime
+from threading import Thread, Lock
+import atexit
+import json
+import os
+import queue
+import time
+
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class SecurityEventLog:
+    """
+    JSON-lines event log with a background batching writer
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, rotate_seconds=86400, backup_count=5,
+                 flush_interval=1.0, batch_size=200, max_pending=10000):
+        """
+        Args:
+            path (str): Log file path (rotated files get .1, .2, ... suffixes)
+            max_bytes (int): Rotate once the file reaches this size (0 disables)
+            rotate_seconds (int): Rotate once the oldest entry is this old (0 disables)
+            backup_count (int): Rotated files to keep
+            flush_interval (float): Maximum seconds an entry waits before being written
+            batch_size (int): Entries written per flush at most
+            max_pending (int): Queued entries before new ones are dropped
+        """
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = max(0, int(backup_count))
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, int(batch_size))
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._thread_lock = Lock()
+        self._file_lock = Lock()  # Held while writing, rotating or clearing files
+        self._file_started = None  # Timestamp of the oldest entry of the current file
+        self._active = None  # (size, line count) of the current file as last written by this process
+        self._rotated_line_counts = {}  # (device, inode, size, mtime) -> line count, survives renames
+
+        # Statistics
+        self.entries_written = 0
+        self.entries_dropped = 0
+        self.flushes = 0
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+
+    # ------------------------------------------------------------------ writing
+
+    def append(self, entry):
+        """
+        Queue an entry for the writer thread (never blocks)
+
+        Args:
+            entry (dict): JSON-serializable event
+
+        Returns:
+            bool: False if the queue was full and the entry was dropped
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.entries_dropped += 1
+            return False
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every queued entry has been written
+
+        Args:
+            timeout (float): Maximum wait in seconds
+
+        Returns:
+            bool: True if the queue was drained
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_writer(self):
+        """Start the writer thread on first use"""
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='security-event-log', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Writer loop: gather entries for up to flush_interval, then append them at once"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"❌ Failed to write security log: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        """Append a batch of entries, rotating the file first if needed"""
+        data = ''.join(json.dumps(entry, default=str) + '\n' for entry in batch).encode('utf-8')
+
+        with self._file_lock:
+            self._rotate_if_needed(len(data))
+            with open(self.path, 'ab') as f:
+                size = f.tell()
+                f.write(data)
+            # Running line count, unless another process appended since our last write
+            if size == 0:
+                self._active = (len(data), len(batch))
+            elif self._active is not None and self._active[0] == size:
+                self._active = (size + len(data), self._active[1] + len(batch))
+            else:
+                self._active = None
+            if self._file_started is None:
+                self._file_started = time.time()
+
+        self.entries_written += len(batch)
+        self.flushes += 1
+
+    def _rotate_if_needed(self, incoming_bytes):
+        """Rotate when the file would exceed max_bytes or is older than rotate_seconds"""
+        if not os.path.exists(self.path):
+            self._file_started = None
+            return
+
+        size = os.path.getsize(self.path)
+        if size == 0:
+            return
+
+        too_big = self.max_bytes and size + incoming_bytes > self.max_bytes
+        too_old = False
+        if self.rotate_seconds:
+            if self._file_started is None:
+                self._file_started = self._first_entry_time(self.path) or time.time()
+            too_old = time.time() - self._file_started >= self.rotate_seconds
+
+        if too_big or too_old:
+            self._rotate()
+
+    def _rotate(self):
+        """detection_log.jsonl -> .1 -> .2 ... (the oldest backup is deleted)"""
+        if self.backup_count == 0:
+            os.remove(self.path)
+        else:
+            if self._active is not None:
+                # The running count of the current file becomes the cached count of .1
+                self._rotated_line_counts[self._file_key(os.stat(self.path))] = self._active[1]
+            for index in range(self.backup_count, 0, -1):
+                source = self.path if index == 1 else f"{self.path}.{index - 1}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index}")
+        self._file_started = None
+        self._active = (0, 0)
+
+    @staticmethod
+    def _first_entry_time(path):
+        """Timestamp of the first entry of a log file (None if unreadable)"""
+        try:
+            with open(path, 'rb') as f:
+                timestamp = json.loads(f.readline()).get('timestamp')
+            return datetime.fromisoformat(timestamp).timestamp()
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    def import_legacy(self, legacy_path):
+        """
+        One-time conversion of the old whole-file JSON log (a list of entries,
+        detection_log.json): its entries are put before the current ones, then
+        the old file is renamed to <legacy_path>.imported
+
+        Args:
+            legacy_path (str): Old JSON log
+
+        Returns:
+            int: Entries imported (0 if there was nothing to convert)
+        """
+        if not os.path.exists(legacy_path):
+            return 0
+        try:
+            with open(legacy_path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot import legacy security log {legacy_path}: {e}")
+            return 0
+        if not isinstance(entries, list):
+            entries = []
+
+        data = ''.join(json.dumps(entry, default=str) + '\n' for entry in entries).encode('utf-8')
+        with self._file_lock:
+            # Older entries first: write them followed by the current file, then swap
+            temporary = f"{self.path}.import"
+            with open(temporary, 'wb') as target:
+                target.write(data)
+                if os.path.exists(self.path):
+                    with open(self.path, 'rb') as current:
+                        for block in iter(lambda: current.read(READ_BLOCK_SIZE), b''):
+                            target.write(block)
+            os.replace(temporary, self.path)
+            os.replace(legacy_path, f"{legacy_path}.imported")
+            self._active = None
+            self._file_started = None
+        return len(entries)
+
+    # ------------------------------------------------------------------ reading
+
+    def files(self):
+        """Existing log files, newest first"""
+        candidates = [self.path] + [f"{self.path}.{i}" for i in range(1, self.backup_count + 1)]
+        return [p for p in candidates if os.path.exists(p)]
+
+    @staticmethod
+    def _reverse_lines(path):
+        """Yield the complete lines of a file from last to first, reading fixed-size blocks"""
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b''
+            found_end = False
+
+            while position > 0:
+                read_size = min(READ_BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                block = f.read(read_size) + remainder
+
+                if not found_end:
+                    # Anything after the last newline is a line still being written
+                    end = block.rfind(b'\n')
+                    if end == -1:
+                        remainder = b''
+                        continue
+                    block = block[:end]
+                    found_end = True
+
+                lines = block.split(b'\n')
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line:
+                        yield line
+
+            if found_end and remainder:
+                yield remainder
+
+    def read_tail(self, offset=0, limit=100):
+        """
+        Read entries newest first, skipping the `offset` newest ones
+
+        Args:
+            offset (int): Entries to skip from the tail
+            limit (int): Maximum entries to return
+
+        Returns:
+            list: Entry dicts, newest first
+        """
+        entries = []
+        skipped = 0
+        for path in self.files():
+            try:
+                for line in self._reverse_lines(path):
+                    if skipped < offset:
+                        skipped += 1
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+                    if len(entries) >= limit:
+                        return entries
+            except OSError:
+                continue
+        return entries
+
+    @staticmethod
+    def _file_key(stat):
+        """Cache key of a file that stays valid when it is renamed by a rotation"""
+        return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime)
+
+    @staticmethod
+    def _scan_lines(path):
+        """Number of complete lines in a file (reads it whole)"""
+        count = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+                count += block.count(b'\n')
+        return count
+
+    def _active_line_count(self):
+        """Lines of the current file: the writer's running count, rescanned only
+        when the file changed behind this process (first call, other writers)"""
+        with self._file_lock:
+            size = os.path.getsize(self.path)
+            if self._active is None or self._active[0] != size:
+                self._active = (size, self._scan_lines(self.path))
+            return self._active[1]
+
+    def count(self):
+        """Total number of entries over all log files"""
+        total = 0
+        counts = {}
+        for path in self.files():
+            try:
+                if path == self.path:
+                    total += self._active_line_count()
+                    continue
+                # Rotated files no longer change: each one is scanned once
+                key = self._file_key(os.stat(path))
+                count = self._rotated_line_counts.get(key)
+                if count is None:
+                    count = self._scan_lines(path)
+                counts[key] = count
+                total += count
+            except OSError:
+                continue
+        self._rotated_line_counts = counts
+        return total
+
+    def clear(self):
+        """Delete the log and its rotated files (queued entries are still written)"""
+        with self._file_lock:
+            for path in self.files():
+                os.remove(path)
+            self._file_started = None
+            self._active = None
+            self._rotated_line_counts = {}
+
+    def get_stats(self):
+        """Writer statistics for status endpoints"""
+        return {
+            'pending': self._queue.qsize(),
+            'entries_written': self.entries_written,
+            'entries_dropped': self.entries_dropped,
+            'flushes': self.flushes,
+        }
+
+
+# One log (and writer thread) per file path
+_event_logs = {}
+_event_logs_lock = Lock()
+
+def get_event_log(path=None):
+    """
+    Get or create the event log for a path
+
+    Args:
+        path (str): Log file, defaults to settings.SECURITY_EVENT_LOG
+
+    Returns:
+        SecurityEventLog: Shared log instance
+    """
+    path = os.path.abspath(str(path or getattr(
+        settings, 'SECURITY_EVENT_LOG', os.path.join(settings.MEDIA_ROOT, 'security', 'detection_log.jsonl')
+    )))
+    with _event_logs_lock:
+        if path not in _event_logs:
+            event_log = SecurityEventLog(
+                path,
+                max_bytes=getattr(settings, 'SECURITY_EVENT_LOG_MAX_BYTES', 10 * 1024 * 1024),
+                rotate_seconds=getattr(settings, 'SECURITY_EVENT_LOG_ROTATE_SECONDS', 86400),
+                backup_count=getattr(settings, 'SECURITY_EVENT_LOG_BACKUPS', 5),
+            )
+            # History of the pre-JSONL log (detection_log.json next to detection_log.jsonl)
+            imported = event_log.import_legacy(os.path.splitext(path)[0] + '.json')
+            if imported:
+                print(f"📥 Imported {imported} entries from the legacy security log")
+            _event_logs[path] = event_log
+        return _event_logs[path]
+
+
+@atexit.register
+def _flush_event_logs():
+    """Write out queued entries on interpreter exit"""
+    for event_log in list(_event_logs.values()):
+        event_log.flush(timeout=2.0)
@@ -24,21 +24,68 @@ class ImageUploadForm(forms.ModelForm):
         image = self.cleaned_data.get('original_image')
         
         if image:
-            # Check file size (limit to 10MB)
-            if image.size > 10 * 1024 * 1024:
-                raise forms.ValidationError("Image file too large ( > 10MB )")
-            
-            # Check file extension
-            valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-            ext = image.name.lower().split('.')[-1]
-            if f'.{ext}' not in valid_extensions:
-                raise forms.ValidationError(
-                    f"Unsupported file extension. Allowed: {', '.join(valid_extensions)}"
-                )
+            validate_image_file(image)
         
         return image
 
 
+def validate_image_file(image):
+    """Check size and extension of an uploaded image"""
+    # Check file size (limit to 10MB)
+    if image.size > 10 * 1024 * 1024:
+        raise forms.ValidationError("Image file too large ( > 10MB )")
+    
+    # Check file extension
+    valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp']
+    ext = image.name.lower().split('.')[-1]
+    if f'.{ext}' not in valid_extensions:
+        raise forms.ValidationError(
+            f"Unsupported file extension. Allowed: {', '.join(valid_extensions)}"
+        )
+
+
+class MultipleImageInput(forms.ClearableFileInput):
+    """File input accepting several images at once"""
+    allow_multiple_selected = True
+
+
+class MultipleImageField(forms.ImageField):
+    """ImageField returning a list of uploaded files"""
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleImageInput(attrs={
+            'class': 'form-control',
+            'accept': 'image/*',
+            'id': 'bulkImageUpload'
+        }))
+        super().__init__(*args, **kwargs)
+    
+    def clean(self, data, initial=None):
+        if isinstance(data, (list, tuple)):
+            return [super(MultipleImageField, self).clean(item, initial) for item in data]
+        return [super().clean(data, initial)]
+
+
+class BulkImageUploadForm(forms.Form):
+    """Form for uploading a burst of images processed in batches"""
+    
+    MAX_FILES = 500
+    
+    images = MultipleImageField(label='Choose images for batch detection')
+    
+    def clean_images(self):
+        """Validate every uploaded image"""
+        images = self.cleaned_data.get('images') or []
+        
+        if len(images) > self.MAX_FILES:
+            raise forms.ValidationError(f"Too many files ( > {self.MAX_FILES} )")
+        
+        for image in images:
+            validate_image_file(image)
+        
+        return images
+
+
 class DetectionEditForm(forms.ModelForm):
     """Form for editing detection metadata"""
     
@@ -0,0 +1,75 @@
+"""
+Latest-frame buffer between a camera grabber thread and inference
+The grabber always overwrites the slot (drop-oldest ring buffer of size 1),
+so inference works on the newest frame instead of a growing backlog and the
+stream never lags behind reality.
+"""
+from threading import Condition
+import time
+
+
+class LatestFrameBuffer:
+    """
+    Single-slot ring buffer keeping only the newest frame
+    """
+
+    def __init__(self):
+        self._condition = Condition()
+        self._frame = None
+        self._captured_at = None
+        self._sequence = 0
+        self._consumed_sequence = 0
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+    def put(self, frame, captured_at=None):
+        """
+        Store a new frame, dropping the previous one if it was never consumed
+
+        Args:
+            frame (numpy.ndarray): Captured frame
+            captured_at (float): time.perf_counter() at capture (default: now)
+        """
+        with self._condition:
+            if self._frame is not None and self._consumed_sequence < self._sequence:
+                self.frames_dropped += 1
+            self._frame = frame
+            self._captured_at = captured_at if captured_at is not None else time.perf_counter()
+            self._sequence += 1
+            self.frames_captured += 1
+            self._condition.notify_all()
+
+    def take(self):
+        """
+        Consume the newest frame without waiting
+
+        Returns:
+            tuple: (frame, captured_at) or None if no unconsumed frame is available
+        """
+        with self._condition:
+            if self._frame is None or self._consumed_sequence >= self._sequence:
+                return None
+            self._consumed_sequence = self._sequence
+            return self._frame, self._captured_at
+
+    def wait_and_take(self, timeout=0.5):
+        """
+        Wait for a frame newer than the last consumed one, then consume it
+
+        Args:
+            timeout (float): Maximum wait in seconds
+
+        Returns:
+            tuple: (frame, captured_at) or None on timeout
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._consumed_sequence < self._sequence, timeout=timeout)
+        return self.take()
+
+    def clear(self):
+        """Forget the stored frame (statistics are kept)"""
+        with self._condition:
+            self._frame = None
+            self._consumed_sequence = self._sequence
@@ -0,0 +1,135 @@
+"""
+Perceptual image hashes (dHash / pHash) for snapshot de-duplication
+Near-identical frames (a person standing still, a static scene) hash to
+values a few bits apart, so consecutive duplicates can be skipped before
+they are written to disk.
+"""
+from threading import Lock
+import cv2
+import numpy as np
+
+HASH_SIZE = 8  # 64-bit hashes
+
+
+def _grayscale(image):
+    """Image path or BGR/grayscale ndarray -> grayscale ndarray"""
+    if isinstance(image, (str, bytes)) or hasattr(image, '__fspath__'):
+        gray = cv2.imread(str(image), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError(f"Cannot read image: {image}")
+        return gray
+    if image.ndim == 3:
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+
+def dhash(image, hash_size=HASH_SIZE):
+    """
+    Difference hash: sign of the horizontal gradient of a (hash_size+1) x hash_size thumbnail
+
+    Args:
+        image (str or numpy.ndarray): Image path or BGR frame
+
+    Returns:
+        int: hash_size * hash_size bit hash
+    """
+    small = cv2.resize(_grayscale(image), (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return _bits_to_int(bits)
+
+
+def phash(image, hash_size=HASH_SIZE, highfreq_factor=4):
+    """
+    Perceptual hash: low-frequency DCT coefficients above their median
+
+    Args:
+        image (str or numpy.ndarray): Image path or BGR frame
+
+    Returns:
+        int: hash_size * hash_size bit hash
+    """
+    size = hash_size * highfreq_factor
+    small = cv2.resize(_grayscale(image), (size, size), interpolation=cv2.INTER_AREA)
+    low = cv2.dct(np.float32(small))[:hash_size, :hash_size]
+    bits = (low > np.median(low)).flatten()
+    return _bits_to_int(bits)
+
+
+def _bits_to_int(bits):
+    """Boolean array -> integer, first bit most significant"""
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+HASH_FUNCTIONS = {'dhash': dhash, 'phash': phash}
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+
+def to_hex(value):
+    """Hash -> 16 character hex string (storage format)"""
+    return f"{value:016x}"
+
+
+def from_hex(value):
+    """16 character hex string -> hash"""
+    return int(value, 16)
+
+
+class DuplicateFilter:
+    """
+    Remembers the hash of the last stored image per key (e.g. camera id)
+    and flags new images within `threshold` bits of it as duplicates
+    """
+
+    def __init__(self, threshold=5, method='dhash'):
+        """
+        Args:
+            threshold (int): Maximum Hamming distance for two images to be duplicates
+            method (str): 'dhash' or 'phash'
+        """
+        self.threshold = threshold
+        self.hash_function = HASH_FUNCTIONS[method]
+        self._last = {}
+        self._lock = Lock()
+
+    def is_duplicate(self, key, image):
+        """
+        Hash an image and compare it with the last stored one for this key
+        (the reference is left unchanged, see commit)
+
+        Returns:
+            tuple: (is_duplicate, hash)
+        """
+        value = self.hash_function(image)
+        with self._lock:
+            last = self._last.get(key)
+        return last is not None and hamming_distance(last, value) <= self.threshold, value
+
+    def commit(self, key, value):
+        """Make a hash the reference of a key, once its image was actually stored"""
+        with self._lock:
+            self._last[key] = value
+
+    def check(self, key, image):
+        """
+        is_duplicate() then commit() when not a duplicate, for callers that
+        always store non-duplicate images
+
+        Returns:
+            tuple: (is_duplicate, hash)
+        """
+        duplicate, value = self.is_duplicate(key, image)
+        if not duplicate:
+            self.commit(key, value)
+        return duplicate, value
+
+    def forget(self, key):
+        """Drop the reference hash of a key"""
+        with self._lock:
+            self._last.pop(key, None)
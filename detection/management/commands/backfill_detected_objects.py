@@ -0,0 +1,65 @@
+"""
+Django management command to (re)build the DetectedObject table from detection_data
+Usage:
+    python manage.py backfill_detected_objects             # detections without rows only
+    python manage.py backfill_detected_objects --rebuild   # rewrite every detection
+    python manage.py backfill_detected_objects --batch-size 200
+New and edited detections are kept in sync by DetectionResult.save(); this is
+for rows written around it (queryset.update, raw SQL, restored dumps).
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from detection.models import DetectionResult, DetectedObject, parse_detected_objects
+
+
+class Command(BaseCommand):
+    help = 'Back-fill the denormalized DetectedObject rows of detections'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Delete and recreate the rows of every detection'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Detections processed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        detections = DetectionResult.objects.exclude(detection_data='').only(
+            'id', 'user_id', 'uploaded_at', 'detection_data'
+        ).order_by('id')
+        if not options['rebuild']:
+            detections = detections.filter(
+                ~Exists(DetectedObject.objects.filter(detection=OuterRef('pk'))), objects_detected__gt=0
+            )
+
+        batch_size = max(1, options['batch_size'])
+        processed = created = 0
+        last_id = 0
+        while True:
+            batch = list(detections.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            rows = [
+                DetectedObject(detection_id=d.id, user_id=d.user_id, detected_at=d.uploaded_at, **fields)
+                for d in batch
+                for fields in parse_detected_objects(d.detection_data)
+            ]
+            with transaction.atomic():
+                DetectedObject.objects.filter(detection_id__in=[d.id for d in batch]).delete()
+                DetectedObject.objects.bulk_create(rows)
+
+            processed += len(batch)
+            created += len(rows)
+            self.stdout.write(f'   {processed} detection(s) processed...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {created} detected object(s) written for {processed} detection(s)'
+        ))
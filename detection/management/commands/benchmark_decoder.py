@@ -0,0 +1,111 @@
+"""
+Django management command comparing YOLOv5 result extraction paths
+Inference runs once per frame; only the post-processing is timed:
+    - legacy: results.pandas().xyxy[0] + DataFrame.iterrows()
+    - vectorized: result_decoder on the raw results.xyxy tensor
+Usage:
+    python manage.py benchmark_decoder
+    python manage.py benchmark_decoder --video media/demo.mp4 --frames 200 --repeat 5
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from detection.object_detector import get_detector
+from detection.result_decoder import class_ids_for, decode_predictions, to_detection_dicts
+import cv2
+import time
+
+TARGET_CLASSES = ['person', 'car', 'dog', 'cat', 'truck', 'motorcycle']
+
+
+def legacy_extract(results, target_classes):
+    """Pre-vectorization extraction (copy of the old SecurityCamera.detect_frame loop)"""
+    detections = []
+    df = results.pandas().xyxy[0]
+    for _, row in df.iterrows():
+        if row['name'] in target_classes:
+            detections.append({
+                'class': row['name'],
+                'confidence': float(row['confidence']),
+                'bbox': {
+                    'xmin': int(row['xmin']),
+                    'ymin': int(row['ymin']),
+                    'xmax': int(row['xmax']),
+                    'ymax': int(row['ymax'])
+                },
+            })
+    return detections
+
+
+class Command(BaseCommand):
+    help = 'Benchmark pandas vs vectorized detection result extraction'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--video',
+            type=str,
+            default=str(settings.BASE_DIR / 'media' / 'demo.mp4'),
+            help='Video file to read frames from'
+        )
+        parser.add_argument(
+            '--frames',
+            type=int,
+            default=100,
+            help='Number of frames to run inference on'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Timing repetitions over the cached results'
+        )
+
+    def handle(self, *args, **options):
+        detector = get_detector()
+
+        capture = cv2.VideoCapture(options['video'])
+        if not capture.isOpened():
+            raise CommandError(f"Could not open video: {options['video']}")
+
+        self.stdout.write(f"🎞️ Running inference on up to {options['frames']} frame(s)...")
+        all_results = []
+        while len(all_results) < options['frames']:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            all_results.append(detector.model(frame))
+        capture.release()
+
+        if not all_results:
+            raise CommandError('No frames could be read')
+
+        names = detector.model.names
+        class_ids = class_ids_for(names, TARGET_CLASSES)
+        total_boxes = sum(len(r.xyxy[0]) for r in all_results)
+
+        def vectorized_extract(results):
+            boxes = decode_predictions(results.xyxy[0], class_ids)
+            return to_detection_dicts(boxes, names) if len(boxes) else []
+
+        # Both paths must agree before timing them
+        for results in all_results:
+            legacy = legacy_extract(results, TARGET_CLASSES)
+            vectorized = vectorized_extract(results)
+            if [d['bbox'] for d in legacy] != [d['bbox'] for d in vectorized]:
+                raise CommandError('Decoders disagree, aborting benchmark')
+
+        timings = {}
+        for label, extract in (('legacy (pandas)', lambda r: legacy_extract(r, TARGET_CLASSES)),
+                               ('vectorized', vectorized_extract)):
+            best = float('inf')
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                for results in all_results:
+                    extract(results)
+                best = min(best, time.perf_counter() - start)
+            timings[label] = best / len(all_results) * 1000
+            self.stdout.write(f"   {label:<16} {timings[label]:.3f} ms/frame")
+
+        speedup = timings['legacy (pandas)'] / max(timings['vectorized'], 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(all_results)} frame(s), {total_boxes} raw box(es): {speedup:.1f}x faster"
+        ))
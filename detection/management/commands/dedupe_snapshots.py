@@ -0,0 +1,178 @@
+"""
+Django management command to back-fill perceptual hashes and collapse duplicate images
+Usage:
+    python manage.py dedupe_snapshots --dry-run         # report only
+    python manage.py dedupe_snapshots                   # events + security snapshots
+    python manage.py dedupe_snapshots --skip-snapshots --threshold 3
+Consecutive near-identical images (Hamming distance <= threshold) are collapsed:
+- DetectionEvent.image: the duplicate event points to the kept file, its own file is deleted
+- media/security/snapshots: the duplicate file is replaced by a hard link to the kept one,
+  so paths referenced by the security log stay valid
+Hashes of snapshot files are cached in <snapshots>/hash_index.json.
+"""
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from pathlib import Path
+import json
+import os
+import re
+from detection.image_hash import dhash, hamming_distance, to_hex, from_hex
+
+SNAPSHOT_PATTERN = re.compile(r'^snapshot_(?:(?P<camera>.+?)_)?(?P<timestamp>\d{8}_\d{6})')
+INDEX_FILENAME = 'hash_index.json'
+
+
+class Command(BaseCommand):
+    help = 'Back-fill dHash values and collapse duplicate detection images and security snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=int,
+            default=5,
+            help='Maximum Hamming distance between two duplicate images (64-bit dHash)'
+        )
+        parser.add_argument(
+            '--snapshots-dir',
+            type=str,
+            default=str(Path(settings.MEDIA_ROOT) / 'security' / 'snapshots'),
+            help='Security snapshot directory'
+        )
+        parser.add_argument(
+            '--skip-events',
+            action='store_true',
+            help='Do not process DetectionEvent images'
+        )
+        parser.add_argument(
+            '--skip-snapshots',
+            action='store_true',
+            help='Do not process security snapshot files'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute hashes and report duplicates without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+        dry_run = options['dry_run']
+
+        if not options['skip_events']:
+            self.dedupe_events(threshold, dry_run)
+        if not options['skip_snapshots']:
+            self.dedupe_snapshots(Path(options['snapshots_dir']), threshold, dry_run)
+
+        self.stdout.write(self.style.SUCCESS('✅ Done' + (' (dry run)' if dry_run else '')))
+
+    def dedupe_events(self, threshold, dry_run):
+        """Back-fill DetectionEvent.image_hash, then point consecutive duplicates to one file"""
+        from mouvment_detection.models import DetectionEvent
+
+        events = DetectionEvent.objects.exclude(image='').exclude(image__isnull=True).order_by('timestamp', 'id')
+        self.stdout.write(f"🖼️ {events.count()} detection event image(s)")
+
+        hashed = missing = collapsed = freed = 0
+        kept_hash = kept_name = None
+        for event in events.iterator():
+            if not event.image_hash:
+                try:
+                    event.image_hash = to_hex(dhash(event.image.path))
+                except (ValueError, OSError, NotImplementedError):
+                    missing += 1
+                    continue
+                hashed += 1
+                if not dry_run:
+                    DetectionEvent.objects.filter(pk=event.pk).update(image_hash=event.image_hash)
+
+            value = from_hex(event.image_hash)
+            if kept_hash is None or event.image.name == kept_name or hamming_distance(kept_hash, value) > threshold:
+                kept_hash, kept_name = value, event.image.name
+                continue
+
+            collapsed += 1
+            duplicate_name = event.image.name
+            if dry_run:
+                continue
+
+            DetectionEvent.objects.filter(pk=event.pk).update(image=kept_name)
+            # Only delete the file once no event references it anymore
+            if not DetectionEvent.objects.filter(image=duplicate_name).exists():
+                storage = event.image.storage
+                if storage.exists(duplicate_name):
+                    freed += storage.size(duplicate_name)
+                    storage.delete(duplicate_name)
+
+        self.stdout.write(
+            f"   hashed {hashed}, unreadable {missing}, collapsed {collapsed} duplicate(s), "
+            f"freed {freed / 1024 / 1024:.1f} MB"
+        )
+
+    def dedupe_snapshots(self, directory, threshold, dry_run):
+        """Hash snapshot files (cached in the index) and hard-link consecutive duplicates per camera"""
+        if not directory.is_dir():
+            self.stdout.write(self.style.WARNING(f"⚠️ {directory} does not exist, skipping snapshots"))
+            return
+
+        index_path = directory / INDEX_FILENAME
+        try:
+            index = json.loads(index_path.read_text())
+        except (OSError, ValueError):
+            index = {}
+
+        # Group by camera, oldest first (filenames embed the timestamp)
+        cameras = {}
+        for path in sorted(directory.glob('*.jpg')):
+            match = SNAPSHOT_PATTERN.match(path.name)
+            camera = (match.group('camera') or 'default') if match else 'default'
+            timestamp = match.group('timestamp') if match else ''
+            cameras.setdefault(camera, []).append((timestamp, path))
+
+        self.stdout.write(f"📸 {sum(len(p) for p in cameras.values())} snapshot(s) from {len(cameras)} camera(s)")
+
+        hashed = collapsed = freed = 0
+        for camera, snapshots in cameras.items():
+            kept = None
+            for _, path in sorted(snapshots):
+                stat = path.stat()
+                cached = index.get(path.name)
+                if cached and cached.get('size') == stat.st_size and cached.get('mtime') == stat.st_mtime:
+                    value = from_hex(cached['hash'])
+                else:
+                    try:
+                        value = dhash(str(path))
+                    except ValueError:
+                        continue
+                    index[path.name] = {'hash': to_hex(value), 'size': stat.st_size, 'mtime': stat.st_mtime}
+                    hashed += 1
+
+                if kept is None or hamming_distance(kept[1], value) > threshold:
+                    kept = (path, value)
+                    continue
+                if os.path.samefile(kept[0], path):
+                    continue  # Already collapsed
+
+                collapsed += 1
+                if dry_run:
+                    continue
+
+                temporary = path.with_name(path.name + '.tmp')
+                try:
+                    os.link(kept[0], temporary)
+                    os.replace(temporary, path)
+                    freed += stat.st_size
+                    stat = path.stat()
+                    index[path.name] = {'hash': to_hex(kept[1]), 'size': stat.st_size, 'mtime': stat.st_mtime}
+                except OSError as e:
+                    if temporary.exists():
+                        temporary.unlink()
+                    self.stdout.write(self.style.WARNING(f"   ⚠️ Cannot link {path.name}: {e}"))
+
+        # Forget deleted files
+        index = {name: entry for name, entry in index.items() if (directory / name).exists()}
+        if not dry_run:
+            index_path.write_text(json.dumps(index))
+
+        self.stdout.write(
+            f"   hashed {hashed}, collapsed {collapsed} duplicate(s), freed {freed / 1024 / 1024:.1f} MB"
+        )
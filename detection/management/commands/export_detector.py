@@ -0,0 +1,81 @@
+"""
+Django management command to export the YOLOv5 weights to other inference backends
+and check them against the eager PyTorch model
+Usage:
+    python manage.py export_detector
+    python manage.py export_detector --backend onnxruntime --model yolov5s
+Select the backend with settings.DETECTION_BACKEND (torch, torchscript, onnxruntime).
+"""
+from django.core.management.base import BaseCommand, CommandError
+from detection import model_registry
+from detection.benchmarking import sample_images, measure_latency, compare_detectors
+
+
+class Command(BaseCommand):
+    help = 'Export YOLOv5 to TorchScript / ONNX and verify box parity with PyTorch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend',
+            type=str,
+            action='append',
+            dest='backends',
+            choices=sorted(model_registry.EXPORT_FORMATS),
+            help='Backend(s) to export (default: all)'
+        )
+        parser.add_argument(
+            '--model',
+            type=str,
+            default='yolov5s',
+            help='Model variant to export'
+        )
+        parser.add_argument(
+            '--skip-verify',
+            action='store_true',
+            help='Do not run the parity / latency check after exporting'
+        )
+
+    def handle(self, *args, **options):
+        from detection.object_detector import ObjectDetector
+
+        model_name = options['model']
+        backends = options.get('backends') or sorted(model_registry.EXPORT_FORMATS)
+
+        for backend in backends:
+            self.stdout.write(f"📦 Exporting {model_name} -> {backend}...")
+            try:
+                path = model_registry.export_model(model_name, backend)
+            except Exception as e:
+                raise CommandError(f"Export to {backend} failed: {e}")
+            self.stdout.write(self.style.SUCCESS(f"   ✅ {path}"))
+
+        if options['skip_verify']:
+            return
+
+        images = sample_images()
+        if not images:
+            self.stdout.write(self.style.WARNING('⚠️ No images in MEDIA_ROOT, skipping verification'))
+            return
+
+        reference = ObjectDetector(model_name, backend='torch')
+        reference_ms = measure_latency(reference, images)
+        self.stdout.write(f"\n⏱️ {len(images)} image(s)\n   torch: {reference_ms:.1f} ms/image")
+
+        failed = []
+        for backend in backends:
+            candidate = ObjectDetector(model_name, backend=backend)
+            latency_ms = measure_latency(candidate, images)
+            parity = compare_detectors(reference, candidate, images)
+
+            style = self.style.SUCCESS if parity['ok'] else self.style.ERROR
+            self.stdout.write(style(
+                f"   {backend}: {latency_ms:.1f} ms/image "
+                f"({reference_ms / max(latency_ms, 1e-9):.2f}x), "
+                f"{parity['matched']} matched / {parity['unmatched']} unmatched box(es), "
+                f"min IoU {parity['min_iou']}, max conf delta {parity['max_confidence_delta']:.3f}"
+            ))
+            if not parity['ok']:
+                failed.append(backend)
+
+        if failed:
+            raise CommandError(f"Parity check failed for: {', '.join(failed)}")
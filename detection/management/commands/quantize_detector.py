@@ -0,0 +1,131 @@
+"""
+Django management command to build the INT8 detector and report accuracy vs latency
+Usage:
+    python manage.py quantize_detector                      # static INT8, calibrated on media/
+    python manage.py quantize_detector --mode dynamic
+    python manage.py quantize_detector --report-only --output report.json
+Use the quantized model with backend 'onnxruntime-int8' (settings.DETECTION_BACKEND
+or ObjectDetector(backend=...)) on cameras where the mAP loss is acceptable.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from detection import model_registry
+from detection.benchmarking import sample_images, measure_latency, average_precision
+import json
+
+REPORT_BACKENDS = ['torch', 'torchscript', 'onnxruntime', 'onnxruntime-int8']
+
+
+class Command(BaseCommand):
+    help = 'Quantize the ONNX detector to INT8 and compare accuracy/latency of all backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            type=str,
+            default='yolov5s',
+            help='Model variant to quantize'
+        )
+        parser.add_argument(
+            '--mode',
+            type=str,
+            default='static',
+            choices=['static', 'dynamic'],
+            help='static: calibrated weights + activations, dynamic: weights only'
+        )
+        parser.add_argument(
+            '--calibration-images',
+            type=int,
+            default=32,
+            help='Number of media/ images used for static calibration (held out of the report)'
+        )
+        parser.add_argument(
+            '--report-only',
+            action='store_true',
+            help='Skip quantization, only run the accuracy/latency report'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='JSON file to write the report to (optional)'
+        )
+
+    def handle(self, *args, **options):
+        from detection.object_detector import ObjectDetector
+
+        model_name = options['model']
+        calibration, images = self._split(sample_images(), options['calibration_images'])
+
+        if not options['report_only']:
+            self.stdout.write(f"⚙️ Quantizing {model_name} ({options['mode']})...")
+            try:
+                path = model_registry.quantize_model(
+                    model_name,
+                    mode=options['mode'],
+                    calibration_images=calibration,
+                )
+            except Exception as e:
+                raise CommandError(f"Quantization failed: {e}")
+            self.stdout.write(self.style.SUCCESS(f"   ✅ {path}"))
+
+        # Eager torch detections are the reference ("ground truth") for mAP
+        reference = ObjectDetector(model_name, backend='torch')
+        reference_dets = [reference.detect_objects(image)['detections'] for image in images]
+
+        self.stdout.write(
+            f"\n📊 {len(images)} held-out image(s) ({len(calibration)} used for calibration), mAP@0.5 relative to torch\n"
+        )
+        self.stdout.write(f"   {'backend':<18}{'ms/image':>10}{'speedup':>9}{'mAP':>8}{'prec':>8}{'recall':>8}")
+
+        report = {}
+        baseline_ms = None
+        for backend in REPORT_BACKENDS:
+            if not model_registry.is_available(model_name, backend):
+                continue
+
+            detector = reference if backend == 'torch' else ObjectDetector(model_name, backend=backend)
+            latency_ms = measure_latency(detector, images)
+            baseline_ms = baseline_ms or latency_ms
+            candidate_dets = [detector.detect_objects(image)['detections'] for image in images]
+            accuracy = average_precision(reference_dets, candidate_dets)
+
+            report[backend] = {
+                'latency_ms': latency_ms,
+                'speedup': baseline_ms / max(latency_ms, 1e-9),
+                **accuracy,
+            }
+            self.stdout.write(
+                f"   {backend:<18}{latency_ms:>10.1f}{report[backend]['speedup']:>8.2f}x"
+                f"{self._fmt(accuracy['map'])}{self._fmt(accuracy['precision'])}{self._fmt(accuracy['recall'])}"
+            )
+
+        if options.get('output'):
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'model': model_name,
+                    'images': len(images),
+                    'calibration_images': len(calibration),
+                    'backends': report,
+                }, f, indent=2)
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Report completed'))
+
+    @staticmethod
+    def _split(images, calibration_images):
+        """
+        Deterministic calibration / evaluation split (calibration images are
+        evenly spaced in the sorted list, so both sets span every media directory)
+        The report never scores the INT8 model on its own calibration images.
+
+        Returns:
+            tuple: (calibration images, held-out evaluation images)
+        """
+        if len(images) < 2:
+            raise CommandError('At least 2 images are needed in MEDIA_ROOT (calibration + evaluation)')
+        count = max(1, min(calibration_images, len(images) // 2))
+        calibration = images[::len(images) // count][:count]
+        held_out = set(calibration)
+        return calibration, [image for image in images if image not in held_out]
+
+    @staticmethod
+    def _fmt(value):
+        return f"{value:>8.3f}" if value is not None else f"{'-':>8}"
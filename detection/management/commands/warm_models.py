@@ -0,0 +1,57 @@
+"""
+Django management command to populate the local model registry and warm up the detector
+Usage:
+    python manage.py warm_models --download     # once, on a host with network access
+    python manage.py warm_models                # check that loading works offline
+"""
+from django.core.management.base import BaseCommand, CommandError
+from detection import model_registry
+
+
+class Command(BaseCommand):
+    help = 'Download YOLOv5 models into the local registry and run a warm-up inference'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            type=str,
+            action='append',
+            dest='models',
+            help='Model variant(s) to warm up (default: yolov5s)'
+        )
+        parser.add_argument(
+            '--download',
+            action='store_true',
+            help='Fetch missing code/weights from GitHub into the registry'
+        )
+
+    def handle(self, *args, **options):
+        from detection.object_detector import ObjectDetector
+
+        model_names = options.get('models') or ['yolov5s']
+
+        self.stdout.write(f"📦 Model registry: {model_registry.get_model_dir()}")
+
+        for model_name in model_names:
+            if options['download'] and not model_registry.is_available(model_name):
+                self.stdout.write(f"⬇️ Downloading {model_name}...")
+                try:
+                    model_registry.fetch_model(model_name)
+                except Exception as e:
+                    raise CommandError(f"Download of {model_name} failed: {e}")
+
+            if not model_registry.is_available(model_name):
+                raise CommandError(
+                    f"{model_name} is not in the local registry, re-run with --download"
+                )
+
+            try:
+                detector = ObjectDetector(model_name)
+                detector.warmup()
+            except Exception as e:
+                raise CommandError(f"Warm-up of {model_name} failed: {e}")
+
+            self.stdout.write(self.style.SUCCESS(
+                f"   ✅ {model_name}: load {detector.load_seconds:.2f}s, "
+                f"warm-up {detector.warmup_seconds:.2f}s"
+            ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0002_detectionresult_description_detectionresult_location_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CameraZone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('camera_id', models.CharField(db_index=True, help_text='SecurityCamera id (see CameraManager), or CameraSettings name for the motion detector', max_length=100)),
+                ('name', models.CharField(max_length=100)),
+                ('zone_type', models.CharField(choices=[('include', 'Region of interest'), ('exclude', 'Exclusion zone')], default='include', max_length=10)),
+                ('points', models.JSONField(default=list, help_text='Polygon vertices [[x, y], ...] as fractions (0-1) of the frame width and height')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Camera Zone',
+                'verbose_name_plural': 'Camera Zones',
+                'ordering': ['camera_id', 'name'],
+            },
+        ),
+    ]
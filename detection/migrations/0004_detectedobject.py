@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_detected_objects(apps, schema_editor):
+    """Create the DetectedObject rows of existing detections"""
+    from detection.models import parse_detected_objects
+
+    DetectionResult = apps.get_model('detection', 'DetectionResult')
+    DetectedObject = apps.get_model('detection', 'DetectedObject')
+
+    detections = DetectionResult.objects.exclude(detection_data='').only('id', 'user_id', 'uploaded_at', 'detection_data')
+    rows = []
+    for detection in detections.iterator(chunk_size=500):
+        rows.extend(
+            DetectedObject(detection_id=detection.id, user_id=detection.user_id, detected_at=detection.uploaded_at, **fields)
+            for fields in parse_detected_objects(detection.detection_data)
+        )
+        if len(rows) >= 1000:
+            DetectedObject.objects.bulk_create(rows)
+            rows = []
+    DetectedObject.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('detection', '0003_camerazone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectedObject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('detected_at', models.DateTimeField()),
+                ('object_class', models.CharField(max_length=100)),
+                ('confidence', models.FloatField(default=0.0)),
+                ('xmin', models.FloatField(blank=True, null=True)),
+                ('ymin', models.FloatField(blank=True, null=True)),
+                ('xmax', models.FloatField(blank=True, null=True)),
+                ('ymax', models.FloatField(blank=True, null=True)),
+                ('detection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detected_objects', to='detection.detectionresult')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detected_objects', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Detected Object',
+                'verbose_name_plural': 'Detected Objects',
+                'indexes': [models.Index(fields=['user', 'detected_at'], name='detection_d_user_id_052f88_idx'), models.Index(fields=['user', 'object_class', 'detected_at'], name='detection_d_user_id_fdea06_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_detected_objects, migrations.RunPython.noop),
+    ]
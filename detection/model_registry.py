@@ -0,0 +1,245 @@
+"""
+Local YOLOv5 model registry
+Keeps the YOLOv5 code and weights pinned on disk so workers never hit the
+network (torch.hub / GitHub) when loading a model.
+
+Layout of settings.DETECTION_MODEL_DIR:
+    repo/                   YOLOv5 source tree (hubconf.py), loaded with source='local'
+    yolov5s.pt              Weights, one file per model variant
+    yolov5s.torchscript     Exported graphs, one file per inference backend
+    yolov5s.onnx            (see export_model / manage.py export_detector)
+    yolov5s-int8.onnx       INT8 quantized ONNX graph (see quantize_model)
+"""
+from django.conf import settings
+from pathlib import Path
+import cv2
+import numpy as np
+import shutil
+import sys
+import torch
+
+DEFAULT_WEIGHTS_URL = 'https://github.com/ultralytics/yolov5/releases/download/v7.0/{model_name}.pt'
+
+# Inference backend -> weights file suffix understood by YOLOv5 DetectMultiBackend
+BACKEND_SUFFIXES = {
+    'torch': '.pt',
+    'torchscript': '.torchscript',
+    'onnxruntime': '.onnx',
+    'onnxruntime-int8': '-int8.onnx',
+}
+
+# Backend -> format name used by the YOLOv5 export.py script
+EXPORT_FORMATS = {
+    'torchscript': 'torchscript',
+    'onnxruntime': 'onnx',
+}
+
+
+def get_model_dir():
+    """Return the registry directory (settings.DETECTION_MODEL_DIR)"""
+    return Path(getattr(settings, 'DETECTION_MODEL_DIR', settings.BASE_DIR / 'models' / 'yolov5'))
+
+
+def get_repo_dir():
+    """Return the pinned YOLOv5 source tree"""
+    return get_model_dir() / 'repo'
+
+
+def get_weights_path(model_name, backend='torch'):
+    """Return the weights file for a model variant and inference backend"""
+    if backend not in BACKEND_SUFFIXES:
+        raise ValueError(
+            f"Unknown detection backend '{backend}'. Choose from: {', '.join(BACKEND_SUFFIXES)}"
+        )
+    return get_model_dir() / f'{model_name}{BACKEND_SUFFIXES[backend]}'
+
+
+def is_available(model_name, backend='torch'):
+    """True if the model can be loaded without network access"""
+    return get_weights_path(model_name, backend).exists() and (get_repo_dir() / 'hubconf.py').exists()
+
+
+def load_local_model(model_name, backend='torch'):
+    """
+    Load a model from the registry
+
+    Args:
+        model_name (str): YOLOv5 model variant (yolov5s, yolov5m, ...)
+        backend (str): Inference backend (torch, torchscript, onnxruntime)
+
+    Returns:
+        AutoShape model ready for inference (same interface for every backend)
+
+    Raises:
+        FileNotFoundError: If the code or weights are missing from the registry
+    """
+    weights_path = get_weights_path(model_name, backend)
+    repo_dir = get_repo_dir()
+
+    if not is_available(model_name, backend):
+        hint = {
+            'torch': 'warm_models --download',
+            'onnxruntime-int8': 'quantize_detector',
+        }.get(backend, f'export_detector --backend {backend}')
+        raise FileNotFoundError(
+            f"YOLOv5 model '{model_name}' ({backend}) not found in {get_model_dir()} "
+            f"(expected {repo_dir / 'hubconf.py'} and {weights_path}). "
+            f"Run 'python manage.py {hint}'."
+        )
+
+    # hubconf picks DetectMultiBackend from the file suffix and wraps it in AutoShape
+    return torch.hub.load(str(repo_dir), 'custom', path=str(weights_path), source='local')
+
+
+def export_model(model_name, backend, image_size=640):
+    """
+    Export the registry's .pt weights to another inference backend
+
+    Args:
+        model_name (str): YOLOv5 model variant
+        backend (str): Target backend (torchscript, onnxruntime)
+        image_size (int): Input size used to trace the export; fixed for
+            TorchScript, while the ONNX graph has dynamic batch/height/width axes
+
+    Returns:
+        Path: Path of the exported model
+    """
+    if backend not in EXPORT_FORMATS:
+        raise ValueError(f"Nothing to export for backend '{backend}'")
+
+    if not is_available(model_name):
+        raise FileNotFoundError(
+            f"YOLOv5 model '{model_name}' not found in {get_model_dir()}, "
+            f"run 'python manage.py warm_models --download' first"
+        )
+
+    # Use the export script of the pinned YOLOv5 tree
+    repo_dir = str(get_repo_dir())
+    if repo_dir not in sys.path:
+        sys.path.insert(0, repo_dir)
+    import export as yolov5_export
+
+    yolov5_export.run(
+        weights=str(get_weights_path(model_name)),
+        imgsz=(image_size, image_size),
+        include=(EXPORT_FORMATS[backend],),
+        device='cpu',
+        # Dynamic axes keep detect_batch() working with ONNX Runtime
+        dynamic=backend == 'onnxruntime',
+    )
+
+    return get_weights_path(model_name, backend)
+
+
+def quantize_model(model_name, mode='static', calibration_images=None, image_size=640):
+    """
+    Quantize the exported ONNX graph to INT8 with ONNX Runtime
+
+    YOLOv5 is almost entirely Conv2d, which torch dynamic quantization does
+    not cover, so quantization is done on the ONNX graph instead.
+
+    Args:
+        model_name (str): YOLOv5 model variant
+        mode (str): 'dynamic' (weights only) or 'static' (weights + activations,
+            calibrated on calibration_images)
+        calibration_images (list): Image paths used to calibrate activation ranges
+        image_size (int): Input size the ONNX graph was exported with
+
+    Returns:
+        Path: Path of the quantized model (backend 'onnxruntime-int8')
+    """
+    import onnx
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    source = get_weights_path(model_name, 'onnxruntime')
+    if not source.exists():
+        raise FileNotFoundError(
+            f"{source} not found, run 'python manage.py export_detector --backend onnxruntime' first"
+        )
+    target = get_weights_path(model_name, 'onnxruntime-int8')
+
+    if mode == 'dynamic':
+        quantize_dynamic(str(source), str(target), weight_type=QuantType.QUInt8)
+    elif mode == 'static':
+        if not calibration_images:
+            raise ValueError('Static quantization needs calibration images')
+        reader = _CalibrationReader(onnx.load(str(source)).graph.input[0].name, calibration_images, image_size)
+        quantize_static(
+            str(source), str(target), reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+        )
+    else:
+        raise ValueError(f"Unknown quantization mode '{mode}'")
+
+    # DetectMultiBackend reads stride / class names from the model metadata
+    original, quantized = onnx.load(str(source)), onnx.load(str(target))
+    if not quantized.metadata_props:
+        for prop in original.metadata_props:
+            quantized.metadata_props.add(key=prop.key, value=prop.value)
+        onnx.save(quantized, str(target))
+
+    return target
+
+
+class _CalibrationReader:
+    """Feeds letterboxed images to onnxruntime's static quantization (CalibrationDataReader API)"""
+
+    def __init__(self, input_name, image_paths, image_size):
+        self.input_name = input_name
+        self.image_paths = list(image_paths)
+        self.image_size = image_size
+        self._iterator = iter(self.image_paths)
+
+    def get_next(self):
+        for path in self._iterator:
+            img = cv2.imread(str(path))
+            if img is not None:
+                return {self.input_name: _letterbox(img, self.image_size)}
+        return None
+
+    def rewind(self):
+        self._iterator = iter(self.image_paths)
+
+
+def _letterbox(img, size):
+    """Resize keeping the aspect ratio, pad to size x size, return a NCHW float32 RGB tensor"""
+    h, w = img.shape[:2]
+    ratio = size / max(h, w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - new_h) // 2, (size - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    tensor = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return np.ascontiguousarray(tensor[None])
+
+
+def fetch_model(model_name):
+    """
+    Populate the registry from GitHub (needs network access, run once)
+
+    Args:
+        model_name (str): YOLOv5 model variant
+
+    Returns:
+        Path: Path of the stored weights
+    """
+    model_dir = get_model_dir()
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    repo_dir = get_repo_dir()
+    if not (repo_dir / 'hubconf.py').exists():
+        # Populates the torch hub cache with the YOLOv5 code, then pins a copy
+        torch.hub.load('ultralytics/yolov5', model_name, pretrained=False, autoshape=False)
+        hub_repo = Path(torch.hub.get_dir()) / 'ultralytics_yolov5_master'
+        shutil.copytree(hub_repo, repo_dir, dirs_exist_ok=True)
+
+    weights_path = get_weights_path(model_name)
+    if not weights_path.exists():
+        url = getattr(settings, 'DETECTION_WEIGHTS_URL', DEFAULT_WEIGHTS_URL).format(model_name=model_name)
+        torch.hub.download_url_to_file(url, str(weights_path))
+
+    return weights_path
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.core.exceptions import ValidationError
 import json
 
 
@@ -50,3 +51,158 @@ class DetectionResult(models.Model):
     def set_detection_data(self, data):
         """Store detection data as JSON"""
         self.detection_data = json.dumps(data)
+    
+    # detection_data as currently reflected in the DetectedObject rows
+    _synced_detection_data = ''
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._synced_detection_data = instance.__dict__.get('detection_data', '')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """Save and keep the DetectedObject rows in sync with detection_data"""
+        update_fields = kwargs.get('update_fields')
+        changed = (
+            (update_fields is None or 'detection_data' in update_fields)
+            and 'detection_data' in self.__dict__
+            and self.detection_data != self._synced_detection_data
+        )
+        if not changed:
+            return super().save(*args, **kwargs)
+        
+        # Same transaction: the rows exist when on_commit callbacks (analytics jobs) run
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_detected_objects()
+    
+    def sync_detected_objects(self):
+        """Rewrite the DetectedObject rows of this detection from detection_data"""
+        self.detected_objects.all().delete()
+        DetectedObject.objects.bulk_create([
+            DetectedObject(detection=self, user_id=self.user_id, detected_at=self.uploaded_at, **fields)
+            for fields in parse_detected_objects(self.detection_data)
+        ])
+        self._synced_detection_data = self.detection_data
+
+
+def parse_detected_objects(detection_data):
+    """
+    DetectedObject field values from a detection_data JSON string
+    Accepts the decoder format (bbox dict) and the legacy box list [xmin, ymin, xmax, ymax]
+    
+    Returns:
+        list: One dict (object_class, confidence, xmin, ymin, xmax, ymax) per object
+    """
+    try:
+        objects = json.loads(detection_data) if detection_data else []
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(objects, list):
+        return []
+    
+    rows = []
+    for obj in objects:
+        if not isinstance(obj, dict):
+            continue
+        box = obj.get('bbox') or obj.get('box')
+        if isinstance(box, dict):
+            box = [box.get('xmin'), box.get('ymin'), box.get('xmax'), box.get('ymax')]
+        if not isinstance(box, (list, tuple)) or len(box) != 4:
+            box = [None] * 4
+        xmin, ymin, xmax, ymax = (_to_float(value, None) for value in box)
+        rows.append({
+            'object_class': str(obj.get('class', 'unknown'))[:100],
+            'confidence': _to_float(obj.get('confidence'), 0.0),
+            'xmin': xmin, 'ymin': ymin, 'xmax': xmax, 'ymax': ymax,
+        })
+    return rows
+
+
+def _to_float(value, default):
+    """float(value), or default when the value is missing or not numeric"""
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class DetectedObject(models.Model):
+    """
+    One object of a DetectionResult, denormalized from detection_data
+    Lets analytics aggregate in the database instead of parsing JSON row by row
+    """
+    detection = models.ForeignKey(
+        DetectionResult,
+        on_delete=models.CASCADE,
+        related_name='detected_objects'
+    )
+    # Copied from the detection to aggregate without a join
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='detected_objects'
+    )
+    detected_at = models.DateTimeField()
+    
+    object_class = models.CharField(max_length=100)
+    confidence = models.FloatField(default=0.0)
+    xmin = models.FloatField(null=True, blank=True)
+    ymin = models.FloatField(null=True, blank=True)
+    xmax = models.FloatField(null=True, blank=True)
+    ymax = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Detected Object'
+        verbose_name_plural = 'Detected Objects'
+        indexes = [
+            models.Index(fields=['user', 'detected_at']),
+            models.Index(fields=['user', 'object_class', 'detected_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.object_class} ({self.confidence:.2f}) - detection #{self.detection_id}"
+
+
+class CameraZone(models.Model):
+    """Polygon region of interest or exclusion zone of a camera"""
+    ZONE_TYPES = (
+        ('include', 'Region of interest'),
+        ('exclude', 'Exclusion zone'),
+    )
+    
+    camera_id = models.CharField(
+        max_length=100,
+        db_index=True,
+        help_text="SecurityCamera id (see CameraManager), or CameraSettings name for the motion detector"
+    )
+    name = models.CharField(max_length=100)
+    zone_type = models.CharField(max_length=10, choices=ZONE_TYPES, default='include')
+    points = models.JSONField(
+        default=list,
+        help_text="Polygon vertices [[x, y], ...] as fractions (0-1) of the frame width and height"
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['camera_id', 'name']
+        verbose_name = 'Camera Zone'
+        verbose_name_plural = 'Camera Zones'
+    
+    def __str__(self):
+        return f"{self.camera_id} - {self.name} ({self.get_zone_type_display()})"
+    
+    def clean(self):
+        """Validate the polygon: at least 3 [x, y] vertices inside the frame"""
+        points = self.points
+        if not isinstance(points, list) or len(points) < 3:
+            raise ValidationError({'points': 'A zone needs at least 3 vertices.'})
+        for point in points:
+            if not isinstance(point, (list, tuple)) or len(point) != 2 or \
+                    not all(isinstance(v, (int, float)) and 0 <= v <= 1 for v in point):
+                raise ValidationError({'points': f'Invalid vertex {point!r}: expected [x, y] with 0 <= x, y <= 1.'})
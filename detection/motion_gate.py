@@ -0,0 +1,92 @@
+"""
+Motion gating for object detection
+Cheap frame differencing (the mouvment_detection algorithm: blur, absdiff,
+threshold, dilate, contours) decides per camera whether YOLO needs to run at
+all, and where: the union of the moving regions can be used as a crop so the
+detector only looks at what changed.
+"""
+import cv2
+
+
+class MotionGate:
+    """
+    Frame-differencing gate in front of the detector
+    """
+
+    def __init__(self, threshold=25, min_area=500, scale=0.5, padding=32, max_idle_frames=150):
+        """
+        Args:
+            threshold (int): Pixel intensity difference counted as change
+            min_area (int): Minimum contour area (full-resolution pixels) counted as motion
+            scale (float): Downscale factor for differencing (cheaper, less noise)
+            padding (int): Pixels added around the motion region
+            max_idle_frames (int): Force one full-frame detection after this many
+                still frames (lighting drift, objects that entered very slowly)
+        """
+        self.threshold = threshold
+        self.min_area = min_area
+        self.scale = scale
+        self.padding = padding
+        self.max_idle_frames = max_idle_frames
+        self.zones = None  # ZoneMask: motion outside the watched area is ignored
+
+        self._previous = None
+        self._idle_frames = 0
+
+    def reset(self):
+        """Forget the reference frame (next check() opens the gate)"""
+        self._previous = None
+        self._idle_frames = 0
+
+    def _prepare(self, frame):
+        """Downscaled, blurred grayscale frame"""
+        if self.scale != 1:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        kernel = max(3, int(21 * self.scale) | 1)
+        return cv2.GaussianBlur(gray, (kernel, kernel), 0)
+
+    def check(self, frame):
+        """
+        Compare a frame with the previous one
+
+        Args:
+            frame (numpy.ndarray): BGR frame
+
+        Returns:
+            tuple: (run_detector, roi) where roi is (xmin, ymin, xmax, ymax) of the
+                changed region in full-resolution pixels, or None for the whole frame
+        """
+        gray = self._prepare(frame)
+        previous, self._previous = self._previous, gray
+
+        if previous is None or previous.shape != gray.shape:
+            return True, None
+
+        delta = cv2.absdiff(previous, gray)
+        thresh = cv2.threshold(delta, self.threshold, 255, cv2.THRESH_BINARY)[1]
+        if self.zones is not None:
+            thresh = self.zones.apply(thresh)
+        thresh = cv2.dilate(thresh, None, iterations=2)
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        min_area = self.min_area * self.scale * self.scale
+        boxes = [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) >= min_area]
+
+        if not boxes:
+            self._idle_frames += 1
+            if self._idle_frames >= self.max_idle_frames:
+                self._idle_frames = 0
+                return True, None
+            return False, None
+
+        self._idle_frames = 0
+
+        # Union of the moving regions, back to full resolution
+        height, width = frame.shape[:2]
+        xmin = min(x for x, _, _, _ in boxes) / self.scale - self.padding
+        ymin = min(y for _, y, _, _ in boxes) / self.scale - self.padding
+        xmax = max(x + w for x, _, w, _ in boxes) / self.scale + self.padding
+        ymax = max(y + h for _, y, _, h in boxes) / self.scale + self.padding
+        roi = (max(0, int(xmin)), max(0, int(ymin)), min(width, int(xmax)), min(height, int(ymax)))
+        return True, roi
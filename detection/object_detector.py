@@ -9,10 +9,19 @@ import numpy as np
 from PIL import Image
 from pathlib import Path
 import os
-import json
 from datetime import datetime
 from threading import Thread, Lock
 import time
+from django.conf import settings
+from . import model_registry
+from .result_decoder import class_ids_for, decode_predictions, to_detection_dicts
+from .frame_buffer import LatestFrameBuffer
+from .streaming import MJPEGBroadcaster
+from .event_log import get_event_log
+from .snapshot_writer import get_snapshot_writer
+from .tracker import IoUTracker, TRACK_DTYPE
+from .motion_gate import MotionGate
+from .zones import load_zone_mask
 
 
 class ObjectDetector:
@@ -20,30 +29,75 @@ class ObjectDetector:
     YOLOv5-based object detector for Django application
     """
     
-    def __init__(self, model_name='yolov5s', confidence_threshold=0.25):
+    def __init__(self, model_name='yolov5s', confidence_threshold=0.25, backend=None):
         """
         Initialize the YOLOv5 model
         
         Args:
             model_name (str): YOLOv5 model variant (yolov5s, yolov5m, yolov5l, yolov5x)
             confidence_threshold (float): Confidence threshold for detections (0.0 to 1.0)
+            backend (str): Inference backend (torch, torchscript, onnxruntime),
+                defaults to settings.DETECTION_BACKEND
         """
         self.model_name = model_name
         self.confidence_threshold = confidence_threshold
+        self.backend = backend or getattr(settings, 'DETECTION_BACKEND', 'torch')
         self.model = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.is_warm = False
         self.load_model()
     
     def load_model(self):
-        """Load YOLOv5 model from torch hub"""
+        """
+        Load YOLOv5 model from the local model registry
+        
+        Falls back to torch hub (network) only for the torch backend and when
+        DETECTION_ALLOW_HUB_DOWNLOAD is enabled
+        """
+        start = time.perf_counter()
         try:
-            # Load YOLOv5 model from ultralytics repository
-            self.model = torch.hub.load('ultralytics/yolov5', self.model_name, pretrained=True)
+            if model_registry.is_available(self.model_name, self.backend):
+                # Pinned code + weights on disk: no network access
+                self.model = model_registry.load_local_model(self.model_name, self.backend)
+            elif self.backend == 'torch' and getattr(settings, 'DETECTION_ALLOW_HUB_DOWNLOAD', True):
+                print(f"⚠️ YOLOv5 model '{self.model_name}' not in local registry, loading from torch hub")
+                # Load YOLOv5 model from ultralytics repository
+                self.model = torch.hub.load('ultralytics/yolov5', self.model_name, pretrained=True)
+            else:
+                # Raises FileNotFoundError with instructions
+                self.model = model_registry.load_local_model(self.model_name, self.backend)
             self.model.conf = self.confidence_threshold
-            print(f"✅ YOLOv5 model '{self.model_name}' loaded successfully")
+            self.load_seconds = time.perf_counter() - start
+            print(f"✅ YOLOv5 model '{self.model_name}' ({self.backend}) loaded successfully ({self.load_seconds:.1f}s)")
         except Exception as e:
             print(f"❌ Error loading YOLOv5 model: {str(e)}")
             raise
     
+    def warmup(self, runs=2, image_size=640):
+        """
+        Run dummy inferences so the first real request does not pay for lazy
+        initialisation (memory allocation, kernel selection, ...)
+        
+        Args:
+            runs (int): Number of dummy inferences
+            image_size (int): Size of the square dummy image
+            
+        Returns:
+            float: Seconds spent warming up
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Call load_model() first.")
+        
+        start = time.perf_counter()
+        dummy = np.zeros((image_size, image_size, 3), dtype=np.uint8)
+        for _ in range(runs):
+            self.model(dummy)
+        self.warmup_seconds = time.perf_counter() - start
+        self.is_warm = True
+        
+        return self.warmup_seconds
+    
     def detect_objects(self, image_path):
         """
         Perform object detection on an image
@@ -64,32 +118,76 @@ class ObjectDetector:
         results = self.model(image_path)
         
         # Extract detection data
-        detections = []
-        df = results.pandas().xyxy[0]  # Pandas DataFrame with detection results
-        
-        for _, row in df.iterrows():
-            detection = {
-                'class': row['name'],
-                'confidence': float(row['confidence']),
-                'bbox': {
-                    'xmin': int(row['xmin']),
-                    'ymin': int(row['ymin']),
-                    'xmax': int(row['xmax']),
-                    'ymax': int(row['ymax'])
-                }
-            }
-            detections.append(detection)
-        
-        # Get image shape
-        img = Image.open(image_path)
-        image_shape = {'width': img.width, 'height': img.height}
+        detections = self._extract_detections(results, 0)
         
         return {
             'detections': detections,
             'count': len(detections),
-            'image_shape': image_shape
+            'image_shape': self._image_shape(image_path)
         }
     
+    def detect_batch(self, sources, batch_size=8):
+        """
+        Perform object detection on several images, batch_size images per forward pass
+        
+        Args:
+            sources (list): Image paths or numpy arrays (arrays are passed to the
+                model as-is, like SecurityCamera.detect_frame does)
+            batch_size (int): Number of images stacked into a single forward pass
+            
+        Returns:
+            list: One result dict per input, in input order, same format as detect_objects()
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Call load_model() first.")
+        
+        batch_size = max(1, int(batch_size))
+        sources = list(sources)
+        batch_results = []
+        
+        for start in range(0, len(sources), batch_size):
+            chunk = [
+                str(src) if isinstance(src, Path) else src
+                for src in sources[start:start + batch_size]
+            ]
+            
+            # AutoShape letterboxes the whole list into one tensor -> one forward pass
+            results = self.model(chunk)
+            
+            for index, src in enumerate(chunk):
+                detections = self._extract_detections(results, index)
+                batch_results.append({
+                    'detections': detections,
+                    'count': len(detections),
+                    'image_shape': self._image_shape(src)
+                })
+        
+        return batch_results
+    
+    def _extract_detections(self, results, index):
+        """
+        Convert the detections of one image of a YOLOv5 Results object to dicts
+        
+        Args:
+            results: YOLOv5 Results object
+            index (int): Position of the image in the batch
+            
+        Returns:
+            list: Detection dictionaries (class, confidence, bbox)
+        """
+        decoded = decode_predictions(results.xyxy[index])
+        return to_detection_dicts(decoded, results.names)
+    
+    @staticmethod
+    def _image_shape(source):
+        """Return {'width', 'height'} for an image path or numpy array"""
+        if isinstance(source, np.ndarray):
+            return {'width': int(source.shape[1]), 'height': int(source.shape[0])}
+        
+        # PIL only reads the header here, pixels are never decoded
+        with Image.open(source) as img:
+            return {'width': img.width, 'height': img.height}
+    
     def draw_annotations(self, image_path, detections, output_path):
         """
         Draw bounding boxes and labels on the image
@@ -199,25 +297,56 @@ class ObjectDetector:
             results['annotated_image'] = None
         
         return results
+    
+    def process_batch(self, image_paths, output_paths, batch_size=8):
+        """
+        Batched version of process_image()
+        
+        Args:
+            image_paths (list): Paths to input images
+            output_paths (list): Paths to save annotated images (same order)
+            batch_size (int): Number of images per forward pass
+            
+        Returns:
+            list: Detection results with annotated image path, one per input image
+        """
+        batch_results = self.detect_batch(image_paths, batch_size=batch_size)
+        
+        for image_path, output_path, results in zip(image_paths, output_paths, batch_results):
+            if results['count'] > 0:
+                results['annotated_image'] = self.draw_annotations(
+                    image_path,
+                    results['detections'],
+                    output_path
+                )
+            else:
+                results['annotated_image'] = None
+        
+        return batch_results
 
 
 # Singleton instance for reuse across requests
 _detector_instance = None
+_detector_lock = Lock()
 
-def get_detector(model_name='yolov5s', confidence_threshold=0.25):
+def get_detector(model_name='yolov5s', confidence_threshold=0.25, backend=None):
     """
     Get or create a singleton ObjectDetector instance
     
     Args:
         model_name (str): YOLOv5 model variant
         confidence_threshold (float): Confidence threshold for detections
+        backend (str): Inference backend, defaults to settings.DETECTION_BACKEND
         
     Returns:
         ObjectDetector: Singleton detector instance
     """
     global _detector_instance
     if _detector_instance is None:
-        _detector_instance = ObjectDetector(model_name, confidence_threshold)
+        # Startup warm-up and the first request may race to create the model
+        with _detector_lock:
+            if _detector_instance is None:
+                _detector_instance = ObjectDetector(model_name, confidence_threshold, backend)
     return _detector_instance
 
 
@@ -230,7 +359,8 @@ class SecurityCamera:
     """
     
     def __init__(self, camera_source=0, detector=None, target_classes=None, 
-                 snapshot_dir='media/security/snapshots', log_file='media/security/detection_log.json'):
+                 snapshot_dir='media/security/snapshots', log_file=None,
+                 camera_id='default', inference_worker=None, motion_gating=None, crop_to_motion=None):
         """
         Initialize security camera system
         
@@ -239,21 +369,35 @@ class SecurityCamera:
             detector (ObjectDetector): Pre-initialized detector instance
             target_classes (list): List of object classes to detect (e.g., ['person', 'car', 'dog'])
             snapshot_dir (str): Directory to save security snapshots
-            log_file (str): Path to detection log file
+            log_file (str): Path to the JSON-lines detection log
+                (default: settings.SECURITY_EVENT_LOG)
+            camera_id (str): Identifier of this camera (see CameraManager)
+            inference_worker (InferenceWorker): Shared worker to submit frames to;
+                None runs inference inline in the monitoring thread
+            motion_gating (bool): Only run the detector when frame differencing sees
+                change (default: settings.SECURITY_MOTION_GATING)
+            crop_to_motion (bool): Run the detector on the moving region only
+                (default: settings.SECURITY_MOTION_ROI_CROP)
         """
+        self.camera_id = camera_id
         self.camera_source = camera_source
         self.detector = detector or get_detector()
+        self.inference_worker = inference_worker
         
         # Target classes for security monitoring
         self.target_classes = target_classes or ['person', 'car', 'dog', 'cat', 'truck', 'motorcycle']
+        self._class_ids_key = None
+        self._class_ids = None
+        self._person_ids = None
         
         # File paths
         self.snapshot_dir = snapshot_dir
-        self.log_file = log_file
+        self.event_log = get_event_log(log_file)
+        self.snapshot_writer = get_snapshot_writer()
+        self.log_file = self.event_log.path
         
         # Ensure directories exist
         os.makedirs(snapshot_dir, exist_ok=True)
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
         
         # Camera and detection state
         self.camera = None
@@ -263,9 +407,49 @@ class SecurityCamera:
         self.latest_detections = []
         self.frame_lock = Lock()
         
+        # Grabber -> inference hand-off (only the newest frame is kept)
+        self.frame_buffer = LatestFrameBuffer()
+        self.frame_interval = 0.0  # Playback pacing for video files
+        self._threads = []
+        
+        # Tracking: the detector runs every Nth processed frame, the tracker
+        # propagates boxes in between and turns detections into start/end events
+        self.detect_every = max(1, int(getattr(settings, 'SECURITY_DETECT_EVERY_N_FRAMES', 3)))
+        self.tracker = IoUTracker(
+            iou_threshold=getattr(settings, 'SECURITY_TRACK_IOU_THRESHOLD', 0.3),
+            max_age=getattr(settings, 'SECURITY_TRACK_MAX_AGE', 30),
+            min_hits=getattr(settings, 'SECURITY_TRACK_MIN_HITS', 2),
+            max_coast=2 * self.detect_every,
+        )
+        self._frames_since_detection = self.detect_every  # First frame runs the detector
+        
+        # Motion gating: static scenes skip the detector entirely
+        if motion_gating is None:
+            motion_gating = getattr(settings, 'SECURITY_MOTION_GATING', False)
+        self.motion_gate = MotionGate(
+            threshold=getattr(settings, 'SECURITY_MOTION_THRESHOLD', 25),
+            min_area=getattr(settings, 'SECURITY_MOTION_MIN_AREA', 500),
+            max_idle_frames=getattr(settings, 'SECURITY_MOTION_MAX_IDLE_FRAMES', 150),
+        ) if motion_gating else None
+        self.crop_to_motion = getattr(settings, 'SECURITY_MOTION_ROI_CROP', False) if crop_to_motion is None else crop_to_motion
+        
+        # Regions of interest / exclusion zones (CameraZone), loaded on start
+        self.zones = None
+        
+        # Encode-once MJPEG fan-out to all stream viewers
+        self.broadcaster = MJPEGBroadcaster(getattr(settings, 'SECURITY_STREAM_JPEG_QUALITY', 80))
+        
         # Statistics
-        self.total_detections = 0
-        self.person_count = 0
+        self.total_detections = 0  # Tracks started
+        self.person_count = 0  # Person tracks started
+        self.frames_processed = 0
+        self.detector_runs = 0
+        self.frames_gated = 0
+        self.detections_outside_zones = 0
+        self.last_latency_ms = None
+        self.avg_latency_ms = None
+        self.processing_fps = 0.0
+        self._last_processed_at = None
         
     def connect_camera(self):
         """
@@ -288,6 +472,13 @@ class SecurityCamera:
                 self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
                 self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
                 self.camera.set(cv2.CAP_PROP_FPS, 30)
+                # Keep the driver queue short, the grabber thread drains it anyway
+                self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                self.frame_interval = 0.0
+            else:
+                # Files are read instantly: play them back at their native frame rate
+                fps = self.camera.get(cv2.CAP_PROP_FPS) or 30
+                self.frame_interval = 1.0 / fps
 
             if not self.camera.isOpened():
                 print(f"[ERROR] Failed to open camera source: {self.camera_source}")
@@ -313,50 +504,71 @@ class SecurityCamera:
             self.camera = None
             print("📹 Camera disconnected")
     
-    def detect_frame(self, frame):
+    def detect_frame(self, frame, roi=None):
         """
         Run object detection on a single frame
         
         Args:
             frame (numpy.ndarray): Video frame from camera
+            roi (tuple): Optional xmin, ymin, xmax, ymax region to run the detector on
             
         Returns:
-            dict: Detection results with filtered target classes
+            dict: Detection results with filtered target classes:
+                - boxes: Structured array (see result_decoder.DETECTION_DTYPE), frame coordinates
+                - count: Number of detections
+                - timestamp: ISO timestamp of the inference
+                - region: roi (None for the whole frame)
         """
         if self.detector.model is None:
-            return {'detections': [], 'count': 0}
+            return {'boxes': decode_predictions(np.empty((0, 6))), 'count': 0,
+                    'timestamp': datetime.now().isoformat(), 'region': roi}
         
-        # Run inference on frame
-        results = self.detector.model(frame)
+        # Run inference on frame (or on the moving region only)
+        results = self.detector.model(self.crop_to_roi(frame, roi))
         
-        # Extract detections
-        detections = []
-        df = results.pandas().xyxy[0]
-        
-        for _, row in df.iterrows():
-            class_name = row['name']
-            
-            # Filter by target classes for security monitoring
-            if class_name in self.target_classes:
-                detection = {
-                    'class': class_name,
-                    'confidence': float(row['confidence']),
-                    'bbox': {
-                        'xmin': int(row['xmin']),
-                        'ymin': int(row['ymin']),
-                        'xmax': int(row['xmax']),
-                        'ymax': int(row['ymax'])
-                    },
-                    'timestamp': datetime.now().isoformat()
-                }
-                detections.append(detection)
+        # Filter by target classes for security monitoring (vectorized mask)
+        boxes = self.decode_detections(results.xyxy[0], roi)
         
         return {
-            'detections': detections,
-            'count': len(detections),
-            'timestamp': datetime.now().isoformat()
+            'boxes': boxes,
+            'count': len(boxes),
+            'timestamp': datetime.now().isoformat(),
+            'region': roi
         }
     
+    @staticmethod
+    def crop_to_roi(frame, roi):
+        """Detector input for a frame: the roi crop, or the frame itself"""
+        if roi is None:
+            return frame
+        xmin, ymin, xmax, ymax = roi
+        return frame[ymin:ymax, xmin:xmax]
+    
+    def decode_detections(self, pred, roi=None):
+        """
+        Decode one image's predictions, keep target classes and map boxes from
+        the roi crop back to frame coordinates
+        
+        Returns:
+            numpy.ndarray: Structured array with DETECTION_DTYPE
+        """
+        boxes = decode_predictions(pred, self.target_class_ids())
+        if roi is not None and len(boxes):
+            boxes['xmin'] += roi[0]
+            boxes['xmax'] += roi[0]
+            boxes['ymin'] += roi[1]
+            boxes['ymax'] += roi[1]
+        return boxes
+    
+    def target_class_ids(self):
+        """Class ids of target_classes, recomputed only when the list changes"""
+        key = tuple(self.target_classes)
+        if self._class_ids_key != key:
+            self._class_ids = class_ids_for(self.detector.model.names, key)
+            self._person_ids = class_ids_for(self.detector.model.names, ['person'])
+            self._class_ids_key = key
+        return self._class_ids
+    
     def annotate_frame(self, frame, detections):
         """
         Draw bounding boxes and labels on video frame
@@ -400,6 +612,8 @@ class SecurityCamera:
             
             # Prepare label
             label = f"{class_name.upper()}: {confidence:.2f}"
+            if 'track_id' in det:
+                label = f"{class_name.upper()} #{det['track_id']}: {confidence:.2f}"
             
             # Draw label background
             (text_width, text_height), baseline = cv2.getTextSize(
@@ -453,105 +667,188 @@ class SecurityCamera:
         
         return annotated
     
-    def save_snapshot(self, frame, detections):
+    def save_snapshot(self, frame, detections, key=None):
         """
-        Save snapshot when security event detected
+        Queue a snapshot when security event detected (written by the
+        background SnapshotWriter, at most one per camera/key per interval)
         
         Args:
-            frame (numpy.ndarray): Frame to save
+            frame (numpy.ndarray): Frame to save (not modified afterwards)
             detections (list): Detection information
+            key: Optional de-duplication key within this camera (e.g. a track id)
             
         Returns:
-            str: Path to saved snapshot
+            str: Path the snapshot will be written to, None if skipped
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
         
         # Create filename with detection info
         detected_classes = "_".join([d['class'] for d in detections[:3]])
-        filename = f"snapshot_{timestamp}_{detected_classes}.jpg"
+        filename = f"snapshot_{self.camera_id}_{timestamp}_{detected_classes}.jpg"
         filepath = os.path.join(self.snapshot_dir, filename)
         
-        # Save annotated frame
-        cv2.imwrite(filepath, frame)
-        print(f"📸 Snapshot saved: {filename}")
+        # Encoding and disk I/O happen off the inference thread
+        if not self.snapshot_writer.submit(self.camera_id, frame, filepath, key=key):
+            return None
         
         return filepath
     
-    def log_detection(self, detections, snapshot_path=None):
+    def log_detection(self, detections, snapshot_path=None, event='track_started'):
         """
-        Log detection event to JSON file
+        Log detection event (appended asynchronously by the event log writer)
         
         Args:
             detections (list): Detection information
             snapshot_path (str): Path to saved snapshot (if any)
+            event (str): 'track_started' or 'track_ended'
         """
         log_entry = {
             'timestamp': datetime.now().isoformat(),
+            'event': event,
+            'track_ids': [d['track_id'] for d in detections if 'track_id' in d],
             'detection_count': len(detections),
             'detections': detections,
             'snapshot': snapshot_path,
-            'camera_source': str(self.camera_source)
+            'camera_source': str(self.camera_source),
+            'camera_id': self.camera_id
         }
         
-        # Read existing log
-        log_data = []
-        if os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, 'r') as f:
-                    log_data = json.load(f)
-            except json.JSONDecodeError:
-                log_data = []
+        self.event_log.append(log_entry)
+    
+    def schedule_frame(self, frame):
+        """
+        Decide how the next processed frame is handled (call once per frame)
         
-        # Append new entry
-        log_data.append(log_entry)
+        Args:
+            frame (numpy.ndarray): Frame about to be processed
+            
+        Returns:
+            tuple: (action, roi) with action one of
+                - 'detect': run the detector (on roi if not None, always within the zones)
+                - 'propagate': between two detector runs, the tracker predicts the boxes
+                - 'hold': motion gate closed, nothing changed since the last frame
+        """
+        roi = None
+        if self.motion_gate is not None:
+            moving, roi = self.motion_gate.check(frame)
+            if not moving:
+                # Run the detector as soon as something moves again
+                self._frames_since_detection = self.detect_every
+                self.frames_gated += 1
+                return 'hold', None
+            
+            # Crop only when it actually saves work
+            height, width = frame.shape[:2]
+            if not self.crop_to_motion or roi is None or \
+                    (roi[2] - roi[0]) * (roi[3] - roi[1]) > 0.5 * width * height:
+                roi = None
         
-        # Keep only last 1000 entries to prevent file bloat
-        if len(log_data) > 1000:
-            log_data = log_data[-1000:]
+        if self._frames_since_detection + 1 >= self.detect_every:
+            self._frames_since_detection = 0
+            if self.zones is not None:
+                roi = self.zones.clip(roi, frame.shape)
+            return 'detect', roi
         
-        # Write back to file
-        with open(self.log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        self._frames_since_detection += 1
+        return 'propagate', None
     
-    def process_frame(self, frame):
+    def process_frame(self, frame, captured_at=None):
         """
-        Process a single frame: detect, annotate, log, and save if needed
+        Process a single frame: detect (or propagate tracks), annotate, log, and save if needed
         
         Args:
             frame (numpy.ndarray): Video frame
+            captured_at (float): time.perf_counter() when the frame was grabbed
             
         Returns:
             dict: Processing results
         """
-        # Detect objects in frame
-        results = self.detect_frame(frame)
-        detections = results['detections']
+        # Detect objects in frame, or let the tracker predict / hold them
+        action, roi = self.schedule_frame(frame)
+        results = self.detect_frame(frame, roi) if action == 'detect' else None
+        return self.apply_detections(frame, results, captured_at, hold=action == 'hold')
+    
+    def _track_dicts(self, tracks, timestamp):
+        """Detection dicts (with track_id) for a list of tracker.Track objects"""
+        boxes = np.empty(len(tracks), dtype=TRACK_DTYPE)
+        for i, track in enumerate(tracks):
+            xmin, ymin, xmax, ymax = track.filter.box()
+            boxes[i] = (xmin, ymin, xmax, ymax, track.confidence, track.class_id, track.track_id)
+        return to_detection_dicts(boxes, self.detector.model.names, timestamp)
+    
+    def apply_detections(self, frame, results, captured_at=None, hold=False):
+        """
+        Track, annotate, publish, snapshot and log the detections of a frame
+        (called inline by process_frame or by the shared InferenceWorker)
+        
+        Args:
+            frame (numpy.ndarray): Video frame the detections belong to
+            results (dict): Output of detect_frame() (boxes, count, timestamp[, region]),
+                None if the detector was skipped on this frame
+            captured_at (float): time.perf_counter() when the frame was grabbed
+            hold (bool): Motion gate closed, tracks keep their state without aging
+            
+        Returns:
+            dict: Processing results
+        """
+        if results is None:
+            # Detector skipped: keep (static scene) or propagate existing tracks
+            tracked = self.tracker.hold() if hold else self.tracker.predict()
+            timestamp = datetime.now().isoformat()
+        else:
+            boxes = results['boxes']
+            if self.zones is not None:
+                # Objects outside the watched area never become tracks
+                inside = self.zones.filter(boxes, frame.shape)
+                self.detections_outside_zones += len(boxes) - len(inside)
+                boxes = inside
+            tracked = self.tracker.update(boxes, region=results.get('region'))
+            timestamp = results['timestamp']
+            self.detector_runs += 1
+        boxes = tracked['tracks']
+        
+        # Legacy dicts are only built when there is something to draw, log or serve
+        detections = []
+        if len(boxes) > 0:
+            detections = to_detection_dicts(boxes, self.detector.model.names, timestamp)
         
         # Annotate frame with bounding boxes
         annotated = self.annotate_frame(frame, detections)
         
         # Update shared state (thread-safe)
         with self.frame_lock:
-            self.current_frame = frame.copy()
-            self.annotated_frame = annotated.copy()
+            self.annotated_frame = annotated
             self.latest_detections = detections
+            self._update_processing_metrics(captured_at)
+        self.broadcaster.publish(annotated)
         
-        # Auto-save snapshot if person detected
+        # Events only when a track starts or ends, not on every frame
         snapshot_path = None
-        if any(d['class'] == 'person' for d in detections):
-            snapshot_path = self.save_snapshot(annotated, detections)
-            self.person_count += 1
+        started = tracked['started']
+        if started:
+            started_ids = {track.track_id for track in started}
+            started_detections = [d for d in detections if d['track_id'] in started_ids]
+            
+            # Snapshot when a new person appears (at most one per track)
+            self.target_class_ids()
+            new_persons = [track for track in started if track.class_id in self._person_ids]
+            if new_persons:
+                snapshot_path = self.save_snapshot(annotated, started_detections, key=new_persons[0].track_id)
+                self.person_count += len(new_persons)
+            
+            self.log_detection(started_detections, snapshot_path, event='track_started')
+            self.total_detections += len(started)
         
-        # Log detection event
-        if len(detections) > 0:
-            self.log_detection(detections, snapshot_path)
-            self.total_detections += len(detections)
+        if tracked['ended']:
+            self.log_detection(self._track_dicts(tracked['ended'], timestamp), event='track_ended')
         
         return {
             'detections': detections,
             'count': len(detections),
+            'started': [track.track_id for track in started],
+            'ended': [track.track_id for track in tracked['ended']],
             'snapshot': snapshot_path,
-            'timestamp': results['timestamp']
+            'timestamp': timestamp
         }
     
     def get_frame_for_streaming(self):
@@ -561,13 +858,8 @@ class SecurityCamera:
         Returns:
             bytes: JPEG encoded frame for HTTP response
         """
-        with self.frame_lock:
-            if self.annotated_frame is not None:
-                # Encode frame as JPEG
-                ret, buffer = cv2.imencode('.jpg', self.annotated_frame)
-                if ret:
-                    return buffer.tobytes()
-        return None
+        # Encoded once per new frame, shared by every caller
+        return self.broadcaster.latest_jpeg()
     
     def get_latest_detections(self):
         """
@@ -582,15 +874,54 @@ class SecurityCamera:
                 'count': len(self.latest_detections),
                 'total_detections': self.total_detections,
                 'person_count': self.person_count,
+                'metrics': self.get_metrics(),
                 'timestamp': datetime.now().isoformat()
             }
     
+    def get_metrics(self):
+        """
+        Capture / inference pipeline metrics
+        
+        Returns:
+            dict: Frame counters, capture-to-annotation latency (ms) and processing FPS
+        """
+        return {
+            'frames_captured': self.frame_buffer.frames_captured,
+            'frames_dropped': self.frame_buffer.frames_dropped,
+            'frames_processed': self.frames_processed,
+            'detector_runs': self.detector_runs,
+            'frames_gated': self.frames_gated,
+            'detections_outside_zones': self.detections_outside_zones,
+            'active_tracks': sum(1 for track in self.tracker.tracks if track.confirmed),
+            'latency_ms': round(self.last_latency_ms, 1) if self.last_latency_ms is not None else None,
+            'avg_latency_ms': round(self.avg_latency_ms, 1) if self.avg_latency_ms is not None else None,
+            'processing_fps': round(self.processing_fps, 1),
+            **self.broadcaster.get_stats(),
+        }
+    
+    def _update_processing_metrics(self, captured_at):
+        """Update latency / FPS statistics once an annotated frame is published"""
+        now = time.perf_counter()
+        self.frames_processed += 1
+        
+        if captured_at is not None:
+            self.last_latency_ms = (now - captured_at) * 1000
+            # Exponential moving average, smooths out single slow frames
+            self.avg_latency_ms = self.last_latency_ms if self.avg_latency_ms is None else \
+                0.9 * self.avg_latency_ms + 0.1 * self.last_latency_ms
+        
+        if self._last_processed_at is not None:
+            instant_fps = 1.0 / max(now - self._last_processed_at, 1e-6)
+            self.processing_fps = 0.9 * self.processing_fps + 0.1 * instant_fps if self.processing_fps else instant_fps
+        self._last_processed_at = now
+    
     def run_monitoring(self, frame_skip=2):
         """
-        Main monitoring loop - runs continuously
+        Grabber loop - reads frames as fast as the camera delivers them and
+        hands them to inference through the latest-frame buffer
         
         Args:
-            frame_skip (int): Process every Nth frame for performance
+            frame_skip (int): Offer every Nth frame to inference for performance
         """
         self.is_running = True
         frame_count = 0
@@ -604,68 +935,114 @@ class SecurityCamera:
             
             # Read frame from camera
             ret, frame = self.camera.read()
+            captured_at = time.perf_counter()
             
             if not ret:
                 print("⚠️ Failed to read frame")
                 time.sleep(0.1)
                 continue
             
-            # Process frame (skip frames for performance)
+            # Still update current frame for streaming
+            with self.frame_lock:
+                self.current_frame = frame
+                first_frame = self.annotated_frame is None
+                if first_frame:
+                    self.annotated_frame = frame
+            if first_frame:
+                # Viewers see the raw feed until the first inference completes
+                self.broadcaster.publish(frame)
+            
+            # Offer frame to inference (skip frames for performance); an older
+            # frame still waiting in the buffer is dropped
             if frame_count % frame_skip == 0:
-                self.process_frame(frame)
-            else:
-                # Still update current frame for streaming
-                with self.frame_lock:
-                    self.current_frame = frame.copy()
-                    if self.annotated_frame is None:
-                        self.annotated_frame = frame.copy()
+                self.frame_buffer.put(frame, captured_at)
+                if self.inference_worker is not None:
+                    # Batched with the other cameras, results come back via apply_detections()
+                    self.inference_worker.submit(self)
             
             frame_count += 1
             
-            # Small delay to prevent CPU overload
-            time.sleep(0.01)
+            if self.frame_interval:
+                time.sleep(max(0.0, self.frame_interval - (time.perf_counter() - captured_at)))
         
         print("🔒 Security monitoring stopped")
     
+    def run_inference(self):
+        """
+        Inference loop (without shared InferenceWorker) - processes the newest
+        frame each time the previous inference finishes
+        """
+        while self.is_running:
+            item = self.frame_buffer.wait_and_take(timeout=0.5)
+            if item is None:
+                continue
+            
+            frame, captured_at = item
+            try:
+                self.process_frame(frame, captured_at)
+            except Exception as e:
+                print(f"❌ Error processing frame: {e}")
+    
     def start_monitoring_thread(self):
-        """Start monitoring in background thread"""
+        """Start grabber (and inference) threads in background"""
         if not self.connect_camera():
             return False
         
         self.is_running = True
-        monitor_thread = Thread(target=self.run_monitoring, daemon=True)
-        monitor_thread.start()
+        self.frame_buffer.clear()
+        self.tracker.reset()
+        self.load_zones()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        self._threads = [Thread(target=self.run_monitoring, name=f'grabber-{self.camera_id}', daemon=True)]
+        if self.inference_worker is None:
+            self._threads.append(Thread(target=self.run_inference, name=f'inference-{self.camera_id}', daemon=True))
+        
+        for thread in self._threads:
+            thread.start()
         
         return True
     
+    def load_zones(self):
+        """Load the camera's regions of interest / exclusion zones from the database"""
+        try:
+            self.zones = load_zone_mask(self.camera_id)
+        except Exception as e:
+            print(f"⚠️ Could not load zones for camera {self.camera_id}: {e}")
+            self.zones = None
+        if self.motion_gate is not None:
+            self.motion_gate.zones = self.zones
+        if self.zones is not None:
+            print(f"🗺️ Zones loaded for camera {self.camera_id}: "
+                  f"{len(self.zones.include)} region(s), {len(self.zones.exclude)} exclusion(s)")
+    
     def stop_monitoring(self):
         """Stop monitoring and release resources"""
         self.is_running = False
-        time.sleep(0.5)  # Allow thread to finish
+        for thread in self._threads:
+            thread.join(timeout=2)  # Allow threads to finish
+        self._threads = []
+        self.frame_buffer.clear()
+        self.broadcaster.close()
         self.disconnect_camera()
 
 
-# Global security camera instance
-_security_camera = None
-
-def get_security_camera(camera_source=0, target_classes=None):
+def get_security_camera(camera_source=0, target_classes=None, camera_id='default'):
     """
-    Get or create singleton SecurityCamera instance
+    Get or create a SecurityCamera managed by the global CameraManager
     
     Args:
         camera_source (int or str): Camera source
         target_classes (list): Target object classes
+        camera_id (str): Camera identifier
         
     Returns:
         SecurityCamera: Security camera instance
     """
-    global _security_camera
-    if _security_camera is None:
-        detector = get_detector()
-        _security_camera = SecurityCamera(
-            camera_source=camera_source,
-            detector=detector,
-            target_classes=target_classes
-        )
-    return _security_camera
-
+    from .camera_manager import get_camera_manager
+    
+    return get_camera_manager().get_or_add_camera(
+        camera_id,
+        camera_source=camera_source,
+        target_classes=target_classes
+    )
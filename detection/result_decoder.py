@@ -0,0 +1,173 @@
+"""
+Vectorized decoding of YOLOv5 predictions
+Reads the raw results.xyxy tensors directly instead of going through
+results.pandas() + DataFrame.iterrows()
+"""
+import numpy as np
+
+
+# Compact per-box representation used between inference and the JSON boundary
+DETECTION_DTYPE = np.dtype([
+    ('xmin', np.int32),
+    ('ymin', np.int32),
+    ('xmax', np.int32),
+    ('ymax', np.int32),
+    ('confidence', np.float32),
+    ('class_id', np.int16),
+])
+
+
+def class_ids_for(names, class_names):
+    """
+    Map class names to model class ids
+
+    Args:
+        names (dict or list): Model class names (model.names / results.names)
+        class_names (iterable): Class names to keep
+
+    Returns:
+        numpy.ndarray: Sorted class ids (unknown names are ignored)
+    """
+    if isinstance(names, dict):
+        items = names.items()
+    else:
+        items = enumerate(names)
+
+    wanted = set(class_names)
+    return np.array(sorted(idx for idx, name in items if name in wanted), dtype=np.int16)
+
+
+def decode_predictions(pred, class_ids=None):
+    """
+    Convert one image's predictions to a structured array
+
+    Args:
+        pred (torch.Tensor or numpy.ndarray): (n, 6) array of
+            xmin, ymin, xmax, ymax, confidence, class
+        class_ids (numpy.ndarray): Class ids to keep (None keeps everything)
+
+    Returns:
+        numpy.ndarray: Structured array with DETECTION_DTYPE
+    """
+    if hasattr(pred, 'cpu'):
+        pred = pred.detach().cpu().numpy()
+    pred = np.asarray(pred, dtype=np.float32).reshape(-1, 6)
+
+    if class_ids is not None:
+        pred = pred[np.isin(pred[:, 5].astype(np.int16), class_ids)]
+
+    decoded = np.empty(len(pred), dtype=DETECTION_DTYPE)
+    for column, field in enumerate(('xmin', 'ymin', 'xmax', 'ymax')):
+        # Truncate like int() did on the pandas path
+        decoded[field] = pred[:, column]
+    decoded['confidence'] = pred[:, 4]
+    decoded['class_id'] = pred[:, 5]
+
+    return decoded
+
+
+def to_detection_dicts(decoded, names, timestamp=None):
+    """
+    Build the legacy list-of-dicts format (JSON boundary only)
+
+    Args:
+        decoded (numpy.ndarray): Structured array from decode_predictions()
+        names (dict or list): Model class names
+        timestamp (str): Optional ISO timestamp added to every detection
+
+    Returns:
+        list: Detection dictionaries (class, confidence, bbox[, track_id][, timestamp])
+    """
+    detections = []
+    tracked = 'track_id' in decoded.dtype.names
+
+    # tolist() converts the whole array to Python scalars in one C call
+    for row in decoded.tolist():
+        xmin, ymin, xmax, ymax, confidence, class_id = row[:6]
+        detection = {
+            'class': names[class_id],
+            'confidence': confidence,
+            'bbox': {
+                'xmin': xmin,
+                'ymin': ymin,
+                'xmax': xmax,
+                'ymax': ymax
+            }
+        }
+        if tracked:
+            detection['track_id'] = row[6]
+        if timestamp is not None:
+            detection['timestamp'] = timestamp
+        detections.append(detection)
+
+    return detections
+
+
+def box_iou(a, b):
+    """
+    Intersection over union of two bbox dicts (xmin, ymin, xmax, ymax)
+
+    Returns:
+        float: IoU in [0, 1]
+    """
+    inter_w = min(a['xmax'], b['xmax']) - max(a['xmin'], b['xmin'])
+    inter_h = min(a['ymax'], b['ymax']) - max(a['ymin'], b['ymin'])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+
+    inter = inter_w * inter_h
+    area_a = (a['xmax'] - a['xmin']) * (a['ymax'] - a['ymin'])
+    area_b = (b['xmax'] - b['xmin']) * (b['ymax'] - b['ymin'])
+    return inter / float(area_a + area_b - inter)
+
+
+def compare_detections(reference, candidate, iou_threshold=0.9, confidence_tolerance=0.05):
+    """
+    Check that two detection lists agree (e.g. torch vs exported backend)
+
+    Every reference box must match a candidate box of the same class with
+    IoU >= iou_threshold and a confidence within confidence_tolerance.
+
+    Args:
+        reference (list): Detection dictionaries from the reference backend
+        candidate (list): Detection dictionaries from the backend under test
+        iou_threshold (float): Minimum IoU for two boxes to match
+        confidence_tolerance (float): Maximum absolute confidence difference
+
+    Returns:
+        dict: matched, unmatched, min_iou, max_confidence_delta, ok
+    """
+    remaining = list(candidate)
+    matched = 0
+    min_iou = 1.0
+    max_confidence_delta = 0.0
+
+    for ref in reference:
+        best, best_iou = None, 0.0
+        for cand in remaining:
+            if cand['class'] != ref['class']:
+                continue
+            iou = box_iou(ref['bbox'], cand['bbox'])
+            if iou > best_iou:
+                best, best_iou = cand, iou
+
+        if best is None or best_iou < iou_threshold:
+            continue
+
+        delta = abs(best['confidence'] - ref['confidence'])
+        if delta > confidence_tolerance:
+            continue
+
+        remaining.remove(best)
+        matched += 1
+        min_iou = min(min_iou, best_iou)
+        max_confidence_delta = max(max_confidence_delta, delta)
+
+    unmatched = (len(reference) - matched) + len(remaining)
+    return {
+        'matched': matched,
+        'unmatched': unmatched,
+        'min_iou': min_iou if matched else None,
+        'max_confidence_delta': max_confidence_delta,
+        'ok': unmatched == 0,
+    }
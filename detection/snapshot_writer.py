@@ -0,0 +1,213 @@
+"""
+Background snapshot writer
+Cameras queue annotated frames; a small pool of threads JPEG-encodes and
+writes them, so disk latency never blocks inference. The queue is bounded
+(full -> snapshot dropped and counted), each camera/track gets at most
+one snapshot per min_interval seconds, and frames perceptually identical to
+the last snapshot of the camera are skipped (except the first snapshot of a
+new track, submitted with a key).
+"""
+from django.conf import settings
+from threading import Thread, Lock
+import cv2
+import os
+import queue
+import time
+from .image_hash import DuplicateFilter
+
+
+class SnapshotWriter:
+    """
+    Bounded snapshot queue drained by a pool of writer threads
+    """
+
+    def __init__(self, workers=2, max_queue=64, jpeg_quality=90, min_interval=5.0, duplicate_filter=None):
+        """
+        Args:
+            workers (int): Writer threads
+            max_queue (int): Snapshots waiting to be written before new ones are dropped
+            jpeg_quality (int): cv2.IMWRITE_JPEG_QUALITY of saved snapshots
+            min_interval (float): Minimum seconds between two snapshots of the same
+                camera (or of the same track when a key is given)
+            duplicate_filter (DuplicateFilter): Skips frames visually identical to
+                the camera's last snapshot (None disables)
+        """
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.jpeg_quality = int(jpeg_quality)
+        self.min_interval = min_interval
+        self.duplicate_filter = duplicate_filter
+
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._threads = []
+        self._lock = Lock()
+        self._last_saved = {}  # (camera_id, key) -> time.monotonic() of last accepted snapshot
+        self._prune_at = 256  # _last_saved size that triggers dropping expired entries
+
+        # Backpressure statistics
+        self.submitted = 0
+        self.written = 0
+        self.dropped_full = 0
+        self.deduplicated = 0
+        self.perceptual_duplicates = 0
+        self.errors = 0
+        self.queue_high_water = 0
+        self.last_write_ms = 0.0
+        self.avg_write_ms = None
+
+    def _ensure_workers(self):
+        """Start the writer threads on first use"""
+        if self._threads:
+            return
+        with self._lock:
+            if not self._threads:
+                self._threads = [
+                    Thread(target=self._run, name=f'snapshot-writer-{i}', daemon=True)
+                    for i in range(self.workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+
+    def submit(self, camera_id, frame, filepath, key=None):
+        """
+        Queue a frame to be written as JPEG (never blocks)
+
+        Args:
+            camera_id (str): Camera the frame comes from
+            frame (numpy.ndarray): Frame to save, must not be modified afterwards
+            filepath (str): Destination file
+            key: Optional de-duplication key within the camera (e.g. a track id);
+                keyed snapshots are not subject to the perceptual duplicate filter,
+                a new track is worth a snapshot even if the scene looks unchanged
+
+        Returns:
+            bool: True if queued, False if de-duplicated or dropped because the queue is full
+        """
+        now = time.monotonic()
+        dedup_key = (camera_id, key)
+
+        with self._lock:
+            last = self._last_saved.get(dedup_key)
+            if last is not None and now - last < self.min_interval:
+                self.deduplicated += 1
+                return False
+
+            # dHash of a 9x8 thumbnail: cheap enough for the inference thread
+            image_hash = None
+            if self.duplicate_filter is not None:
+                is_duplicate, image_hash = self.duplicate_filter.is_duplicate(camera_id, frame)
+                if is_duplicate and key is None:
+                    self.perceptual_duplicates += 1
+                    return False
+
+            try:
+                self._queue.put_nowait((frame, filepath))
+            except queue.Full:
+                self.dropped_full += 1
+                return False
+
+            # Only a queued snapshot becomes the reference for later duplicates
+            if image_hash is not None:
+                self.duplicate_filter.commit(camera_id, image_hash)
+            self._last_saved[dedup_key] = now
+            if len(self._last_saved) >= self._prune_at:
+                self._prune(now)
+            self.submitted += 1
+            self.queue_high_water = max(self.queue_high_water, self._queue.qsize())
+
+        self._ensure_workers()
+        return True
+
+    def _prune(self, now):
+        """
+        Drop the entries older than min_interval (they no longer hold anything back);
+        one per ended track would otherwise accumulate on long-running cameras
+        Called with self._lock held; amortized by doubling the next trigger size.
+        """
+        self._last_saved = {
+            dedup_key: saved_at for dedup_key, saved_at in self._last_saved.items()
+            if now - saved_at < self.min_interval
+        }
+        self._prune_at = max(256, 2 * len(self._last_saved))
+
+    def _run(self):
+        """Writer loop: encode and write queued snapshots"""
+        while True:
+            frame, filepath = self._queue.get()
+            start = time.perf_counter()
+            try:
+                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if not ret:
+                    raise ValueError('JPEG encoding failed')
+                os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+                with open(filepath, 'wb') as f:
+                    f.write(buffer.tobytes())
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"❌ Failed to save snapshot {filepath}: {e}")
+            else:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    self.written += 1
+                    self.last_write_ms = elapsed_ms
+                    self.avg_write_ms = elapsed_ms if self.avg_write_ms is None else \
+                        0.9 * self.avg_write_ms + 0.1 * elapsed_ms
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every queued snapshot has been written
+
+        Returns:
+            bool: True if the queue was drained
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def get_stats(self):
+        """Writer / backpressure statistics for status endpoints"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'queue_high_water': self.queue_high_water,
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped_full': self.dropped_full,
+            'deduplicated': self.deduplicated,
+            'perceptual_duplicates': self.perceptual_duplicates,
+            'errors': self.errors,
+            'last_write_ms': round(self.last_write_ms, 1),
+            'avg_write_ms': round(self.avg_write_ms, 1) if self.avg_write_ms is not None else None,
+        }
+
+
+# Global snapshot writer instance
+_snapshot_writer = None
+_snapshot_writer_lock = Lock()
+
+def get_snapshot_writer():
+    """
+    Get or create the singleton SnapshotWriter shared by all cameras
+
+    Returns:
+        SnapshotWriter: Snapshot writer instance
+    """
+    global _snapshot_writer
+    if _snapshot_writer is None:
+        with _snapshot_writer_lock:
+            if _snapshot_writer is None:
+                threshold = getattr(settings, 'SECURITY_SNAPSHOT_HASH_THRESHOLD', 5)
+                _snapshot_writer = SnapshotWriter(
+                    workers=getattr(settings, 'SECURITY_SNAPSHOT_WORKERS', 2),
+                    max_queue=getattr(settings, 'SECURITY_SNAPSHOT_QUEUE_SIZE', 64),
+                    jpeg_quality=getattr(settings, 'SECURITY_SNAPSHOT_JPEG_QUALITY', 90),
+                    min_interval=getattr(settings, 'SECURITY_SNAPSHOT_MIN_INTERVAL', 5.0),
+                    duplicate_filter=DuplicateFilter(threshold) if threshold is not None and threshold >= 0 else None,
+                )
+    return _snapshot_writer
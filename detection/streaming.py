@@ -0,0 +1,141 @@
+"""
+Encode-once MJPEG broadcasting
+A producer publishes each new annotated frame; it is JPEG-encoded at most once
+and the same bytes are handed to every connected viewer. Viewers block on a
+condition until a newer frame exists instead of polling.
+"""
+from threading import Condition, Lock
+import cv2
+
+
+class MJPEGBroadcaster:
+    """
+    Fan-out of the latest frame to any number of MJPEG stream viewers
+    """
+
+    def __init__(self, jpeg_quality=80):
+        """
+        Args:
+            jpeg_quality (int): cv2.IMWRITE_JPEG_QUALITY used for the stream
+        """
+        self.jpeg_quality = int(jpeg_quality)
+
+        self._condition = Condition()
+        self._encode_lock = Lock()
+        self._frame = None
+        self._sequence = 0
+        self._closed = False
+
+        self._jpeg = None
+        self._jpeg_sequence = 0
+
+        # Statistics
+        self.viewers = 0
+        self.frames_published = 0
+        self.frames_encoded = 0
+
+    def publish(self, frame):
+        """
+        Make a new frame available to viewers (no encoding happens here)
+
+        Args:
+            frame (numpy.ndarray): Frame to broadcast, must not be modified afterwards
+        """
+        with self._condition:
+            self._frame = frame
+            self._sequence += 1
+            self._closed = False
+            self.frames_published += 1
+            self._condition.notify_all()
+
+    def close(self):
+        """Wake every waiting viewer so streams can end (e.g. camera stopped)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _encode(self, frame, sequence):
+        """
+        JPEG-encode a frame unless a viewer already did it for this sequence
+
+        Returns:
+            tuple: (sequence, bytes) of the newest encoded frame
+        """
+        with self._encode_lock:
+            if self._jpeg_sequence < sequence:
+                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+                if ret:
+                    self._jpeg = buffer.tobytes()
+                    self._jpeg_sequence = sequence
+                    self.frames_encoded += 1
+            return self._jpeg_sequence, self._jpeg
+
+    def latest_jpeg(self):
+        """
+        JPEG bytes of the newest frame (encoded once, then cached)
+
+        Returns:
+            bytes: JPEG data or None if nothing was published yet
+        """
+        with self._condition:
+            frame, sequence = self._frame, self._sequence
+        if frame is None:
+            return None
+        return self._encode(frame, sequence)[1]
+
+    def wait_for_frame(self, last_sequence=0, timeout=1.0):
+        """
+        Block until a frame newer than last_sequence is published
+
+        Args:
+            last_sequence (int): Sequence number of the last frame the viewer sent
+            timeout (float): Maximum wait in seconds
+
+        Returns:
+            tuple: (sequence, jpeg bytes) or None on timeout / close
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._closed or (self._frame is not None and self._sequence > last_sequence),
+                timeout=timeout
+            )
+            if self._frame is None or self._sequence <= last_sequence:
+                return None
+            frame, sequence = self._frame, self._sequence
+
+        sequence, jpeg = self._encode(frame, sequence)
+        return (sequence, jpeg) if jpeg is not None else None
+
+    def stream(self, is_active):
+        """
+        Generator yielding JPEG bytes of every new frame for one viewer
+
+        Args:
+            is_active (callable): Returns False once the stream should end
+
+        Yields:
+            bytes: JPEG encoded frame
+        """
+        with self._condition:
+            self.viewers += 1
+        try:
+            last_sequence = 0
+            while is_active():
+                item = self.wait_for_frame(last_sequence)
+                if item is None:
+                    if self._closed:
+                        break
+                    continue
+                last_sequence, jpeg = item
+                yield jpeg
+        finally:
+            with self._condition:
+                self.viewers -= 1
+
+    def get_stats(self):
+        """Broadcaster statistics for status endpoints"""
+        return {
+            'viewers': self.viewers,
+            'frames_published': self.frames_published,
+            'frames_encoded': self.frames_encoded,
+        }
@@ -1,3 +1,5 @@
+import os
+from unittest import skipUnless
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from .models import DetectionResult
@@ -37,3 +39,658 @@ class DetectionResultModelTest(TestCase):
         retrieved_data = detection.get_detection_data()
         self.assertEqual(len(retrieved_data), 2)
         self.assertEqual(retrieved_data[0]['class'], 'person')
+    
+    def test_detected_objects_synced_on_save(self):
+        """DetectedObject rows follow detection_data, other edits do not rewrite them"""
+        detection = DetectionResult.objects.create(user=self.user)
+        detection.set_detection_data([
+            {'class': 'person', 'confidence': 0.9, 'bbox': {'xmin': 1, 'ymin': 2, 'xmax': 30, 'ymax': 40}},
+            {'class': 'car', 'confidence': 0.8, 'box': [5, 6, 70, 80]},
+        ])
+        detection.save()
+        
+        objects = list(detection.detected_objects.order_by('id'))
+        self.assertEqual([o.object_class for o in objects], ['person', 'car'])
+        self.assertEqual((objects[0].xmin, objects[0].ymax), (1, 40))
+        self.assertEqual(objects[1].xmax, 70)
+        self.assertEqual(objects[0].user, self.user)
+        self.assertEqual(objects[0].detected_at, detection.uploaded_at)
+        
+        first_ids = [o.id for o in objects]
+        detection = DetectionResult.objects.get(pk=detection.pk)
+        detection.title = 'Entrance'
+        detection.save()
+        self.assertEqual(list(detection.detected_objects.values_list('id', flat=True).order_by('id')), first_ids)
+        
+        detection.set_detection_data([{'class': 'dog', 'confidence': 0.7}])
+        detection.save()
+        self.assertEqual(list(detection.detected_objects.values_list('object_class', flat=True)), ['dog'])
+        
+        # Malformed values do not make the detection save fail
+        detection.set_detection_data([{'class': 'cat', 'confidence': 'high', 'box': [0, 'x', 10, 10]}])
+        detection.save()
+        obj = detection.detected_objects.get()
+        self.assertEqual((obj.object_class, obj.confidence, obj.ymin, obj.xmax), ('cat', 0.0, None, 10.0))
+
+
+class FakeResults:
+    """Minimal stand-in for a YOLOv5 Results object"""
+    
+    names = {0: 'person', 2: 'car', 16: 'dog'}
+    
+    def __init__(self, preds):
+        # One (n, 6) array per image: xmin, ymin, xmax, ymax, confidence, class
+        self.xyxy = preds
+
+
+class FakeModel:
+    """Records the batches it receives and returns one detection per image"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, images):
+        import numpy as np
+        
+        images = images if isinstance(images, list) else [images]
+        self.calls.append(len(images))
+        return FakeResults([
+            np.array([[10, 20, 30, 40, 0.9, 0]], dtype=np.float32) for _ in images
+        ])
+
+
+class ObjectDetectorBatchTest(TestCase):
+    """Test cases for batched detection"""
+    
+    def setUp(self):
+        from .object_detector import ObjectDetector
+        
+        # Skip load_model(): no network / weights needed
+        self.detector = ObjectDetector.__new__(ObjectDetector)
+        self.detector.model = FakeModel()
+    
+    def test_detect_batch_chunks_forward_passes(self):
+        """Test that images are grouped into batch_size forward passes"""
+        import numpy as np
+        
+        frames = [np.zeros((48, 64, 3), dtype=np.uint8) for _ in range(5)]
+        results = self.detector.detect_batch(frames, batch_size=2)
+        
+        self.assertEqual(self.detector.model.calls, [2, 2, 1])
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0]['count'], 1)
+        self.assertEqual(results[0]['detections'][0]['class'], 'person')
+        self.assertEqual(results[0]['detections'][0]['bbox']['xmax'], 30)
+        self.assertEqual(results[0]['image_shape'], {'width': 64, 'height': 48})
+
+
+class ResultDecoderTest(TestCase):
+    """Test cases for vectorized result decoding"""
+    
+    def test_decode_filters_target_classes(self):
+        """Test that the class mask keeps only the requested classes"""
+        import numpy as np
+        from .result_decoder import class_ids_for, decode_predictions, to_detection_dicts
+        
+        pred = np.array([
+            [10.7, 20.2, 30.9, 40.1, 0.9, 0],
+            [5, 5, 15, 15, 0.5, 2],
+            [1, 2, 3, 4, 0.4, 16],
+        ], dtype=np.float32)
+        class_ids = class_ids_for(FakeResults.names, ['person', 'dog', 'unknown'])
+        
+        boxes = decode_predictions(pred, class_ids)
+        self.assertEqual(len(boxes), 2)
+        self.assertEqual(boxes['class_id'].tolist(), [0, 16])
+        
+        detections = to_detection_dicts(boxes, FakeResults.names, timestamp='now')
+        self.assertEqual(detections[0]['class'], 'person')
+        self.assertEqual(detections[0]['bbox'], {'xmin': 10, 'ymin': 20, 'xmax': 30, 'ymax': 40})
+        self.assertEqual(detections[1]['timestamp'], 'now')
+    
+    def test_decode_empty_predictions(self):
+        """Test decoding an image without detections"""
+        import numpy as np
+        from .result_decoder import decode_predictions
+        
+        boxes = decode_predictions(np.empty((0, 6), dtype=np.float32))
+        self.assertEqual(len(boxes), 0)
+    
+    def test_compare_detections_tolerance(self):
+        """Test box parity matching between two backends"""
+        from .result_decoder import compare_detections
+        
+        reference = [{'class': 'person', 'confidence': 0.90,
+                      'bbox': {'xmin': 10, 'ymin': 10, 'xmax': 110, 'ymax': 210}}]
+        close = [{'class': 'person', 'confidence': 0.89,
+                  'bbox': {'xmin': 11, 'ymin': 10, 'xmax': 110, 'ymax': 211}}]
+        shifted = [{'class': 'person', 'confidence': 0.90,
+                    'bbox': {'xmin': 60, 'ymin': 10, 'xmax': 160, 'ymax': 210}}]
+        
+        self.assertTrue(compare_detections(reference, close)['ok'])
+        self.assertFalse(compare_detections(reference, shifted)['ok'])
+        self.assertFalse(compare_detections(reference, close + shifted)['ok'])
+
+
+class AccuracyReportTest(TestCase):
+    """Test cases for the quantization accuracy report"""
+    
+    def test_average_precision_against_reference(self):
+        """Test mAP of a candidate that misses one of two reference boxes"""
+        from .benchmarking import average_precision
+        
+        box = {'xmin': 0, 'ymin': 0, 'xmax': 10, 'ymax': 10}
+        reference = [
+            [{'class': 'person', 'confidence': 0.9, 'bbox': box}],
+            [{'class': 'car', 'confidence': 0.8, 'bbox': box}],
+        ]
+        
+        self.assertEqual(average_precision(reference, reference)['map'], 1.0)
+        
+        report = average_precision(reference, [reference[0], []])
+        self.assertEqual(report['map'], 0.5)
+        self.assertEqual(report['recall'], 0.5)
+
+
+def _exported_backend_available(backend):
+    """True if torch and both the .pt and exported weights are installed locally"""
+    try:
+        from . import model_registry
+    except ImportError:
+        return False
+    return model_registry.is_available('yolov5s') and model_registry.is_available('yolov5s', backend)
+
+
+class BackendParityTest(TestCase):
+    """Exported backends must find the same boxes as eager PyTorch"""
+    
+    def check_parity(self, backend):
+        from .benchmarking import sample_images, compare_detectors
+        from .object_detector import ObjectDetector
+        
+        images = sample_images(limit=5)
+        if not images:
+            self.skipTest('No sample images in MEDIA_ROOT')
+        
+        parity = compare_detectors(
+            ObjectDetector('yolov5s', backend='torch'),
+            ObjectDetector('yolov5s', backend=backend),
+            images
+        )
+        self.assertTrue(parity['ok'], parity)
+    
+    @skipUnless(_exported_backend_available('torchscript'), 'TorchScript model not exported')
+    def test_torchscript_parity(self):
+        self.check_parity('torchscript')
+    
+    @skipUnless(_exported_backend_available('onnxruntime'), 'ONNX model not exported')
+    def test_onnxruntime_parity(self):
+        self.check_parity('onnxruntime')
+
+
+class LatestFrameBufferTest(TestCase):
+    """Test cases for the grabber -> inference latest-frame buffer"""
+    
+    def test_keeps_only_newest_frame_and_counts_drops(self):
+        """Test that unconsumed frames are dropped and consumed frames are not returned twice"""
+        from .frame_buffer import LatestFrameBuffer
+        
+        buffer = LatestFrameBuffer()
+        self.assertIsNone(buffer.take())
+        
+        buffer.put('frame 1', captured_at=1.0)
+        buffer.put('frame 2', captured_at=2.0)
+        self.assertEqual(buffer.take(), ('frame 2', 2.0))
+        self.assertIsNone(buffer.take())
+        
+        buffer.put('frame 3', captured_at=3.0)
+        self.assertEqual(buffer.wait_and_take(timeout=0.1), ('frame 3', 3.0))
+        self.assertIsNone(buffer.wait_and_take(timeout=0.01))
+        
+        self.assertEqual(buffer.frames_captured, 3)
+        self.assertEqual(buffer.frames_dropped, 1)
+
+
+class InferenceWorkerTest(TestCase):
+    """Test cases for the shared multi-camera inference worker"""
+    
+    def test_takes_newest_frame_per_camera_and_batches_cameras(self):
+        """Test that ready cameras are de-duplicated, batched, and read at batch time"""
+        from .camera_manager import InferenceWorker
+        from .frame_buffer import LatestFrameBuffer
+        
+        class Camera:
+            def __init__(self, camera_id):
+                self.camera_id = camera_id
+                self.frame_buffer = LatestFrameBuffer()
+            
+            def grab(self, frame, worker):
+                self.frame_buffer.put(frame, captured_at=0.0)
+                worker.submit(self)
+        
+        worker = InferenceWorker(detector=None, max_batch_size=2)
+        worker.is_running = True
+        cameras = [Camera('door'), Camera('garage'), Camera('yard')]
+        
+        cameras[0].grab('old frame', worker)
+        cameras[1].grab('frame', worker)
+        cameras[0].grab('new frame', worker)
+        cameras[2].grab('frame', worker)
+        
+        self.assertEqual(cameras[0].frame_buffer.frames_dropped, 1)
+        self.assertEqual(worker.queue_depth(), 3)
+        
+        batch = worker._take_batch()
+        self.assertEqual([(c.camera_id, f) for c, f, _ in batch], [('door', 'new frame'), ('garage', 'frame')])
+        self.assertEqual(worker.queue_depth(), 1)
+
+
+class MJPEGBroadcasterTest(TestCase):
+    """Test cases for the encode-once MJPEG broadcaster"""
+    
+    def test_encodes_each_frame_once_for_all_viewers(self):
+        """Test that several viewers share the bytes of a single encode"""
+        import numpy as np
+        from .streaming import MJPEGBroadcaster
+        
+        broadcaster = MJPEGBroadcaster(jpeg_quality=70)
+        self.assertIsNone(broadcaster.wait_for_frame(0, timeout=0.01))
+        
+        broadcaster.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+        first = broadcaster.wait_for_frame(0, timeout=0.1)
+        second = broadcaster.wait_for_frame(0, timeout=0.1)
+        
+        self.assertEqual(first[0], 1)
+        self.assertIs(first[1], second[1])
+        self.assertTrue(first[1].startswith(b'\xff\xd8'))
+        self.assertEqual(broadcaster.frames_encoded, 1)
+        
+        # Nothing newer than what the viewer already sent
+        self.assertIsNone(broadcaster.wait_for_frame(first[0], timeout=0.01))
+    
+    def test_stream_counts_viewers_and_ends_on_close(self):
+        """Test that a viewer generator registers itself and stops when closed"""
+        import numpy as np
+        from .streaming import MJPEGBroadcaster
+        
+        broadcaster = MJPEGBroadcaster()
+        broadcaster.publish(np.zeros((8, 8, 3), dtype=np.uint8))
+        
+        stream = broadcaster.stream(lambda: True)
+        self.assertTrue(next(stream).startswith(b'\xff\xd8'))
+        self.assertEqual(broadcaster.viewers, 1)
+        
+        broadcaster.close()
+        self.assertEqual(list(stream), [])
+        self.assertEqual(broadcaster.viewers, 0)
+
+
+class SecurityEventLogTest(TestCase):
+    """Test cases for the append-only JSON-lines security log"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'detection_log.jsonl')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_background_writer_and_tail_paging(self):
+        """Test that entries are appended in batches and paged newest first"""
+        from .event_log import SecurityEventLog
+        
+        event_log = SecurityEventLog(self.path, flush_interval=0.01, rotate_seconds=0)
+        for i in range(250):
+            event_log.append({'timestamp': f'2024-01-01T00:00:{i % 60:02d}', 'index': i})
+        self.assertTrue(event_log.flush())
+        
+        self.assertEqual(event_log.count(), 250)
+        self.assertEqual([e['index'] for e in event_log.read_tail(limit=3)], [249, 248, 247])
+        self.assertEqual([e['index'] for e in event_log.read_tail(offset=240, limit=100)], list(range(9, -1, -1)))
+        self.assertLess(event_log.flushes, 250)
+    
+    def test_size_rotation_and_partial_lines(self):
+        """Test rotation by size, reading across rotated files, and ignoring an unfinished line"""
+        from .event_log import SecurityEventLog
+        
+        event_log = SecurityEventLog(self.path, max_bytes=200, rotate_seconds=0, backup_count=2, batch_size=1)
+        for i in range(12):
+            event_log._write([{'index': i, 'payload': 'x' * 20}])
+        
+        self.assertEqual(len(event_log.files()), 3)
+        self.assertTrue(all(os.path.getsize(p) <= 200 for p in event_log.files()))
+        
+        with open(self.path, 'a') as f:
+            f.write('{"index": 99')  # Writer crashed mid-line
+        
+        indexes = [e['index'] for e in event_log.read_tail(limit=100)]
+        self.assertEqual(indexes[0], 11)
+        self.assertEqual(indexes, sorted(indexes, reverse=True))
+        self.assertEqual(len(indexes), event_log.count())
+        
+        event_log.clear()
+        self.assertEqual(event_log.files(), [])
+    
+    def test_legacy_json_log_is_imported_once(self):
+        """Test that the old detection_log.json history is converted before the new entries"""
+        import json
+        from .event_log import get_event_log, _event_logs
+        
+        legacy = os.path.join(self.tmpdir.name, 'detection_log.json')
+        with open(legacy, 'w') as f:
+            json.dump([{'index': 0}, {'index': 1}], f, indent=2)
+        with open(self.path, 'w') as f:
+            f.write('{"index": 2}\n')
+        
+        try:
+            event_log = get_event_log(self.path)
+            self.assertEqual([e['index'] for e in event_log.read_tail()], [2, 1, 0])
+            self.assertEqual(event_log.count(), 3)
+            self.assertFalse(os.path.exists(legacy))
+            self.assertTrue(os.path.exists(legacy + '.imported'))
+            self.assertEqual(event_log.import_legacy(legacy), 0)
+        finally:
+            _event_logs.pop(os.path.abspath(self.path), None)
+    
+    def test_count_uses_running_line_counts(self):
+        """Test that counting does not rescan files the writer already knows"""
+        from unittest import mock
+        from .event_log import SecurityEventLog
+        
+        event_log = SecurityEventLog(self.path, max_bytes=200, rotate_seconds=0, backup_count=2, batch_size=1)
+        for i in range(12):
+            event_log._write([{'index': i, 'payload': 'x' * 20}])
+        
+        event_log.max_bytes = 0  # No rotation from here on
+        with mock.patch.object(SecurityEventLog, '_scan_lines', wraps=SecurityEventLog._scan_lines) as scan:
+            total = event_log.count()
+            event_log._write([{'index': 12, 'payload': 'x' * 20}])
+            self.assertEqual(event_log.count(), total + 1)
+            self.assertEqual(scan.call_count, 0)
+            
+            # Appended by another process: only the current file is rescanned
+            with open(self.path, 'a') as f:
+                f.write('{"index": 13}\n')
+            self.assertEqual(event_log.count(), total + 2)
+            self.assertEqual(scan.call_count, 1)
+        
+        self.assertEqual(event_log.count(), len(event_log.read_tail(limit=100)))
+
+
+class SnapshotWriterTest(TestCase):
+    """Test cases for the background snapshot writer"""
+    
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_writes_in_background_and_deduplicates_per_camera(self):
+        """Test that snapshots are written off-thread, at most once per camera/key per interval"""
+        import numpy as np
+        from .snapshot_writer import SnapshotWriter
+        
+        writer = SnapshotWriter(workers=1, jpeg_quality=75, min_interval=60)
+        frame = np.zeros((32, 32, 3), dtype=np.uint8)
+        path = lambda name: os.path.join(self.tmpdir.name, name)
+        
+        self.assertTrue(writer.submit('door', frame, path('a.jpg')))
+        self.assertFalse(writer.submit('door', frame, path('b.jpg')))
+        self.assertTrue(writer.submit('door', frame, path('c.jpg'), key=7))
+        self.assertTrue(writer.submit('yard', frame, path('d.jpg')))
+        self.assertTrue(writer.flush())
+        
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ['a.jpg', 'c.jpg', 'd.jpg'])
+        stats = writer.get_stats()
+        self.assertEqual((stats['written'], stats['deduplicated'], stats['dropped_full']), (3, 1, 0))
+    
+    def test_expired_track_entries_are_pruned(self):
+        """Test that per-track interval entries do not accumulate forever"""
+        import numpy as np
+        from unittest import mock
+        from .snapshot_writer import SnapshotWriter
+        
+        writer = SnapshotWriter(max_queue=1000, min_interval=5)
+        writer._threads = ['stopped']
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        
+        with mock.patch('detection.snapshot_writer.time.monotonic', return_value=100.0):
+            for track_id in range(200):
+                writer.submit('door', frame, os.path.join(self.tmpdir.name, f'{track_id}.jpg'), key=track_id)
+        with mock.patch('detection.snapshot_writer.time.monotonic', return_value=200.0):
+            for track_id in range(200, 300):
+                writer.submit('door', frame, os.path.join(self.tmpdir.name, f'{track_id}.jpg'), key=track_id)
+        
+        self.assertLess(len(writer._last_saved), 256)
+        self.assertTrue(all(saved_at == 200.0 for saved_at in writer._last_saved.values()))
+    
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test backpressure: a full queue rejects snapshots immediately"""
+        import numpy as np
+        from .snapshot_writer import SnapshotWriter
+        
+        writer = SnapshotWriter(max_queue=1, min_interval=0)
+        writer._threads = ['stopped']  # Keep the queue from being drained
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        
+        self.assertTrue(writer.submit('door', frame, os.path.join(self.tmpdir.name, 'a.jpg')))
+        self.assertFalse(writer.submit('yard', frame, os.path.join(self.tmpdir.name, 'b.jpg')))
+        self.assertEqual(writer.get_stats()['dropped_full'], 1)
+        self.assertEqual(writer.get_stats()['queue_high_water'], 1)
+    
+    def test_perceptual_reference_only_for_queued_snapshots(self):
+        """Test that a dropped snapshot does not become the duplicate reference, and new tracks bypass it"""
+        import numpy as np
+        from .image_hash import DuplicateFilter
+        from .snapshot_writer import SnapshotWriter
+        
+        writer = SnapshotWriter(max_queue=1, min_interval=0, duplicate_filter=DuplicateFilter(threshold=5))
+        writer._threads = ['stopped']
+        scene = np.tile(np.arange(64, dtype=np.uint8), (48, 1))[:, :, None].repeat(3, axis=2)
+        path = lambda name: os.path.join(self.tmpdir.name, name)
+        
+        writer._queue.put_nowait((scene, path('busy.jpg')))
+        self.assertFalse(writer.submit('door', scene, path('a.jpg')))  # Queue full
+        writer._queue.get_nowait()
+        
+        # The dropped frame was not remembered: the same scene is still written once
+        self.assertTrue(writer.submit('door', scene, path('b.jpg')))
+        writer._queue.get_nowait()
+        self.assertFalse(writer.submit('door', scene, path('c.jpg')))
+        self.assertTrue(writer.submit('door', scene, path('d.jpg'), key=3))
+        
+        stats = writer.get_stats()
+        self.assertEqual((stats['dropped_full'], stats['perceptual_duplicates']), (1, 1))
+
+
+class ImageHashTest(TestCase):
+    """Test cases for perceptual hashing and duplicate filtering"""
+    
+    def test_near_identical_frames_are_duplicates(self):
+        """Test that noise keeps the hash close while a different scene does not"""
+        import cv2
+        import numpy as np
+        from .image_hash import dhash, phash, hamming_distance, DuplicateFilter, to_hex, from_hex
+        
+        rng = np.random.default_rng(0)
+        scene = cv2.resize(rng.integers(0, 256, (12, 16, 3), dtype=np.uint8), (160, 120), interpolation=cv2.INTER_CUBIC)
+        noisy = np.clip(scene.astype(int) + rng.integers(-3, 4, scene.shape), 0, 255).astype(np.uint8)
+        other = np.ascontiguousarray(scene[:, ::-1])
+        
+        for hash_function in (dhash, phash):
+            self.assertLessEqual(hamming_distance(hash_function(scene), hash_function(noisy)), 5)
+            self.assertGreater(hamming_distance(hash_function(scene), hash_function(other)), 5)
+        self.assertEqual(from_hex(to_hex(dhash(scene))), dhash(scene))
+        
+        duplicates = DuplicateFilter(threshold=5)
+        self.assertFalse(duplicates.is_duplicate('door', scene)[0])
+        self.assertFalse(duplicates.is_duplicate('door', noisy)[0])  # Nothing committed yet
+        self.assertFalse(duplicates.check('door', scene)[0])
+        self.assertTrue(duplicates.check('door', noisy)[0])
+        self.assertFalse(duplicates.check('yard', noisy)[0])
+        self.assertFalse(duplicates.check('door', other)[0])
+
+
+class IoUTrackerTest(TestCase):
+    """Test cases for the IoU + Kalman tracker"""
+    
+    def detections(self, *boxes):
+        import numpy as np
+        from .result_decoder import DETECTION_DTYPE
+        return np.array([(x, y, x + 40, y + 80, 0.9, class_id) for x, y, class_id in boxes], dtype=DETECTION_DTYPE)
+    
+    def test_stable_ids_propagation_and_start_end_events(self):
+        """Test that a moving object keeps its id, is propagated between detections and ends once"""
+        from .tracker import IoUTracker
+        
+        tracker = IoUTracker(max_age=3, min_hits=2, max_coast=2)
+        started, ended, ids = [], [], set()
+        
+        for step in range(6):
+            x = 100 + step * 6
+            # Detector runs every other frame, a car stays in place
+            if step % 2 == 0:
+                result = tracker.update(self.detections((x, 50, 0), (300, 200, 2)))
+            else:
+                result = tracker.predict()
+            started += [t.track_id for t in result['started']]
+            ended += [t.track_id for t in result['ended']]
+            ids.update(result['tracks']['track_id'].tolist())
+            if step >= 2:
+                self.assertEqual(len(result['tracks']), 2)
+        
+        self.assertEqual(len(started), 2)
+        self.assertEqual(ids, set(started))
+        
+        # Person leaves: its track ends after max_age frames, the car remains
+        for _ in range(4):
+            result = tracker.update(self.detections((300, 200, 2)))
+            ended += [t.track_id for t in result['ended']]
+        self.assertEqual(len(ended), 1)
+        self.assertEqual(result['tracks']['class_id'].tolist(), [2])
+    
+    def test_classes_never_share_a_track(self):
+        """Test that overlapping boxes of different classes get different tracks"""
+        from .tracker import IoUTracker
+        
+        tracker = IoUTracker(min_hits=1)
+        tracker.update(self.detections((100, 50, 0)))
+        result = tracker.update(self.detections((100, 50, 16)))
+        self.assertEqual(len(tracker.tracks), 2)
+        self.assertEqual([t.class_id for t in result['started']], [16])
+    
+    def test_region_and_hold_do_not_age_tracks(self):
+        """Test that tracks outside the detector region and on held frames are not aged"""
+        from .tracker import IoUTracker
+        
+        tracker = IoUTracker(max_age=1, min_hits=1)
+        tracker.update(self.detections((100, 50, 0), (500, 300, 2)))
+        
+        # Detector only looked at the person: the car is not aged out
+        for _ in range(3):
+            result = tracker.update(self.detections((100, 50, 0)), region=(60, 0, 200, 200))
+        self.assertEqual(result['ended'], [])
+        self.assertEqual(len(tracker.tracks), 2)
+        
+        for _ in range(5):
+            result = tracker.hold()
+        self.assertEqual(len(result['tracks']), 2)
+
+
+class MotionGateTest(TestCase):
+    """Test cases for the frame-differencing detector gate"""
+    
+    def test_gate_opens_on_motion_only(self):
+        """Test that still frames close the gate and a moving object opens it with its region"""
+        import numpy as np
+        from .motion_gate import MotionGate
+        
+        gate = MotionGate(min_area=100, padding=0, max_idle_frames=3)
+        frame = np.full((240, 320, 3), 80, dtype=np.uint8)
+        
+        self.assertEqual(gate.check(frame), (True, None))  # First frame: no reference yet
+        self.assertEqual(gate.check(frame.copy()), (False, None))
+        
+        moved = frame.copy()
+        moved[100:160, 200:260] = 255
+        run, roi = gate.check(moved)
+        self.assertTrue(run)
+        xmin, ymin, xmax, ymax = roi
+        self.assertTrue(xmin <= 200 and ymin <= 100 and xmax >= 260 and ymax >= 160)
+        self.assertLess((xmax - xmin) * (ymax - ymin), 320 * 240 / 2)
+        
+        # Still scene: forced full-frame refresh after max_idle_frames
+        results = [gate.check(moved) for _ in range(3)]
+        self.assertEqual(results, [(False, None), (False, None), (True, None)])
+    
+    def test_camera_schedule_holds_static_scenes(self):
+        """Test that a gated camera holds its tracks on still frames and detects on motion"""
+        import numpy as np
+        from .object_detector import ObjectDetector, SecurityCamera
+        
+        detector = ObjectDetector.__new__(ObjectDetector)
+        detector.model = FakeModel()
+        camera = SecurityCamera(detector=detector, camera_id='gate-test', motion_gating=True, crop_to_motion=True)
+        camera.detect_every = 3
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        
+        self.assertEqual(camera.schedule_frame(frame), ('detect', None))
+        self.assertEqual(camera.schedule_frame(frame.copy()), ('hold', None))
+        self.assertEqual(camera.frames_gated, 1)
+        
+        moved = frame.copy()
+        moved[100:160, 200:260] = 255
+        action, roi = camera.schedule_frame(moved)
+        self.assertEqual(action, 'detect')
+        self.assertIsNotNone(roi)
+
+
+class ZoneMaskTest(TestCase):
+    """Test cases for camera regions of interest and exclusion zones"""
+    
+    def test_mask_region_and_filter(self):
+        """Test that include minus exclude polygons drive the crop and the detection filter"""
+        import numpy as np
+        from .result_decoder import DETECTION_DTYPE
+        from .zones import ZoneMask
+        
+        # Watch the left half, except its top-left corner
+        zones = ZoneMask(include=[[[0, 0], [0.5, 0], [0.5, 1], [0, 1]]],
+                         exclude=[[[0, 0], [0.25, 0], [0.25, 0.25], [0, 0.25]]])
+        shape = (400, 800, 3)
+        
+        mask = zones.mask(shape)
+        self.assertEqual(mask[300, 100], 255)
+        self.assertEqual(mask[50, 50], 0)
+        self.assertEqual(mask[300, 600], 0)
+        
+        self.assertEqual(zones.region(shape), (0, 0, 401, 400))
+        self.assertEqual(zones.clip((300, 100, 700, 300), shape), (300, 100, 401, 300))
+        self.assertEqual(zones.clip((600, 100, 700, 300), shape), (0, 0, 401, 400))
+        
+        # Ground point decides: inside, excluded corner, right half
+        boxes = np.array([(100, 200, 140, 300, 0.9, 0), (20, 10, 60, 60, 0.9, 0),
+                          (600, 200, 640, 300, 0.9, 0)], dtype=DETECTION_DTYPE)
+        self.assertEqual(zones.filter(boxes, shape)['xmin'].tolist(), [100])
+    
+    def test_load_zone_mask_and_validation(self):
+        """Test that only active zones of the camera are loaded and polygons are validated"""
+        from django.core.exceptions import ValidationError
+        from .models import CameraZone
+        from .zones import load_zone_mask
+        
+        self.assertIsNone(load_zone_mask('door'))
+        
+        square = [[0, 0], [1, 0], [1, 1], [0, 1]]
+        CameraZone.objects.create(camera_id='door', name='street', zone_type='exclude', points=square)
+        CameraZone.objects.create(camera_id='door', name='old', points=square, is_active=False)
+        CameraZone.objects.create(camera_id='yard', name='lawn', points=square)
+        
+        zones = load_zone_mask('door')
+        self.assertEqual((len(zones.include), len(zones.exclude)), (0, 1))
+        
+        with self.assertRaises(ValidationError):
+            CameraZone(camera_id='door', name='bad', points=[[0, 0], [2, 0], [1, 1]]).clean()
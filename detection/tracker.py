@@ -0,0 +1,238 @@
+"""
+Lightweight multi-object tracker (SORT-style: IoU association + Kalman filter)
+Gives detections stable track ids across frames, propagates boxes on frames
+where the detector is skipped, and reports when tracks start and end so
+counts, logs and snapshots happen once per object instead of once per frame.
+"""
+import numpy as np
+from .result_decoder import DETECTION_DTYPE
+
+# Detection fields plus the stable id assigned by the tracker
+TRACK_DTYPE = np.dtype(DETECTION_DTYPE.descr + [('track_id', np.int32)])
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Pairwise IoU of two (n, 4) / (m, 4) arrays of xmin, ymin, xmax, ymax
+
+    Returns:
+        numpy.ndarray: (n, m) IoU matrix
+    """
+    a = boxes_a[:, None, :]
+    b = boxes_b[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+class KalmanBoxFilter:
+    """
+    Constant-velocity Kalman filter on (center x, center y, area, aspect ratio)
+    """
+
+    # State transition: position += velocity (aspect ratio is constant)
+    F = np.eye(7)
+    F[0, 4] = F[1, 5] = F[2, 6] = 1.0
+    H = np.eye(4, 7)
+    R = np.diag([1.0, 1.0, 10.0, 10.0])
+    Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+
+    def __init__(self, box):
+        """
+        Args:
+            box (numpy.ndarray): xmin, ymin, xmax, ymax
+        """
+        self.x = np.zeros(7)
+        self.x[:4] = self._to_measurement(box)
+        # High uncertainty on the unobserved velocities
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 10000.0, 10000.0, 10000.0])
+
+    @staticmethod
+    def _to_measurement(box):
+        width, height = box[2] - box[0], box[3] - box[1]
+        return np.array([box[0] + width / 2.0, box[1] + height / 2.0, width * height, width / max(height, 1e-6)])
+
+    def box(self):
+        """Current state as xmin, ymin, xmax, ymax"""
+        area, ratio = max(self.x[2], 0.0), max(self.x[3], 1e-6)
+        width = np.sqrt(area * ratio)
+        height = area / max(width, 1e-6)
+        return np.array([self.x[0] - width / 2.0, self.x[1] - height / 2.0,
+                         self.x[0] + width / 2.0, self.x[1] + height / 2.0])
+
+    def predict(self):
+        """Advance the state by one frame"""
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self.box()
+
+    def update(self, box):
+        """Correct the state with a matched detection"""
+        residual = self._to_measurement(box) - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ residual
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+
+
+class Track:
+    """One tracked object"""
+
+    def __init__(self, track_id, detection):
+        self.track_id = track_id
+        self.class_id = int(detection['class_id'])
+        self.confidence = float(detection['confidence'])
+        self.filter = KalmanBoxFilter(_box_of(detection))
+        self.hits = 1
+        self.age = 0
+        self.frames_since_update = 0
+        self.confirmed = False
+
+
+def _box_of(detection):
+    return np.array([detection['xmin'], detection['ymin'], detection['xmax'], detection['ymax']], dtype=np.float64)
+
+
+class IoUTracker:
+    """
+    Associates detections with existing tracks by IoU (same class only),
+    greedily from the best overlap, after Kalman prediction
+    """
+
+    def __init__(self, iou_threshold=0.3, max_age=30, min_hits=2, max_coast=3):
+        """
+        Args:
+            iou_threshold (float): Minimum IoU between a prediction and a detection to match
+            max_age (int): Frames a track survives without a matched detection (then it ends)
+            min_hits (int): Matched detections before a track is confirmed (reported)
+            max_coast (int): Frames a track is still drawn/reported on its prediction
+                alone (should cover the frames between two detector runs)
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = max(1, int(min_hits))
+        self.max_coast = max_coast
+        self.tracks = []
+        self._next_id = 1
+
+    def reset(self):
+        """Forget every track (ids keep increasing)"""
+        self.tracks = []
+
+    def _predict(self, region=None):
+        """
+        Advance the tracks by one frame
+
+        Args:
+            region (tuple): xmin, ymin, xmax, ymax the detector looked at; tracks
+                entirely outside it are left untouched (not predicted, not aged)
+
+        Returns:
+            numpy.ndarray: (n, 4) predicted boxes
+        """
+        boxes = np.zeros((len(self.tracks), 4))
+        for i, track in enumerate(self.tracks):
+            box = track.filter.box()
+            if region is not None and (box[2] <= region[0] or box[0] >= region[2] or
+                                       box[3] <= region[1] or box[1] >= region[3]):
+                boxes[i] = box
+                continue
+            boxes[i] = track.filter.predict()
+            track.age += 1
+            track.frames_since_update += 1
+        return boxes
+
+    def _finish_frame(self):
+        """
+        Drop stale tracks and build the output
+
+        Returns:
+            tuple: (confirmed tracks as TRACK_DTYPE array, ended confirmed tracks)
+        """
+        ended = [t for t in self.tracks if t.frames_since_update > self.max_age]
+        self.tracks = [t for t in self.tracks if t.frames_since_update <= self.max_age]
+
+        confirmed = [t for t in self.tracks if t.confirmed and t.frames_since_update <= self.max_coast]
+        output = np.empty(len(confirmed), dtype=TRACK_DTYPE)
+        for i, track in enumerate(confirmed):
+            xmin, ymin, xmax, ymax = track.filter.box()
+            output[i] = (xmin, ymin, xmax, ymax, track.confidence, track.class_id, track.track_id)
+        return output, [t for t in ended if t.confirmed]
+
+    def update(self, detections, region=None):
+        """
+        Process a frame the detector ran on
+
+        Args:
+            detections (numpy.ndarray): DETECTION_DTYPE array
+            region (tuple): Part of the frame the detector ran on (None: whole frame)
+
+        Returns:
+            dict: tracks (TRACK_DTYPE array of confirmed tracks),
+                  started (list of Track) and ended (list of Track)
+        """
+        predicted = self._predict(region)
+        boxes = np.stack([detections['xmin'], detections['ymin'], detections['xmax'], detections['ymax']],
+                         axis=1).astype(np.float64) if len(detections) else np.zeros((0, 4))
+
+        matched_tracks, matched_detections = set(), set()
+        if len(self.tracks) and len(detections):
+            ious = iou_matrix(predicted, boxes)
+            # Boxes of different classes never match
+            classes = np.array([t.class_id for t in self.tracks])
+            ious[classes[:, None] != detections['class_id'][None, :].astype(int)] = 0.0
+
+            for flat in np.argsort(-ious, axis=None):
+                t, d = np.unravel_index(flat, ious.shape)
+                if ious[t, d] < self.iou_threshold:
+                    break
+                if t in matched_tracks or d in matched_detections:
+                    continue
+                matched_tracks.add(t)
+                matched_detections.add(d)
+
+                track = self.tracks[t]
+                track.filter.update(boxes[d])
+                track.confidence = float(detections['confidence'][d])
+                track.hits += 1
+                track.frames_since_update = 0
+
+        for d in range(len(detections)):
+            if d not in matched_detections:
+                self.tracks.append(Track(self._next_id, detections[d]))
+                self._next_id += 1
+
+        started = []
+        for track in self.tracks:
+            if not track.confirmed and track.hits >= self.min_hits:
+                track.confirmed = True
+                started.append(track)
+
+        tracks, ended = self._finish_frame()
+        return {'tracks': tracks, 'started': started, 'ended': ended}
+
+    def predict(self):
+        """
+        Process a frame the detector was skipped on: propagate the tracks
+
+        Returns:
+            dict: Same format as update() (started is always empty)
+        """
+        self._predict()
+        tracks, ended = self._finish_frame()
+        return {'tracks': tracks, 'started': [], 'ended': ended}
+
+    def hold(self):
+        """
+        Process a frame where nothing moved: tracks keep their state and are not aged
+
+        Returns:
+            dict: Same format as update() (started and ended are always empty)
+        """
+        tracks, _ = self._finish_frame()
+        return {'tracks': tracks, 'started': [], 'ended': []}
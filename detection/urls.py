@@ -7,6 +7,7 @@ urlpatterns = [
     # Image detection endpoints
     path('', views.detection_home, name='home'),
     path('process/<int:pk>/', views.process_detection, name='process'),
+    path('bulk/', views.bulk_upload, name='bulk_upload'),
     path('result/<int:pk>/', views.detection_result, name='result'),
     path('history/', views.detection_history, name='history'),
     path('edit/<int:pk>/', views.edit_detection, name='edit'),
@@ -18,6 +19,13 @@ urlpatterns = [
     path('security/stop/', views.stop_security_camera, name='stop_camera'),
     path('security/feed/', views.video_feed, name='video_feed'),
     path('security/detections/', views.get_detections_data, name='get_detections'),
+    
+    # Multi-camera endpoints (the routes above act on the 'default' camera)
+    path('security/cameras/', views.cameras_status, name='cameras_status'),
+    path('security/cameras/<str:camera_id>/start/', views.start_security_camera, name='start_camera_by_id'),
+    path('security/cameras/<str:camera_id>/stop/', views.stop_security_camera, name='stop_camera_by_id'),
+    path('security/cameras/<str:camera_id>/feed/', views.video_feed, name='video_feed_by_id'),
+    path('security/cameras/<str:camera_id>/detections/', views.get_detections_data, name='get_detections_by_id'),
     path('security/logs/', views.security_logs, name='security_logs'),
     path('security/logs/delete/', views.delete_security_logs, name='delete_logs'),
 ]
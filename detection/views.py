@@ -5,13 +5,23 @@ from django.conf import settings
 from django.http import StreamingHttpResponse, JsonResponse
 from django.views.decorators.http import require_http_methods
 from .models import DetectionResult
-from .forms import ImageUploadForm, DetectionEditForm
-from .object_detector import get_detector, get_security_camera
+from .forms import ImageUploadForm, DetectionEditForm, BulkImageUploadForm
+from .object_detector import get_detector
+from .camera_manager import get_camera_manager
+from .event_log import get_event_log
 import os
 from pathlib import Path
 import json
 
 
+def _annotated_paths(detection):
+    """Return (relative, absolute) paths of the annotated image for a detection"""
+    annotated_filename = f"annotated_{Path(detection.original_image.name).name}"
+    annotated_relative = os.path.join('detections', 'annotated', annotated_filename)
+    annotated_path = os.path.join(settings.MEDIA_ROOT, annotated_relative)
+    return annotated_relative, annotated_path
+
+
 @login_required
 def detection_home(request):
     """
@@ -59,9 +69,7 @@ def process_detection(request, pk):
         original_path = detection.original_image.path
         
         # Create annotated image path
-        annotated_filename = f"annotated_{Path(detection.original_image.name).name}"
-        annotated_relative = os.path.join('detections', 'annotated', annotated_filename)
-        annotated_path = os.path.join(settings.MEDIA_ROOT, annotated_relative)
+        annotated_relative, annotated_path = _annotated_paths(detection)
         
         # Process the image
         results = detector.process_image(original_path, annotated_path)
@@ -85,6 +93,62 @@ def process_detection(request, pk):
     return redirect('detection:result', pk=pk)
 
 
+@login_required
+def bulk_upload(request):
+    """
+    Upload a burst of images and process them with batched YOLOv5 inference
+    """
+    if request.method == 'POST':
+        form = BulkImageUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            # Save one detection record per uploaded image
+            detections = []
+            for image in form.cleaned_data['images']:
+                detection = DetectionResult(user=request.user, original_image=image)
+                detection.save()
+                detections.append(detection)
+            
+            try:
+                detector = get_detector(model_name='yolov5s', confidence_threshold=0.25)
+                
+                original_paths = [d.original_image.path for d in detections]
+                annotated = [_annotated_paths(d) for d in detections]
+                
+                batch_results = detector.process_batch(
+                    original_paths,
+                    [path for _, path in annotated],
+                    batch_size=getattr(settings, 'DETECTION_BATCH_SIZE', 8)
+                )
+                
+                total_objects = 0
+                for detection, (annotated_relative, _), results in zip(detections, annotated, batch_results):
+                    detection.objects_detected = results['count']
+                    detection.set_detection_data(results['detections'])
+                    if results['annotated_image']:
+                        detection.annotated_image = annotated_relative
+                    detection.save()
+                    total_objects += results['count']
+                
+                messages.success(
+                    request,
+                    f"✅ Processed {len(detections)} image(s), detected {total_objects} object(s)!"
+                )
+                
+            except Exception as e:
+                messages.error(request, f"❌ Error processing images: {str(e)}")
+                return redirect('detection:bulk_upload')
+            
+            return redirect('detection:history')
+    else:
+        form = BulkImageUploadForm()
+    
+    context = {
+        'form': form,
+        'batch_size': getattr(settings, 'DETECTION_BATCH_SIZE', 8),
+    }
+    return render(request, 'detection/bulk_upload.html', context)
+
+
 @login_required
 def detection_result(request, pk):
     """
@@ -205,12 +269,12 @@ def security_monitor(request):
 
 @login_required
 @require_http_methods(["POST"])
-def start_security_camera(request):
+def start_security_camera(request, camera_id='default'):
     """
     Start the security camera monitoring
     
     Expected POST data:
-        - camera_source: Camera index (default: 0) or IP camera URL
+        - camera_source: Camera index (default: 0), IP camera URL or video file
         - target_classes: JSON array of classes to detect
     
     Returns:
@@ -230,19 +294,18 @@ def start_security_camera(request):
         target_classes_json = request.POST.get('target_classes', '[]')
         target_classes = json.loads(target_classes_json) if target_classes_json else None
         
-        # Get or create security camera instance
-        security_cam = get_security_camera(
+        # Register the camera if needed and start its capture thread
+        success = get_camera_manager().start_camera(
+            camera_id,
             camera_source=camera_source,
             target_classes=target_classes
         )
         
-        # Start monitoring in background thread
-        success = security_cam.start_monitoring_thread()
-        
         if success:
             return JsonResponse({
                 'status': 'success',
                 'message': 'Security monitoring started',
+                'camera_id': camera_id,
                 'camera_source': str(camera_source)
             })
         else:
@@ -260,7 +323,7 @@ def start_security_camera(request):
 
 @login_required
 @require_http_methods(["POST"])
-def stop_security_camera(request):
+def stop_security_camera(request, camera_id='default'):
     """
     Stop the security camera monitoring
     
@@ -268,12 +331,16 @@ def stop_security_camera(request):
         JSON response with status
     """
     try:
-        security_cam = get_security_camera()
-        security_cam.stop_monitoring()
+        if not get_camera_manager().stop_camera(camera_id):
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Unknown camera: {camera_id}'
+            }, status=404)
         
         return JsonResponse({
             'status': 'success',
-            'message': 'Security monitoring stopped'
+            'message': 'Security monitoring stopped',
+            'camera_id': camera_id
         })
         
     except Exception as e:
@@ -283,29 +350,25 @@ def stop_security_camera(request):
         }, status=500)
 
 
-def generate_video_stream():
+def generate_video_stream(camera_id='default'):
     """
     Generator function for video streaming
     Yields frames from security camera in multipart format
+    Each frame is JPEG-encoded once and shared by all viewers; the generator
+    sleeps until the camera publishes a new frame
     """
-    security_cam = get_security_camera()
+    security_cam = get_camera_manager().get_camera(camera_id)
+    if security_cam is None:
+        return
     
-    while security_cam.is_running:
-        # Get current annotated frame
-        frame_bytes = security_cam.get_frame_for_streaming()
-        
-        if frame_bytes:
-            # Yield frame in multipart format for MJPEG streaming
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-        else:
-            # Small delay if no frame available
-            import time
-            time.sleep(0.1)
+    for frame_bytes in security_cam.broadcaster.stream(lambda: security_cam.is_running):
+        # Yield frame in multipart format for MJPEG streaming
+        yield (b'--frame\r\n'
+               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
 
 
 @login_required
-def video_feed(request):
+def video_feed(request, camera_id='default'):
     """
     Stream video feed with real-time object detection
     
@@ -313,13 +376,13 @@ def video_feed(request):
         StreamingHttpResponse with MJPEG stream
     """
     return StreamingHttpResponse(
-        generate_video_stream(),
+        generate_video_stream(camera_id),
         content_type='multipart/x-mixed-replace; boundary=frame'
     )
 
 
 @login_required
-def get_detections_data(request):
+def get_detections_data(request, camera_id='default'):
     """
     Get latest detection data for frontend display
     
@@ -327,7 +390,9 @@ def get_detections_data(request):
         JSON response with current detections and statistics
     """
     try:
-        security_cam = get_security_camera()
+        security_cam = get_camera_manager().get_camera(camera_id)
+        if security_cam is None:
+            raise ValueError(f'Unknown camera: {camera_id}')
         detection_data = security_cam.get_latest_detections()
         
         return JsonResponse({
@@ -348,34 +413,56 @@ def get_detections_data(request):
         })
 
 
+@login_required
+def cameras_status(request):
+    """
+    List the monitored cameras with their state and the shared inference worker stats
+    
+    Returns:
+        JSON response with per-camera status
+    """
+    try:
+        return JsonResponse({
+            'status': 'success',
+            'data': get_camera_manager().get_status()
+        })
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=500)
+
+
 @login_required
 def security_logs(request):
     """
     View security detection logs
-    Display historical detection events
+    Display historical detection events, newest first, read from the log tail
     """
-    log_file = 'media/security/detection_log.json'
+    event_log = get_event_log()
+    per_page = 100
     
-    logs = []
-    if os.path.exists(log_file):
-        try:
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-                # Reverse to show newest first
-                logs.reverse()
-                
-                # Add person_detected flag to each log entry
-                for log in logs:
-                    log['person_detected'] = any(
-                        det.get('class') == 'person' 
-                        for det in log.get('detections', [])
-                    )
-        except (json.JSONDecodeError, IOError):
-            logs = []
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    
+    total_logs = event_log.count()
+    logs = event_log.read_tail(offset=(page - 1) * per_page, limit=per_page)
+    
+    # Add person_detected flag to each log entry
+    for log in logs:
+        log['person_detected'] = any(
+            det.get('class') == 'person' 
+            for det in log.get('detections', [])
+        )
     
     context = {
-        'logs': logs[:100],  # Show last 100 entries
-        'total_logs': len(logs)
+        'logs': logs,
+        'total_logs': total_logs,
+        'page': page,
+        'previous_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if page * per_page < total_logs else None,
     }
     return render(request, 'detection/security_logs.html', context)
 
@@ -386,12 +473,9 @@ def delete_security_logs(request):
     """
     Delete all security detection logs
     """
-    log_file = 'media/security/detection_log.json'
-    
     try:
-        # Clear the log file by writing empty array
-        with open(log_file, 'w') as f:
-            json.dump([], f)
+        # Remove the log and its rotated files
+        get_event_log().clear()
         
         messages.success(request, 'All security logs have been deleted successfully.')
     except (IOError, OSError) as e:
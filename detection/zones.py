@@ -0,0 +1,154 @@
+"""
+Per-camera regions of interest and exclusion zones
+CameraZone polygons (fractions of the frame size) are rasterized once per
+frame size into a binary mask. The mask restricts motion differencing, its
+bounding box is the crop handed to the detector, and detections whose
+ground point (bottom center of the box) falls outside it are discarded.
+"""
+import cv2
+import numpy as np
+
+
+class ZoneMask:
+    """
+    Binary mask built from include / exclude polygons, cached per frame size
+    """
+
+    def __init__(self, include=(), exclude=()):
+        """
+        Args:
+            include (list): Polygons ((n, 2) vertices, 0-1) to watch; empty watches the whole frame
+            exclude (list): Polygons removed from the watched area
+        """
+        self.include = [np.asarray(p, dtype=np.float64) for p in include]
+        self.exclude = [np.asarray(p, dtype=np.float64) for p in exclude]
+        self._masks = {}
+        self._regions = {}
+
+    @classmethod
+    def from_zones(cls, zones):
+        """
+        Build a mask from CameraZone instances
+
+        Returns:
+            ZoneMask: Mask, or None when there is no zone (whole frame, nothing to do)
+        """
+        include, exclude = [], []
+        for zone in zones:
+            (include if zone.zone_type == 'include' else exclude).append(zone.points)
+        if not include and not exclude:
+            return None
+        return cls(include, exclude)
+
+    @staticmethod
+    def _to_pixels(polygon, height, width):
+        return np.round(polygon * [width - 1, height - 1]).astype(np.int32)
+
+    def mask(self, shape):
+        """
+        Args:
+            shape (tuple): Frame shape (height, width[, channels])
+
+        Returns:
+            numpy.ndarray: uint8 mask, 255 inside the watched area
+        """
+        height, width = shape[:2]
+        mask = self._masks.get((height, width))
+        if mask is None:
+            if self.include:
+                mask = np.zeros((height, width), dtype=np.uint8)
+                cv2.fillPoly(mask, [self._to_pixels(p, height, width) for p in self.include], 255)
+            else:
+                mask = np.full((height, width), 255, dtype=np.uint8)
+            if self.exclude:
+                cv2.fillPoly(mask, [self._to_pixels(p, height, width) for p in self.exclude], 0)
+            self._masks[(height, width)] = mask
+        return mask
+
+    def apply(self, image):
+        """Zero everything outside the watched area (e.g. a thresholded motion delta)"""
+        return cv2.bitwise_and(image, image, mask=self.mask(image.shape))
+
+    def region(self, shape):
+        """
+        Bounding box of the watched area
+
+        Returns:
+            tuple: (xmin, ymin, xmax, ymax), or None when it covers the whole frame
+        """
+        height, width = shape[:2]
+        if (height, width) not in self._regions:
+            x, y, w, h = cv2.boundingRect(self.mask(shape))
+            full = w == 0 or (x, y, w, h) == (0, 0, width, height)
+            self._regions[(height, width)] = None if full else (x, y, x + w, y + h)
+        return self._regions[(height, width)]
+
+    def clip(self, roi, shape):
+        """
+        Restrict a detector crop to the watched area
+
+        Args:
+            roi (tuple): xmin, ymin, xmax, ymax, or None for the whole frame
+            shape (tuple): Frame shape
+
+        Returns:
+            tuple: Intersection of roi and region() (region() if they do not overlap)
+        """
+        region = self.region(shape)
+        if roi is None or region is None:
+            return roi if region is None else region
+        clipped = (max(roi[0], region[0]), max(roi[1], region[1]),
+                   min(roi[2], region[2]), min(roi[3], region[3]))
+        if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+            return region
+        return clipped
+
+    def contains(self, boxes, shape):
+        """
+        Args:
+            boxes (numpy.ndarray): Structured array with xmin, ymin, xmax, ymax fields
+            shape (tuple): Frame shape
+
+        Returns:
+            numpy.ndarray: bool per box, True when its ground point is in the watched area
+        """
+        mask = self.mask(shape)
+        height, width = mask.shape
+        x = np.clip(((boxes['xmin'] + boxes['xmax']) / 2).astype(np.int64), 0, width - 1)
+        y = np.clip(boxes['ymax'].astype(np.int64), 0, height - 1)
+        return mask[y, x] > 0
+
+    def filter(self, boxes, shape):
+        """Keep the detections whose ground point is in the watched area"""
+        if not len(boxes):
+            return boxes
+        return boxes[self.contains(boxes, shape)]
+
+
+def load_zone_mask(camera_id):
+    """
+    Build the ZoneMask of a camera from its active CameraZone rows
+
+    Args:
+        camera_id (str): Camera identifier
+
+    Returns:
+        ZoneMask: Mask, or None if the camera has no zone
+    """
+    from .models import CameraZone
+
+    return ZoneMask.from_zones(CameraZone.objects.filter(camera_id=camera_id, is_active=True))
+
+
+def zones_version(camera_id):
+    """
+    Cheap change marker of a camera's zones, polled by running detectors
+
+    Returns:
+        tuple: (zone count, last update) — changes whenever a zone is added, edited or removed
+    """
+    from django.db.models import Count, Max
+    from .models import CameraZone
+
+    summary = CameraZone.objects.filter(camera_id=camera_id).aggregate(count=Count('id'), updated=Max('updated_at'))
+    return summary['count'], summary['updated']
@@ -0,0 +1,117 @@
+"""
+Modèles de fond adaptatifs pour la détection de mouvement
+Au lieu de comparer chaque frame à la précédente (ce qui rate les mouvements
+lents et réagit au bruit d'éclairage), on compare la frame à un modèle de fond
+appris progressivement. Le taux d'apprentissage est exprimé en secondes
+d'historique et converti en taux par frame selon le FPS réel.
+"""
+import cv2
+import numpy as np
+
+MOTION_ENGINES = (
+    ('frame_diff', 'Différence de frames'),
+    ('running_average', 'Moyenne glissante'),
+    ('mog2', 'MOG2 (mélange de gaussiennes)'),
+    ('knn', 'KNN (plus proches voisins)'),
+)
+
+
+def learning_rate(history_seconds, fps, frames_seen):
+    """
+    Taux d'apprentissage par frame pour un historique donné en secondes
+
+    Pendant le démarrage (moins de frames vues que l'historique), on utilise la
+    moyenne cumulée 1/n pour que le fond converge dès les premières frames.
+
+    Args:
+        history_seconds (float): Durée après laquelle un changement fait partie du fond
+        fps (float): Frames analysées par seconde
+        frames_seen (int): Frames déjà intégrées au modèle
+
+    Returns:
+        float: Taux entre 0 et 1
+    """
+    history_frames = max(history_seconds * max(fps, 1e-3), 1.0)
+    return min(1.0, max(1.0 / history_frames, 1.0 / max(frames_seen, 1)))
+
+
+class RunningAverageBackground:
+    """Fond = moyenne glissante exponentielle (cv2.accumulateWeighted)"""
+
+    warmup_frames = 2  # Frames avant que le masque soit exploitable
+
+    def __init__(self, threshold=25):
+        self.threshold = threshold
+        self.frames_seen = 0
+        self._average = None
+        self._background = None
+
+    def apply(self, gray, rate, dst):
+        """
+        Met à jour le fond et écrit le masque de premier plan dans dst
+
+        Args:
+            gray (numpy.ndarray): Frame en niveaux de gris (floutée)
+            rate (float): Taux d'apprentissage
+            dst (numpy.ndarray): Masque binaire uint8 de même taille
+
+        Returns:
+            numpy.ndarray: dst
+        """
+        if self._average is None or self._average.shape != gray.shape:
+            self._average = gray.astype(np.float32)
+            self._background = np.empty_like(gray)
+            self.frames_seen = 0
+
+        # Comparaison avec le fond avant de l'y intégrer
+        cv2.convertScaleAbs(self._average, dst=self._background)
+        cv2.absdiff(self._background, gray, dst=dst)
+        cv2.threshold(dst, self.threshold, 255, cv2.THRESH_BINARY, dst=dst)
+
+        cv2.accumulateWeighted(gray, self._average, rate)
+        self.frames_seen += 1
+        return dst
+
+
+class SubtractorBackground:
+    """Fond MOG2 ou KNN (cv2.BackgroundSubtractor), ombres ignorées"""
+
+    def __init__(self, engine='mog2', threshold=25):
+        # KNN a besoin de quelques échantillons par pixel avant de classer le fond
+        self.warmup_frames = 5 if engine == 'knn' else 2
+        if engine == 'knn':
+            self._subtractor = cv2.createBackgroundSubtractorKNN(
+                dist2Threshold=float(threshold * threshold), detectShadows=True
+            )
+        else:
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(
+                varThreshold=float(threshold), detectShadows=True
+            )
+        self.frames_seen = 0
+
+    def apply(self, gray, rate, dst):
+        """Même contrat que RunningAverageBackground.apply"""
+        self._subtractor.apply(gray, dst, rate)
+        # Les ombres (valeur 127) ne sont pas du mouvement
+        cv2.threshold(dst, 200, 255, cv2.THRESH_BINARY, dst=dst)
+        self.frames_seen += 1
+        return dst
+
+
+def create_background_model(engine, threshold=25):
+    """
+    Crée le modèle de fond d'un moteur
+
+    Args:
+        engine (str): 'running_average', 'mog2' ou 'knn'
+        threshold (int): Seuil de mouvement des paramètres caméra
+
+    Returns:
+        Modèle avec apply(gray, rate, dst), frames_seen et warmup_frames,
+        ou None pour 'frame_diff'
+    """
+    if engine == 'running_average':
+        return RunningAverageBackground(threshold)
+    if engine in ('mog2', 'knn'):
+        return SubtractorBackground(engine, threshold)
+    return None
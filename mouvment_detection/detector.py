@@ -3,9 +3,14 @@ import numpy as np
 import threading
 import time
 from datetime import datetime
-from io import BytesIO
-from PIL import Image
+from django.conf import settings as django_settings
 from django.core.files.base import ContentFile
+from detection.streaming import MJPEGBroadcaster
+from detection.image_hash import DuplicateFilter, to_hex
+from detection.zones import load_zone_mask, zones_version
+from .background import MOTION_ENGINES, create_background_model, learning_rate
+from .faces import create_face_detector
+from .event_sink import encode_jpeg, get_event_sink, image_filename
 from .models import DetectionEvent, CameraSettings
 
 
@@ -23,6 +28,34 @@ class MotionDetector:
         self.previous_frame = None
         self.lock = threading.Lock()
         
+        # Buffers réutilisés d'une frame à l'autre par detect_motion
+        self.analysis_scale = 1.0  # < 1: analyse du mouvement à résolution réduite
+        self._buffers = None
+        self._buffers_key = None
+        self._blur_kernel = (21, 21)
+        
+        # Moteur de détection: différence de frames ou modèle de fond adaptatif
+        self.motion_engine = 'frame_diff'
+        self.background_history = 10.0  # Secondes avant qu'un changement immobile rejoigne le fond
+        self.background_model = None
+        self.camera_fps = 30  # FPS supposé tant que le FPS réel n'est pas mesuré
+        
+        # Un seul thread de traitement; les clients HTTP ne font que consommer
+        # les frames publiées (encodées une seule fois en JPEG)
+        self.worker_thread = None
+        self.broadcaster = MJPEGBroadcaster()
+        
+        # Écriture différée des événements (branchée au démarrage, voir event_sink.py)
+        self.event_sink = None
+        
+        # Rechargement à chaud: la version de la configuration active (et des zones)
+        # est relue au plus toutes les settings_poll_interval secondes, entre deux frames
+        self.settings_version = None
+        self.settings_poll_interval = getattr(django_settings, 'DETECTION_SETTINGS_POLL_INTERVAL', 1.0)
+        self._next_settings_poll = 0.0
+        self._reload_requested = False
+        self.settings_reloads = 0
+        
         # Paramètres de détection
         self.motion_threshold = 25
         self.min_contour_area = 500
@@ -32,14 +65,32 @@ class MotionDetector:
         self.detection_interval = 1
         self.last_detection_time = 0
         
-        # Chargement du classificateur de visages Haar Cascade (gratuit et local)
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
+        # Zones d'intérêt / d'exclusion (CameraZone dont camera_id = nom de la configuration)
+        self.zones = None
+        
+        # Déduplication des images: une frame quasi identique à la dernière
+        # image stockée réutilise ce fichier au lieu d'en écrire un nouveau
+        self.duplicate_filter = DuplicateFilter(
+            threshold=getattr(django_settings, 'SECURITY_SNAPSHOT_HASH_THRESHOLD', 5)  # -1: jamais de doublon
+        )
+        self.last_image_name = None
+        
+        # Détecteur de visages (YuNet ou Haar, voir faces.py), créé au premier usage.
+        # Il ne tourne que sur les frames avec mouvement ou toutes les N frames,
+        # sur une image réduite; entre deux passages on réutilise les derniers visages
+        self.face_detector = None
+        self.face_detection_every = 5
+        self.face_detection_scale = 0.5
+        self.last_faces = []
+        self._frames_since_faces = None
+        self.face_detection_runs = 0
         
         # Statistiques
         self.motion_detected = False
         self.faces_detected = 0
         self.last_motion_intensity = 0.0
+        self.frames_processed = 0
+        self.processing_fps = 0.0
         
     def initialize_camera(self):
         """Initialise la connexion à la caméra"""
@@ -64,92 +115,229 @@ class MotionDetector:
             self.camera.release()
             self.camera = None
     
+    def settings_signature(self):
+        """Version de la configuration active et de ses zones (deux requêtes légères)"""
+        version = CameraSettings.active_version()
+        return version, zones_version(version[2]) if version else None
+    
     def load_settings(self):
         """Charge les paramètres depuis la base de données"""
         try:
+            signature = self.settings_signature()
             settings = CameraSettings.objects.filter(is_active=True).first()
+            self.settings_version = signature
             if settings:
                 self.camera_index = settings.camera_index
                 self.enable_motion_detection = settings.enable_motion_detection
                 self.enable_face_detection = settings.enable_face_detection
+                self.face_detection_every = settings.face_detection_every
+                self.face_detection_scale = settings.face_detection_scale
+                if self.face_detector is not None:
+                    self.face_detector.scale = settings.face_detection_scale
                 self.motion_threshold = settings.motion_threshold
                 self.min_contour_area = settings.min_contour_area
+                self.analysis_scale = settings.analysis_scale
+                # Valeurs écrites hors formulaire (admin, shell): moteur inconnu -> frame_diff
+                motion_engine = settings.motion_engine if settings.motion_engine in dict(MOTION_ENGINES) else 'frame_diff'
+                background_history = settings.background_history if settings.background_history > 0 else 10.0
+                if (motion_engine, background_history) != (self.motion_engine, self.background_history):
+                    self.background_model = None  # Réapprendre le fond avec les nouveaux paramètres
+                self.motion_engine = motion_engine
+                self.background_history = background_history
                 self.save_images = settings.save_images
                 self.detection_interval = settings.detection_interval
+                self.zones = load_zone_mask(settings.name)
         except Exception as e:
             print(f"Erreur lors du chargement des paramètres: {e}")
     
+    def request_settings_reload(self):
+        """
+        Demande le rechargement des paramètres: appliqué par le thread de
+        traitement avant la prochaine frame, ou immédiatement s'il est arrêté
+        """
+        if self.is_running:
+            self._reload_requested = True
+        else:
+            self.load_settings()
+    
+    def reload_settings_if_changed(self):
+        """
+        Recharge les paramètres si leur version a changé (appelé entre deux frames
+        par le thread de traitement, les changements s'appliquent donc en bloc)
+        Retourne: True si les paramètres ont été rechargés
+        """
+        now = time.monotonic()
+        if not self._reload_requested and now < self._next_settings_poll:
+            return False
+        self._next_settings_poll = now + self.settings_poll_interval
+        self._reload_requested = False
+        
+        try:
+            if self.settings_signature() == self.settings_version:
+                return False
+        except Exception as e:
+            print(f"Erreur lors de la lecture de la version des paramètres: {e}")
+            return False
+        
+        camera_index = self.camera_index
+        self.load_settings()
+        self.settings_reloads += 1
+        print(f"🔄 Paramètres rechargés (version {self.settings_version[0][1] if self.settings_version[0] else '-'})")
+        
+        # Changement de caméra: on rouvre la capture, le flux HTTP continue
+        if self.camera is not None and self.camera_index != camera_index:
+            self.release_camera()
+            self.initialize_camera()
+        return True
+    
+    def _ensure_motion_buffers(self, frame):
+        """
+        (Ré)alloue les buffers de l'analyse de mouvement si la taille de la
+        frame ou la résolution d'analyse change; sinon ils sont réutilisés
+        """
+        height, width = frame.shape[:2]
+        scale = self.analysis_scale if 0 < self.analysis_scale < 1 else 1.0
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        key = (height, width, size)
+        
+        if self._buffers_key != key:
+            shape = (size[1], size[0])
+            self._buffers = {
+                'small': np.empty(shape + frame.shape[2:], dtype=np.uint8) if scale != 1.0 else None,
+                'gray': np.empty(shape, dtype=np.uint8),
+                'blur': np.empty(shape, dtype=np.uint8),
+                'delta': np.empty(shape, dtype=np.uint8),
+                'thresh': np.empty(shape, dtype=np.uint8),
+                'dilated': np.empty(shape, dtype=np.uint8),
+            }
+            self._buffers_key = key
+            self.previous_frame = None
+            self.background_model = None
+            kernel = max(3, int(21 * scale) | 1)
+            self._blur_kernel = (kernel, kernel)
+        return scale
+    
+    def _prepare_motion_frame(self, frame):
+        """Réduction (optionnelle), niveaux de gris et flou dans les buffers préalloués"""
+        buffers = self._buffers
+        source = frame
+        if buffers['small'] is not None:
+            size = (buffers['small'].shape[1], buffers['small'].shape[0])
+            source = cv2.resize(frame, size, dst=buffers['small'], interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(source, cv2.COLOR_BGR2GRAY, dst=buffers['gray'])
+        cv2.GaussianBlur(buffers['gray'], self._blur_kernel, 0, dst=buffers['blur'])
+        return buffers['blur']
+    
     def detect_motion(self, frame):
         """
         Détecte le mouvement dans la frame actuelle
+        Tous les calculs se font dans des buffers préalloués (aucune allocation
+        par frame), éventuellement à une résolution réduite (analysis_scale)
         Retourne: (motion_detected, motion_intensity, processed_frame)
         """
-        if self.previous_frame is None:
-            self.previous_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            self.previous_frame = cv2.GaussianBlur(self.previous_frame, (21, 21), 0)
+        scale = self._ensure_motion_buffers(frame)
+        buffers = self._buffers
+        blur = self._prepare_motion_frame(frame)
+        
+        if self.motion_engine != 'frame_diff':
+            # Comparaison avec le modèle de fond adaptatif
+            if self.background_model is None:
+                self.background_model = create_background_model(self.motion_engine, self.motion_threshold)
+            rate = learning_rate(self.background_history, self.processing_fps or self.camera_fps,
+                                 self.background_model.frames_seen + 1)
+            self.background_model.apply(blur, rate, dst=buffers['thresh'])
+            if self.background_model.frames_seen < self.background_model.warmup_frames:
+                return False, 0.0, frame
+        elif self.previous_frame is None:
+            # Le buffer de flou devient la référence, on en prend un neuf
+            self.previous_frame, buffers['blur'] = blur, np.empty_like(blur)
             return False, 0.0, frame
+        else:
+            # Différence avec la frame précédente et seuillage
+            cv2.absdiff(self.previous_frame, blur, dst=buffers['delta'])
+            cv2.threshold(buffers['delta'], self.motion_threshold, 255, cv2.THRESH_BINARY, dst=buffers['thresh'])
+            
+            # Mise à jour de la frame précédente: échange des buffers, pas de copie
+            self.previous_frame, buffers['blur'] = blur, self.previous_frame
         
-        # Conversion en niveaux de gris et flou
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        # Masque précalculé: le mouvement hors des zones surveillées est ignoré
+        if self.zones is not None:
+            cv2.bitwise_and(buffers['thresh'], self.zones.mask(buffers['thresh'].shape), dst=buffers['thresh'])
         
-        # Calcul de la différence entre les frames
-        frame_delta = cv2.absdiff(self.previous_frame, gray)
-        thresh = cv2.threshold(frame_delta, self.motion_threshold, 255, cv2.THRESH_BINARY)[1]
+        # Surface minimale exprimée à la résolution d'analyse
+        area_scale = scale * scale
+        min_area = self.min_contour_area * area_scale
+        
+        # Sortie rapide: trop peu de pixels changés pour former un contour valide
+        if cv2.countNonZero(buffers['thresh']) < min_area:
+            return False, 0.0, frame
         
         # Dilatation pour combler les trous
-        thresh = cv2.dilate(thresh, None, iterations=2)
+        cv2.dilate(buffers['thresh'], None, dst=buffers['dilated'], iterations=2)
         
-        # Détection des contours
-        contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Détection des contours (findContours ne modifie plus l'image source)
+        contours, _ = cv2.findContours(buffers['dilated'], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
         motion_detected = False
-        motion_intensity = 0.0
-        
         for contour in contours:
-            if cv2.contourArea(contour) < self.min_contour_area:
+            if cv2.contourArea(contour) < min_area:
                 continue
             
             motion_detected = True
-            motion_intensity += cv2.contourArea(contour)
             
-            # Dessiner un rectangle autour de la zone de mouvement
+            # Dessiner un rectangle autour de la zone de mouvement (coordonnées pleine résolution)
             (x, y, w, h) = cv2.boundingRect(contour)
+            x, y, w, h = int(x / scale), int(y / scale), int(w / scale), int(h / scale)
             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
         
-        # Normaliser l'intensité du mouvement
-        motion_intensity = min(motion_intensity / 100000, 1.0)
+        if not motion_detected:
+            return False, 0.0, frame
         
-        # Mise à jour de la frame précédente
-        self.previous_frame = gray
+        # Intensité: pixels en mouvement (ramenés à la pleine résolution), normalisée
+        motion_intensity = min(cv2.countNonZero(buffers['dilated']) / area_scale / 100000, 1.0)
         
         return motion_detected, motion_intensity, frame
     
-    def detect_faces(self, frame):
+    def get_face_detector(self):
+        """Retourne le détecteur de visages configuré (créé au premier appel)"""
+        if self.face_detector is None:
+            self.face_detector = create_face_detector(scale=self.face_detection_scale)
+        return self.face_detector
+    
+    def should_detect_faces(self, motion_detected):
+        """
+        Indique si le détecteur de visages doit tourner sur la frame courante
+        (à appeler une fois par frame): toujours s'il y a du mouvement, sinon
+        une frame sur face_detection_every
+        """
+        due = self._frames_since_faces is None or motion_detected or \
+            self._frames_since_faces + 1 >= self.face_detection_every
+        self._frames_since_faces = 0 if due else self._frames_since_faces + 1
+        return due
+    
+    def detect_faces(self, frame, source=None):
         """
         Détecte les visages dans la frame actuelle
+        source: image analysée si différente de la frame annotée (ex: frame sans annotations)
         Retourne: (faces_count, processed_frame)
         """
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Détection des visages
-        faces = self.face_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(30, 30),
-            flags=cv2.CASCADE_SCALE_IMAGE
-        )
-        
-        # Dessiner des rectangles autour des visages détectés
+        self.last_faces = self.get_face_detector().detect(frame if source is None else source)
+        self.face_detection_runs += 1
+        return len(self.last_faces), self.draw_faces(frame, self.last_faces)
+    
+    def draw_faces(self, frame, faces):
+        """Dessine des rectangles autour des visages détectés"""
         for (x, y, w, h) in faces:
             cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
             cv2.putText(frame, 'Visage', (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 0), 2)
-        
-        return len(faces), frame
+        return frame
     
     def save_detection_event(self, detection_type, faces_count=0, motion_intensity=0.0, frame=None):
-        """Enregistre un événement de détection dans la base de données"""
+        """
+        Enregistre un événement de détection dans la base de données
+        Avec un event_sink (détection démarrée), l'événement est mis en file et
+        écrit en différé; sinon il est sauvegardé immédiatement
+        """
         try:
             event = DetectionEvent(
                 detection_type=detection_type,
@@ -160,18 +348,26 @@ class MotionDetector:
             
             # Sauvegarder l'image si activé
             if self.save_images and frame is not None:
-                # Convertir la frame OpenCV en image PIL
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(frame_rgb)
+                is_duplicate, image_hash = self.duplicate_filter.is_duplicate('motion', frame)
+                event.image_hash = to_hex(image_hash)
                 
-                # Sauvegarder dans un buffer
-                buffer = BytesIO()
-                pil_image.save(buffer, format='JPEG')
-                buffer.seek(0)
+                if self.event_sink is not None:
+                    # Encodage JPEG et écriture faits par le thread du sink;
+                    # le hash ne devient la référence que si l'événement est accepté
+                    if self.event_sink.submit(event, frame, reuse_previous_image=is_duplicate) and not is_duplicate:
+                        self.duplicate_filter.commit('motion', image_hash)
+                    return event
                 
-                # Créer le nom de fichier
-                filename = f"detection_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-                event.image.save(filename, ContentFile(buffer.read()), save=False)
+                if is_duplicate and self.last_image_name:
+                    # Même scène que la dernière image: on réutilise son fichier
+                    event.image.name = self.last_image_name
+                else:
+                    self.attach_image(event, frame)
+                    self.duplicate_filter.commit('motion', image_hash)
+            
+            if self.event_sink is not None:
+                self.event_sink.submit(event)
+                return event
             
             event.save()
             return event
@@ -179,6 +375,11 @@ class MotionDetector:
             print(f"Erreur lors de la sauvegarde de l'événement: {e}")
             return None
     
+    def attach_image(self, event, frame):
+        """Encode la frame en JPEG et l'attache à l'événement (sans sauvegarder l'événement)"""
+        event.image.save(image_filename(), ContentFile(encode_jpeg(frame)), save=False)
+        self.last_image_name = event.image.name
+    
     def process_frame(self):
         """Traite une frame et effectue les détections"""
         if self.camera is None or not self.camera.isOpened():
@@ -201,7 +402,11 @@ class MotionDetector:
         
         # Détection de visages
         if self.enable_face_detection:
-            faces_count, frame = self.detect_faces(frame)
+            if self.should_detect_faces(motion_detected):
+                faces_count, frame = self.detect_faces(frame, source=original_frame)
+            else:
+                # Scène inchangée: on réutilise les visages du dernier passage
+                faces_count, frame = len(self.last_faces), self.draw_faces(frame, self.last_faces)
             self.faces_detected = faces_count
         
         # Ajouter les informations sur la frame
@@ -245,33 +450,84 @@ class MotionDetector:
         with self.lock:
             return self.frame
     
-    def generate_frames(self):
-        """Générateur de frames pour le streaming vidéo"""
+    def run(self):
+        """Boucle du thread de traitement: lit la caméra, détecte et publie les frames"""
+        last_frame_time = None
+        
         while self.is_running:
-            frame = self.process_frame()
-            if frame is not None:
-                # Encoder la frame en JPEG
-                ret, buffer = cv2.imencode('.jpg', frame)
-                if ret:
-                    frame_bytes = buffer.tobytes()
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            time.sleep(0.03)  # ~30 FPS
+            try:
+                self.reload_settings_if_changed()
+                frame = self.process_frame()
+            except Exception as e:
+                # Une frame en erreur ne doit pas arrêter le thread de traitement
+                print(f"Erreur lors du traitement de la frame: {e}")
+                self.background_model = None
+                frame = None
+            if frame is None:
+                time.sleep(0.1)  # Caméra indisponible ou lecture échouée
+                continue
+            
+            self.broadcaster.publish(frame)
+            
+            # FPS de traitement (moyenne mobile exponentielle)
+            now = time.perf_counter()
+            self.frames_processed += 1
+            if last_frame_time is not None:
+                instant_fps = 1.0 / max(now - last_frame_time, 1e-6)
+                self.processing_fps = 0.9 * self.processing_fps + 0.1 * instant_fps if self.processing_fps else instant_fps
+            last_frame_time = now
+        
+        self.processing_fps = 0.0
+    
+    def generate_frames(self):
+        """Générateur de frames pour le streaming vidéo (consomme les frames publiées)"""
+        for frame_bytes in self.broadcaster.stream(lambda: self.is_running):
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+    
+    def get_stats(self):
+        """Statistiques du flux pour detection_status"""
+        return {
+            'viewers': self.broadcaster.viewers,
+            'frames_processed': self.frames_processed,
+            'processing_fps': round(self.processing_fps, 1),
+            'face_detector': self.face_detector.name if self.face_detector is not None else None,
+            'face_detection_runs': self.face_detection_runs,
+            'event_sink': self.event_sink.get_stats() if self.event_sink is not None else None,
+            'settings_version': self.settings_version[0][1] if self.settings_version and self.settings_version[0] else None,
+            'settings_reloads': self.settings_reloads,
+        }
     
     def start(self):
         """Démarre la détection"""
-        if not self.is_running:
+        with self.lock:
+            if self.is_running:
+                return False
             self.load_settings()
-            if self.initialize_camera():
-                self.is_running = True
-                return True
-        return False
+            if not self.initialize_camera():
+                return False
+            self.is_running = True
+            if getattr(django_settings, 'DETECTION_EVENT_SINK_ENABLED', True):
+                self.event_sink = get_event_sink()
+            self.worker_thread = threading.Thread(target=self.run, name='motion-detector', daemon=True)
+            self.worker_thread.start()
+            return True
     
     def stop(self):
         """Arrête la détection"""
         self.is_running = False
+        if self.worker_thread is not None:
+            self.worker_thread.join(timeout=2)
+            self.worker_thread = None
+        self.broadcaster.close()
         self.release_camera()
+        if self.event_sink is not None:
+            self.event_sink.flush()
+            self.event_sink = None
         self.previous_frame = None
+        self.background_model = None
+        self.last_faces = []
+        self._frames_since_faces = None
 
 
 # Instance globale du détecteur
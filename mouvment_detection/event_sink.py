@@ -0,0 +1,240 @@
+"""
+Persistance groupée des DetectionEvent
+La boucle de capture ne fait que mettre les événements en file: un thread
+d'écriture encode les images en JPEG (cv2.imencode), les écrit dans le
+stockage puis insère les lignes avec bulk_create dans de petites transactions,
+dès que batch_size événements sont en attente ou après flush_interval secondes.
+"""
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from datetime import datetime
+from threading import Thread, Lock
+import atexit
+import cv2
+import queue
+import time
+
+
+def encode_jpeg(frame, quality=90):
+    """
+    Encode une frame BGR en JPEG
+
+    Returns:
+        bytes: Image JPEG
+    """
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ret:
+        raise ValueError("Échec de l'encodage JPEG")
+    return buffer.tobytes()
+
+
+def image_filename():
+    """Nom de fichier d'une image de détection (horodatage à la milliseconde)"""
+    return f"detection_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}.jpg"
+
+
+class DetectionEventSink:
+    """
+    File d'événements vidée par un thread d'écriture (images + bulk_create)
+    """
+
+    def __init__(self, flush_interval=1.0, batch_size=20, max_queue=256, jpeg_quality=90):
+        """
+        Args:
+            flush_interval (float): Attente maximale d'un événement avant écriture (secondes)
+            batch_size (int): Événements insérés par transaction au maximum
+            max_queue (int): Événements en attente avant que les nouveaux soient abandonnés
+            jpeg_quality (int): Qualité JPEG des images
+        """
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, int(batch_size))
+        self.jpeg_quality = int(jpeg_quality)
+
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._thread = None
+        self._thread_lock = Lock()
+        self._last_image_name = None  # Dernière image écrite, réutilisée par les doublons
+
+        # Statistiques
+        self.events_written = 0
+        self.events_dropped = 0
+        self.images_written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.last_flush_ms = 0.0
+
+    def submit(self, event, frame=None, reuse_previous_image=False):
+        """
+        Met un événement en file (ne bloque jamais)
+
+        Args:
+            event (DetectionEvent): Événement non sauvegardé
+            frame (numpy.ndarray): Image à attacher (ne doit plus être modifiée)
+            reuse_previous_image (bool): Frame identique à la précédente image:
+                l'événement pointe vers ce fichier au lieu d'en écrire un nouveau
+
+        Returns:
+            bool: False si la file était pleine et l'événement abandonné
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((event, frame, reuse_previous_image))
+            return True
+        except queue.Full:
+            self.events_dropped += 1
+            return False
+
+    def flush(self, timeout=5.0):
+        """
+        Attend que tous les événements en file soient écrits
+
+        Returns:
+            bool: True si la file a été vidée
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_writer(self):
+        """Démarre le thread d'écriture au premier usage"""
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='detection-event-sink', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Boucle d'écriture: regroupe les événements pendant flush_interval puis les écrit"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                close_old_connections()
+                self._write(batch)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Échec de l'écriture de {len(batch)} événement(s): {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        """
+        Écrit les images d'un lot puis insère ses lignes en une transaction
+        Si l'insertion groupée échoue, chaque événement est réessayé seul; les
+        images écrites pour des événements finalement perdus sont supprimées
+        """
+        from .models import DetectionEvent
+
+        start = time.perf_counter()
+        events = []
+        written_images = []
+        for event, frame, reuse_previous_image in batch:
+            if reuse_previous_image and self._last_image_name:
+                event.image.name = self._last_image_name
+            elif frame is not None:
+                try:
+                    event.image.save(image_filename(), ContentFile(encode_jpeg(frame, self.jpeg_quality)), save=False)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ Échec de l'écriture de l'image: {e}")
+                else:
+                    self._last_image_name = event.image.name
+                    written_images.append(event.image.name)
+                    self.images_written += 1
+            events.append(event)
+
+        try:
+            with transaction.atomic():
+                DetectionEvent.objects.bulk_create(events)
+            saved = events
+        except Exception as e:
+            print(f"⚠️ Insertion groupée de {len(events)} événement(s) échouée, insertion une par une: {e}")
+            saved = self._save_one_by_one(events)
+
+        # Images qu'aucun événement enregistré ne référence
+        referenced = {event.image.name for event in saved if event.image}
+        for name in written_images:
+            if name not in referenced:
+                self._delete_image(name)
+
+        self.events_written += len(saved)
+        self.flushes += 1
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    def _save_one_by_one(self, events):
+        """Insère chaque événement dans sa propre transaction; retourne ceux enregistrés"""
+        saved = []
+        for event in events:
+            event.pk = None
+            try:
+                with transaction.atomic():
+                    event.save(force_insert=True)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ Échec de l'enregistrement de l'événement: {e}")
+            else:
+                saved.append(event)
+        return saved
+
+    def _delete_image(self, name):
+        """Supprime une image orpheline (l'événement n'a pas pu être enregistré)"""
+        from .models import DetectionEvent
+
+        try:
+            DetectionEvent._meta.get_field('image').storage.delete(name)
+        except Exception as e:
+            print(f"❌ Échec de la suppression de l'image {name}: {e}")
+        if self._last_image_name == name:
+            self._last_image_name = None
+
+    def get_stats(self):
+        """Statistiques d'écriture pour detection_status"""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'events_written': self.events_written,
+            'events_dropped': self.events_dropped,
+            'images_written': self.images_written,
+            'flushes': self.flushes,
+            'errors': self.errors,
+            'last_flush_ms': round(self.last_flush_ms, 1),
+        }
+
+
+# Instance globale
+_event_sink = None
+_event_sink_lock = Lock()
+
+
+def get_event_sink():
+    """
+    Retourne (ou crée) le DetectionEventSink partagé
+
+    Returns:
+        DetectionEventSink: File d'écriture des événements
+    """
+    global _event_sink
+    if _event_sink is None:
+        with _event_sink_lock:
+            if _event_sink is None:
+                _event_sink = DetectionEventSink(
+                    flush_interval=getattr(settings, 'DETECTION_EVENT_FLUSH_INTERVAL', 1.0),
+                    batch_size=getattr(settings, 'DETECTION_EVENT_BATCH_SIZE', 20),
+                    max_queue=getattr(settings, 'DETECTION_EVENT_QUEUE_SIZE', 256),
+                )
+                atexit.register(_event_sink.flush)
+    return _event_sink
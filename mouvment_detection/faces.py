@@ -0,0 +1,137 @@
+"""
+Détecteurs de visages interchangeables
+- yunet: réseau OpenCV DNN (cv2.FaceDetectorYN) chargé depuis un fichier ONNX,
+  nettement plus rapide et plus précis que Haar sur CPU
+- haar: classificateur Haar Cascade fourni avec OpenCV (repli sans modèle)
+Les deux travaillent sur une image réduite (scale) et renvoient des boîtes
+(x, y, w, h) dans les coordonnées de la frame d'origine.
+"""
+from django.conf import settings
+from pathlib import Path
+import cv2
+
+FACE_BACKENDS = ('yunet', 'haar')
+
+
+class FaceDetector:
+    """Base commune: réduction de l'image et remise à l'échelle des boîtes"""
+
+    name = None
+
+    def __init__(self, scale=1.0):
+        """
+        Args:
+            scale (float): Facteur de réduction de l'image analysée (1 = pleine résolution)
+        """
+        self.scale = scale
+
+    def detect(self, frame):
+        """
+        Détecte les visages d'une frame BGR
+
+        Returns:
+            list: Boîtes (x, y, w, h) en pixels de la frame d'origine
+        """
+        scale = self.scale if 0 < self.scale < 1 else 1.0
+        image = frame
+        if scale != 1.0:
+            image = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return [
+            (int(x / scale), int(y / scale), int(w / scale), int(h / scale))
+            for x, y, w, h in self._detect(image)
+        ]
+
+    def _detect(self, image):
+        raise NotImplementedError
+
+
+class HaarFaceDetector(FaceDetector):
+    """Haar Cascade frontal (detectMultiScale)"""
+
+    name = 'haar'
+
+    def __init__(self, scale=1.0):
+        super().__init__(scale)
+        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+
+    def _detect(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Taille minimale de 30 px exprimée à la résolution d'analyse
+        min_size = max(10, int(30 * (self.scale if 0 < self.scale < 1 else 1.0)))
+        return self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(min_size, min_size),
+            flags=cv2.CASCADE_SCALE_IMAGE
+        )
+
+
+class YuNetFaceDetector(FaceDetector):
+    """Détecteur DNN YuNet (cv2.FaceDetectorYN)"""
+
+    name = 'yunet'
+
+    def __init__(self, model_path, scale=1.0, score_threshold=0.8, nms_threshold=0.3, top_k=50):
+        """
+        Args:
+            model_path (str): Fichier ONNX YuNet (ex: face_detection_yunet_2023mar.onnx)
+            scale (float): Facteur de réduction de l'image analysée
+            score_threshold (float): Score minimal d'un visage
+            nms_threshold (float): Seuil IoU de suppression des doublons
+            top_k (int): Nombre maximal de candidats avant NMS
+        """
+        super().__init__(scale)
+        self.model = cv2.FaceDetectorYN.create(
+            str(model_path), '', (320, 320), score_threshold, nms_threshold, top_k
+        )
+        self._input_size = None
+
+    def _detect(self, image):
+        height, width = image.shape[:2]
+        if self._input_size != (width, height):
+            self.model.setInputSize((width, height))
+            self._input_size = (width, height)
+        _, faces = self.model.detect(image)
+        if faces is None:
+            return []
+        return [tuple(face[:4]) for face in faces]
+
+
+def create_face_detector(backend=None, model_path=None, scale=1.0):
+    """
+    Crée le détecteur de visages configuré
+
+    YuNet se replie sur Haar si le modèle est absent ou si OpenCV ne fournit
+    pas cv2.FaceDetectorYN.
+
+    Args:
+        backend (str): 'yunet' ou 'haar' (défaut: settings.FACE_DETECTOR_BACKEND)
+        model_path (str): Modèle YuNet (défaut: settings.FACE_DETECTOR_MODEL)
+        scale (float): Facteur de réduction de l'image analysée
+
+    Returns:
+        FaceDetector: Détecteur prêt à l'emploi
+    """
+    backend = backend or getattr(settings, 'FACE_DETECTOR_BACKEND', 'yunet')
+    if backend == 'yunet':
+        model_path = Path(model_path or getattr(
+            settings, 'FACE_DETECTOR_MODEL', settings.BASE_DIR / 'models' / 'face_detection_yunet_2023mar.onnx'
+        ))
+        if not model_path.is_file():
+            print(f"⚠️ Modèle YuNet introuvable ({model_path}), repli sur Haar Cascade")
+        elif not hasattr(cv2, 'FaceDetectorYN'):
+            print("⚠️ cv2.FaceDetectorYN indisponible (OpenCV >= 4.5.4 requis), repli sur Haar Cascade")
+        else:
+            try:
+                return YuNetFaceDetector(
+                    model_path,
+                    scale=scale,
+                    score_threshold=getattr(settings, 'FACE_DETECTOR_SCORE_THRESHOLD', 0.8),
+                )
+            except cv2.error as e:
+                print(f"⚠️ Impossible de charger YuNet ({e}), repli sur Haar Cascade")
+    elif backend != 'haar':
+        print(f"⚠️ Détecteur de visages inconnu '{backend}', utilisation de Haar Cascade")
+    return HaarFaceDetector(scale=scale)
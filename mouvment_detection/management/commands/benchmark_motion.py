@@ -0,0 +1,131 @@
+"""
+Django management command comparing motion detection implementations
+Frames are decoded once; only the motion analysis is timed:
+    - legacy: per-frame allocations, thresh.copy(), contour-area loop
+    - buffered: MotionDetector.detect_motion (preallocated buffers, countNonZero)
+      at full resolution and at each --scale
+    - each --engine (background model) at the first scale
+Usage:
+    python manage.py benchmark_motion
+    python manage.py benchmark_motion --video media/demo.mp4 --frames 300 --scale 0.5 --scale 0.25
+    python manage.py benchmark_motion --engine running_average --engine mog2 --engine knn
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from mouvment_detection.detector import MotionDetector
+from mouvment_detection.background import MOTION_ENGINES
+import cv2
+import time
+
+
+def legacy_detect_motion(state, frame, motion_threshold=25, min_contour_area=500):
+    """Pre-optimization implementation (copy of the old MotionDetector.detect_motion)"""
+    if state.get('previous') is None:
+        state['previous'] = cv2.GaussianBlur(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (21, 21), 0)
+        return False, 0.0, frame
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    gray = cv2.GaussianBlur(gray, (21, 21), 0)
+    frame_delta = cv2.absdiff(state['previous'], gray)
+    thresh = cv2.threshold(frame_delta, motion_threshold, 255, cv2.THRESH_BINARY)[1]
+    thresh = cv2.dilate(thresh, None, iterations=2)
+    contours, _ = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    motion_detected = False
+    motion_intensity = 0.0
+    for contour in contours:
+        if cv2.contourArea(contour) < min_contour_area:
+            continue
+        motion_detected = True
+        motion_intensity += cv2.contourArea(contour)
+        (x, y, w, h) = cv2.boundingRect(contour)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+    state['previous'] = gray
+    return motion_detected, min(motion_intensity / 100000, 1.0), frame
+
+
+class Command(BaseCommand):
+    help = 'Benchmark legacy vs buffered motion detection (frames per second)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--video',
+            type=str,
+            default=str(settings.BASE_DIR / 'media' / 'demo.mp4'),
+            help='Video file to read frames from'
+        )
+        parser.add_argument(
+            '--frames',
+            type=int,
+            default=300,
+            help='Number of frames to analyse'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Timing repetitions (best one is kept)'
+        )
+        parser.add_argument(
+            '--scale',
+            type=float,
+            action='append',
+            help='Additional analysis scale(s) for the buffered implementation (default: 0.5)'
+        )
+        parser.add_argument(
+            '--engine',
+            choices=[engine for engine, _ in MOTION_ENGINES],
+            action='append',
+            help='Background engine(s) to benchmark at the first --scale'
+        )
+
+    def handle(self, *args, **options):
+        capture = cv2.VideoCapture(options['video'])
+        if not capture.isOpened():
+            raise CommandError(f"Could not open video: {options['video']}")
+
+        frames = []
+        while len(frames) < options['frames']:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+        capture.release()
+
+        if len(frames) < 2:
+            raise CommandError('Not enough frames could be read')
+
+        height, width = frames[0].shape[:2]
+        self.stdout.write(f"🎞️ {len(frames)} frame(s) of {width}x{height}")
+
+        def run_legacy():
+            state = {}
+            return sum(legacy_detect_motion(state, frame.copy())[0] for frame in frames)
+
+        def buffered(scale, engine='frame_diff'):
+            def run():
+                detector = MotionDetector()
+                detector.analysis_scale = scale
+                detector.motion_engine = engine
+                return sum(detector.detect_motion(frame.copy())[0] for frame in frames)
+            return run
+
+        variants = [('legacy', run_legacy), ('buffered', buffered(1.0))]
+        scales = options['scale'] or [0.5]
+        variants += [(f'buffered @ {scale:g}x', buffered(scale)) for scale in scales]
+        variants += [(f'{engine} @ {scales[0]:g}x', buffered(scales[0], engine)) for engine in options['engine'] or []]
+
+        fps = {}
+        for label, run in variants:
+            best = float('inf')
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                motion_frames = run()
+                best = min(best, time.perf_counter() - start)
+            fps[label] = len(frames) / best
+            self.stdout.write(f"   {label:<26} {fps[label]:8.1f} frames/s   ({motion_frames} frame(s) with motion)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ buffered: {fps['buffered'] / fps['legacy']:.2f}x, best: {max(fps.values()) / fps['legacy']:.2f}x vs legacy"
+        ))
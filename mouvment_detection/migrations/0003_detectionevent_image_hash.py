@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mouvment_detection', '0002_rename_detection_d_timesta_bff5ba_idx_mouvment_de_timesta_e45e91_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectionevent',
+            name='image_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=16, verbose_name='Empreinte perceptuelle (dHash)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mouvment_detection', '0003_detectionevent_image_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='camerasettings',
+            name='analysis_scale',
+            field=models.FloatField(default=1.0, verbose_name="Échelle d'analyse du mouvement (1 = pleine résolution)"),
+        ),
+    ]
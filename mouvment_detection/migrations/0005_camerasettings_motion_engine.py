@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mouvment_detection', '0004_camerasettings_analysis_scale'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='camerasettings',
+            name='background_history',
+            field=models.FloatField(default=10.0, verbose_name='Historique du fond (secondes)'),
+        ),
+        migrations.AddField(
+            model_name='camerasettings',
+            name='motion_engine',
+            field=models.CharField(choices=[('frame_diff', 'Différence de frames'), ('running_average', 'Moyenne glissante'), ('mog2', 'MOG2 (mélange de gaussiennes)'), ('knn', 'KNN (plus proches voisins)')], default='frame_diff', max_length=20, verbose_name='Moteur de détection de mouvement'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mouvment_detection', '0005_camerasettings_motion_engine'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='camerasettings',
+            name='face_detection_every',
+            field=models.IntegerField(default=5, verbose_name='Détection de visages toutes les N frames (sans mouvement)'),
+        ),
+        migrations.AddField(
+            model_name='camerasettings',
+            name='face_detection_scale',
+            field=models.FloatField(default=0.5, verbose_name="Échelle d'analyse des visages"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mouvment_detection', '0006_camerasettings_face_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='camerasettings',
+            name='version',
+            field=models.PositiveIntegerField(default=0, verbose_name='Version (incrémentée à chaque sauvegarde)'),
+        ),
+    ]
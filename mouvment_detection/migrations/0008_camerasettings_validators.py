@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:47
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mouvment_detection', '0007_camerasettings_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='camerasettings',
+            name='analysis_scale',
+            field=models.FloatField(default=1.0, validators=[django.core.validators.MinValueValidator(0.05), django.core.validators.MaxValueValidator(1.0)], verbose_name="Échelle d'analyse du mouvement (1 = pleine résolution)"),
+        ),
+        migrations.AlterField(
+            model_name='camerasettings',
+            name='background_history',
+            field=models.FloatField(default=10.0, validators=[django.core.validators.MinValueValidator(0.1)], verbose_name='Historique du fond (secondes)'),
+        ),
+        migrations.AlterField(
+            model_name='camerasettings',
+            name='face_detection_scale',
+            field=models.FloatField(default=0.5, validators=[django.core.validators.MinValueValidator(0.05), django.core.validators.MaxValueValidator(1.0)], verbose_name="Échelle d'analyse des visages"),
+        ),
+    ]
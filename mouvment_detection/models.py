@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.conf import settings
+from .background import MOTION_ENGINES
 
 
 class DetectionEvent(models.Model):
@@ -30,6 +33,12 @@ class DetectionEvent(models.Model):
         blank=True,
         verbose_name='Image capturée'
     )
+    image_hash = models.CharField(
+        max_length=16,
+        blank=True,
+        db_index=True,
+        verbose_name='Empreinte perceptuelle (dHash)'
+    )
     confidence = models.FloatField(
         default=0.0,
         verbose_name='Niveau de confiance'
@@ -97,6 +106,15 @@ class CameraSettings(models.Model):
         default=True,
         verbose_name='Activer détection de visages'
     )
+    face_detection_every = models.IntegerField(
+        default=5,
+        verbose_name='Détection de visages toutes les N frames (sans mouvement)'
+    )
+    face_detection_scale = models.FloatField(
+        default=0.5,
+        validators=[MinValueValidator(0.05), MaxValueValidator(1.0)],
+        verbose_name="Échelle d'analyse des visages"
+    )
     motion_threshold = models.IntegerField(
         default=25,
         verbose_name='Seuil de mouvement'
@@ -105,6 +123,22 @@ class CameraSettings(models.Model):
         default=500,
         verbose_name='Surface minimale du contour'
     )
+    motion_engine = models.CharField(
+        max_length=20,
+        choices=MOTION_ENGINES,
+        default='frame_diff',
+        verbose_name='Moteur de détection de mouvement'
+    )
+    background_history = models.FloatField(
+        default=10.0,
+        validators=[MinValueValidator(0.1)],
+        verbose_name="Historique du fond (secondes)"
+    )
+    analysis_scale = models.FloatField(
+        default=1.0,
+        validators=[MinValueValidator(0.05), MaxValueValidator(1.0)],
+        verbose_name="Échelle d'analyse du mouvement (1 = pleine résolution)"
+    )
     save_images = models.BooleanField(
         default=True,
         verbose_name='Sauvegarder les images'
@@ -125,6 +159,10 @@ class CameraSettings(models.Model):
         auto_now=True,
         verbose_name='Date de modification'
     )
+    version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Version (incrémentée à chaque sauvegarde)'
+    )
 
     class Meta:
         verbose_name = 'Paramètre de caméra'
@@ -132,3 +170,33 @@ class CameraSettings(models.Model):
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        """
+        Chaque sauvegarde incrémente la version: les détecteurs en cours la surveillent et rechargent
+        L'incrément est fait en SQL (F), deux sauvegardes simultanées donnent deux versions distinctes
+        """
+        if self._state.adding:
+            self.version = 1
+            super().save(*args, **kwargs)
+            return
+
+        # La colonne version n'est jamais écrite depuis la valeur Python (possiblement périmée)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = [f.name for f in self._meta.concrete_fields if not f.primary_key]
+        kwargs['update_fields'] = [name for name in update_fields if name != 'version']
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            CameraSettings.objects.filter(pk=self.pk).update(version=F('version') + 1)
+        self.refresh_from_db(fields=['version'])
+
+    @classmethod
+    def active_version(cls):
+        """
+        Signature légère de la configuration active, interrogée périodiquement
+        par les détecteurs (une requête sur quelques colonnes)
+        Retourne: (pk, version, name) ou None
+        """
+        return cls.objects.filter(is_active=True).values_list('pk', 'version', 'name').first()
@@ -1,7 +1,8 @@
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client
 from django.urls import reverse
 from .models import DetectionEvent, CameraSettings
 from datetime import datetime
+from unittest import mock
 
 
 class DetectionModelsTestCase(TestCase):
@@ -86,6 +87,8 @@ class DetectionViewsTestCase(TestCase):
         self.assertIn('is_running', data)
         self.assertIn('motion_detected', data)
         self.assertIn('faces_detected', data)
+        self.assertIn('viewers', data)
+        self.assertIn('processing_fps', data)
     
     def test_events_api(self):
         """Test de l'API des événements"""
@@ -116,6 +119,19 @@ class DetectionViewsTestCase(TestCase):
         
         data = response.json()
         self.assertEqual(data['status'], 'success')
+    
+    def test_settings_view_rejects_invalid_values(self):
+        """Test qu'un moteur inconnu ou une échelle hors bornes n'est pas enregistré"""
+        url = reverse('mouvment_detection:settings')
+        for field, value in (('motion_engine', 'bogus'), ('analysis_scale', '0'),
+                             ('background_history', '-5'), ('motion_threshold', 'abc')):
+            response = self.client.post(url, {'name': 'Invalid', field: value})
+            self.assertEqual(response.status_code, 400, field)
+        self.assertFalse(CameraSettings.objects.filter(name='Invalid').exists())
+        
+        response = self.client.post(url, {'name': 'Valid', 'motion_engine': 'mog2', 'analysis_scale': '0.5'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(CameraSettings.objects.get(name='Valid').motion_engine, 'mog2')
 
 
 class DetectionDetectorTestCase(TestCase):
@@ -127,7 +143,7 @@ class DetectionDetectorTestCase(TestCase):
         
         detector = MotionDetector(camera_index=0)
         self.assertEqual(detector.camera_index, 0)
-        self.assertIsNotNone(detector.face_cascade)
+        self.assertIsNotNone(detector.get_face_detector())
         self.assertTrue(detector.enable_motion_detection)
         self.assertTrue(detector.enable_face_detection)
     
@@ -152,3 +168,278 @@ class DetectionDetectorTestCase(TestCase):
         self.assertFalse(detector.enable_motion_detection)
         self.assertTrue(detector.enable_face_detection)
         self.assertEqual(detector.motion_threshold, 30)
+    
+    def test_generate_frames_only_consumes_published_frames(self):
+        """Test que le flux HTTP ne lit pas la caméra et partage l'encodage JPEG"""
+        import numpy as np
+        from unittest import mock
+        from .detector import MotionDetector
+        
+        detector = MotionDetector()
+        detector.is_running = True
+        detector.broadcaster.publish(np.zeros((48, 64, 3), dtype=np.uint8))
+        
+        with mock.patch.object(detector, 'process_frame') as process_frame:
+            viewer_1 = detector.generate_frames()
+            viewer_2 = detector.generate_frames()
+            chunk_1, chunk_2 = next(viewer_1), next(viewer_2)
+        
+        process_frame.assert_not_called()
+        self.assertTrue(chunk_1.startswith(b'--frame\r\nContent-Type: image/jpeg'))
+        self.assertEqual(chunk_1, chunk_2)
+        self.assertEqual(detector.broadcaster.frames_encoded, 1)
+        self.assertEqual(detector.get_stats()['viewers'], 2)
+        
+        detector.stop()
+        self.assertEqual(list(viewer_1), [])
+    
+    def test_duplicate_frames_reuse_stored_image(self):
+        """Test qu'une frame quasi identique réutilise l'image déjà stockée"""
+        import tempfile
+        import numpy as np
+        from django.test import override_settings
+        from .detector import MotionDetector
+        
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        frame[20:100, 30:90] = 200
+        other = np.ascontiguousarray(frame[:, ::-1])
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            detector = MotionDetector()
+            first = detector.save_detection_event('motion', frame=frame)
+            second = detector.save_detection_event('motion', frame=frame.copy())
+            third = detector.save_detection_event('motion', frame=other)
+            
+            self.assertEqual(second.image.name, first.image.name)
+            self.assertNotEqual(third.image.name, first.image.name)
+            self.assertEqual(len(second.image_hash), 16)
+    
+    def test_motion_detection_reuses_buffers(self):
+        """Test que la détection de mouvement réutilise ses buffers, y compris à résolution réduite"""
+        import numpy as np
+        from .detector import MotionDetector
+        
+        still = np.full((240, 320, 3), 60, dtype=np.uint8)
+        moved = still.copy()
+        moved[80:180, 100:200] = 220
+        
+        for scale in (1.0, 0.5):
+            detector = MotionDetector()
+            detector.analysis_scale = scale
+            
+            self.assertEqual(detector.detect_motion(still.copy())[:2], (False, 0.0))
+            self.assertEqual(detector.detect_motion(still.copy())[:2], (False, 0.0))
+            buffers = {name: id(buffer) for name, buffer in detector._buffers.items() if name != 'blur'}
+            
+            motion_detected, intensity, _ = detector.detect_motion(moved.copy())
+            self.assertTrue(motion_detected)
+            self.assertGreater(intensity, 0.1)
+            self.assertEqual({name: id(buffer) for name, buffer in detector._buffers.items() if name != 'blur'}, buffers)
+    
+    def test_background_engines(self):
+        """Test que chaque moteur de fond ignore une scène immobile et détecte un objet qui apparaît"""
+        import numpy as np
+        from .background import learning_rate
+        from .detector import MotionDetector
+        
+        rng = np.random.default_rng(0)
+        scene = rng.integers(40, 200, (120, 160, 3), dtype=np.uint8)
+        moved = scene.copy()
+        moved[30:90, 50:110] = 255
+        
+        for engine in ('running_average', 'mog2', 'knn'):
+            detector = MotionDetector()
+            detector.motion_engine = engine
+            
+            still = [detector.detect_motion(scene.copy())[0] for _ in range(15)]
+            self.assertFalse(any(still), engine)
+            self.assertTrue(detector.detect_motion(moved.copy())[0], engine)
+        
+        # Moteur inconnu en base: repli sur la différence de frames
+        CameraSettings.objects.create(name='Bogus', motion_engine='bogus', background_history=0, is_active=True)
+        detector = MotionDetector()
+        detector.load_settings()
+        self.assertEqual((detector.motion_engine, detector.background_history), ('frame_diff', 10.0))
+        
+        # Historique de 10 s à 20 FPS: 1/200 une fois le démarrage passé
+        self.assertAlmostEqual(learning_rate(10, 20, 1000), 1 / 200)
+        self.assertEqual(learning_rate(10, 20, 1), 1.0)
+    
+    def test_face_detection_schedule_and_scaling(self):
+        """Test que les visages sont cherchés sur mouvement ou toutes les N frames, boîtes remises à l'échelle"""
+        import numpy as np
+        from .detector import MotionDetector
+        from .faces import FaceDetector, create_face_detector
+        
+        class FixedFaces(FaceDetector):
+            name = 'fixed'
+            
+            def _detect(self, image):
+                self.size = image.shape[:2]
+                return [(10, 20, 30, 40)]
+        
+        detector = MotionDetector()
+        detector.face_detection_every = 3
+        schedule = [detector.should_detect_faces(motion) for motion in
+                    (False, False, False, False, True, False, False, False)]
+        self.assertEqual(schedule, [True, False, False, True, True, False, False, True])
+        
+        detector.face_detector = FixedFaces(scale=0.5)
+        count, _ = detector.detect_faces(np.zeros((240, 320, 3), dtype=np.uint8))
+        self.assertEqual(count, 1)
+        self.assertEqual(detector.face_detector.size, (120, 160))
+        self.assertEqual(detector.last_faces, [(20, 40, 60, 80)])
+        
+        # Modèle YuNet absent: repli sur Haar
+        self.assertEqual(create_face_detector('yunet', model_path='/nonexistent.onnx').name, 'haar')
+
+    
+    def test_update_settings_reactivates_inactive_default(self):
+        """Test qu'une configuration 'Default' inactive est réactivée au lieu d'être recréée"""
+        from django.test import RequestFactory
+        from .detector import MotionDetector
+        from . import views
+        
+        CameraSettings.objects.create(name='Default', is_active=False)
+        request = RequestFactory().post('/update', {'enable_motion': 'true', 'enable_face': 'false'})
+        with mock.patch.object(views, 'detector', MotionDetector()):
+            response = views.update_settings(request)
+        
+        self.assertEqual(response.status_code, 200)
+        settings = CameraSettings.objects.get()
+        self.assertTrue(settings.is_active)
+        self.assertFalse(settings.enable_face_detection)
+    
+    def test_run_survives_frame_errors(self):
+        """Test qu'une exception pendant une frame n'arrête pas le thread de traitement"""
+        import numpy as np
+        from .detector import MotionDetector
+        
+        detector = MotionDetector()
+        frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        calls = []
+        
+        def process_frame():
+            calls.append(1)
+            if len(calls) == 1:
+                raise AttributeError('boom')
+            detector.is_running = False
+            return frame
+        
+        detector.is_running = True
+        with mock.patch.object(detector, 'process_frame', side_effect=process_frame), \
+                mock.patch.object(detector, 'reload_settings_if_changed'), \
+                mock.patch.object(detector.broadcaster, 'publish') as publish:
+            detector.run()
+        
+        self.assertEqual(len(calls), 2)
+        publish.assert_called_once_with(frame)
+    
+    def test_settings_hot_reload(self):
+        """Test que le détecteur recharge les paramètres quand leur version change"""
+        from django.test import RequestFactory
+        from .detector import MotionDetector
+        from . import views
+        
+        camera_settings = CameraSettings.objects.create(name='Live', motion_threshold=25, is_active=True)
+        self.assertEqual(camera_settings.version, 1)
+        
+        detector = MotionDetector()
+        detector.load_settings()
+        detector.is_running = True  # Simule le thread de traitement
+        self.assertFalse(detector.reload_settings_if_changed())
+        
+        # Modification faite par un autre processus: visible au prochain sondage
+        camera_settings.motion_threshold = 40
+        camera_settings.save()
+        self.assertFalse(detector.reload_settings_if_changed())  # Intervalle de sondage pas écoulé
+        detector._next_settings_poll = 0.0
+        self.assertTrue(detector.reload_settings_if_changed())
+        self.assertEqual(detector.motion_threshold, 40)
+        self.assertEqual(detector.settings_reloads, 1)
+        self.assertEqual(camera_settings.version, 2)
+        
+        # update_settings persiste la modification (nouvelle version)
+        request = RequestFactory().post('/update', {'enable_motion': 'true', 'enable_face': 'false'})
+        with mock.patch.object(views, 'detector', detector):
+            views.update_settings(request)
+        camera_settings.refresh_from_db()
+        self.assertFalse(camera_settings.enable_face_detection)
+        self.assertEqual(camera_settings.version, 3)
+        self.assertTrue(detector.reload_settings_if_changed())
+        self.assertFalse(detector.enable_face_detection)
+        detector.is_running = False
+        
+        # Sauvegarde depuis une instance périmée: la version est incrémentée en SQL, pas réécrite
+        stale = CameraSettings.objects.get(pk=camera_settings.pk)
+        camera_settings.save()
+        stale.save()
+        self.assertEqual(camera_settings.version, 4)
+        self.assertEqual(stale.version, 5)
+
+
+class DetectionEventSinkTestCase(TransactionTestCase):
+    """Tests pour l'écriture groupée des événements"""
+    
+    def test_events_are_batched_and_images_written_off_thread(self):
+        """Test que les événements en file sont insérés par lots avec leurs images"""
+        import tempfile
+        import numpy as np
+        from django.test import override_settings
+        from .detector import MotionDetector
+        from .event_sink import DetectionEventSink
+        
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        frame[20:100, 30:90] = 200
+        other = np.ascontiguousarray(frame[:, ::-1])
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            detector = MotionDetector()
+            detector.event_sink = DetectionEventSink(flush_interval=0.05, batch_size=10)
+            detector.save_detection_event('motion', frame=frame)
+            detector.save_detection_event('motion', frame=frame.copy())
+            detector.save_detection_event('face', faces_count=1, frame=other)
+            detector.save_detection_event('motion', motion_intensity=0.5)
+            
+            self.assertTrue(detector.event_sink.flush())
+            events = list(DetectionEvent.objects.order_by('id'))
+            self.assertEqual(len(events), 4)
+            self.assertEqual(events[1].image.name, events[0].image.name)
+            self.assertNotEqual(events[2].image.name, events[0].image.name)
+            self.assertFalse(events[3].image)
+            
+            stats = detector.event_sink.get_stats()
+            self.assertEqual((stats['events_written'], stats['images_written']), (4, 2))
+            self.assertLess(stats['flushes'], 4)
+    
+    def test_failed_batch_falls_back_to_rows_and_removes_orphan_images(self):
+        """Test qu'un lot refusé est réinséré ligne par ligne et que les images orphelines sont supprimées"""
+        import os
+        import tempfile
+        import numpy as np
+        from django.test import override_settings
+        from .event_sink import DetectionEventSink
+        
+        frame = np.zeros((40, 40, 3), dtype=np.uint8)
+        save = DetectionEvent.save
+        
+        def failing_save(event, *args, **kwargs):
+            if event.faces_count == 99:
+                raise ValueError('rejected row')
+            return save(event, *args, **kwargs)
+        
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            sink = DetectionEventSink()
+            batch = [
+                (DetectionEvent(detection_type='motion'), frame, False),
+                (DetectionEvent(detection_type='face', faces_count=99), frame.copy(), False),
+            ]
+            with mock.patch.object(DetectionEvent.objects, 'bulk_create', side_effect=RuntimeError('db down')), \
+                    mock.patch.object(DetectionEvent, 'save', autospec=True, side_effect=failing_save):
+                sink._write(batch)
+            
+            kept = DetectionEvent.objects.get()
+            self.assertEqual(kept.detection_type, 'motion')
+            self.assertTrue(os.path.exists(kept.image.path))
+            self.assertFalse(os.path.exists(os.path.join(media_root, batch[1][0].image.name)))
+            self.assertEqual((sink.events_written, sink.errors), (1, 1))
@@ -3,8 +3,10 @@ from django.http import StreamingHttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.paginator import Paginator
+from django.core.exceptions import ValidationError
 from .detector import detector
 from .models import DetectionEvent, CameraSettings
+from .background import MOTION_ENGINES
 
 
 def index(request):
@@ -85,6 +87,7 @@ def detection_status(request):
             'motion_intensity': detector.last_motion_intensity,
             'enable_motion_detection': detector.enable_motion_detection,
             'enable_face_detection': detector.enable_face_detection,
+            **detector.get_stats(),
         })
     except Exception as e:
         return JsonResponse({
@@ -96,19 +99,37 @@ def detection_status(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def update_settings(request):
-    """Met à jour les paramètres de détection en temps réel"""
+    """
+    Met à jour les paramètres de détection en temps réel
+    Les changements sont enregistrés dans la configuration active (nouvelle
+    version), donc appliqués par tous les processus sans redémarrage
+    """
     try:
         enable_motion = request.POST.get('enable_motion', 'true').lower() == 'true'
         enable_face = request.POST.get('enable_face', 'true').lower() == 'true'
         
+        settings = CameraSettings.objects.filter(is_active=True).first()
+        if settings is None:
+            # Une configuration 'Default' inactive est réactivée plutôt que dupliquée (nom unique)
+            settings, _ = CameraSettings.objects.get_or_create(
+                name='Default', defaults={'camera_index': detector.camera_index}
+            )
+            settings.is_active = True
+        settings.enable_motion_detection = enable_motion
+        settings.enable_face_detection = enable_face
+        settings.save()
+        
+        # Ce processus applique tout de suite; les autres au prochain sondage
         detector.enable_motion_detection = enable_motion
         detector.enable_face_detection = enable_face
+        detector.request_settings_reload()
         
         return JsonResponse({
             'status': 'success',
             'message': 'Paramètres mis à jour',
             'enable_motion_detection': detector.enable_motion_detection,
             'enable_face_detection': detector.enable_face_detection,
+            'settings_version': settings.version,
         })
     except Exception as e:
         return JsonResponse({
@@ -199,38 +220,46 @@ def statistics(request):
     return render(request, 'mouvment_detection/statistics.html', context)
 
 
+def _settings_from_post(post):
+    """Valeurs de CameraSettings lues dans le formulaire (ValueError si un nombre est invalide)"""
+    return {
+        'camera_index': int(post.get('camera_index', 0)),
+        'enable_motion_detection': post.get('enable_motion', 'on') == 'on',
+        'enable_face_detection': post.get('enable_face', 'on') == 'on',
+        'motion_threshold': int(post.get('motion_threshold', 25)),
+        'min_contour_area': int(post.get('min_contour_area', 500)),
+        'analysis_scale': float(post.get('analysis_scale', 1.0)),
+        'motion_engine': post.get('motion_engine', 'frame_diff'),
+        'background_history': float(post.get('background_history', 10.0)),
+        'face_detection_every': int(post.get('face_detection_every', 5)),
+        'face_detection_scale': float(post.get('face_detection_scale', 0.5)),
+        'save_images': post.get('save_images', 'on') == 'on',
+        'detection_interval': int(post.get('detection_interval', 1)),
+    }
+
+
 def settings_view(request):
     """Page de configuration"""
+    errors = []
     if request.method == 'POST':
         # Sauvegarder ou mettre à jour les paramètres
         name = request.POST.get('name', 'Default')
+        settings = CameraSettings.objects.filter(name=name).first() or CameraSettings(name=name, is_active=True)
         
-        settings, created = CameraSettings.objects.get_or_create(
-            name=name,
-            defaults={
-                'camera_index': int(request.POST.get('camera_index', 0)),
-                'enable_motion_detection': request.POST.get('enable_motion', 'on') == 'on',
-                'enable_face_detection': request.POST.get('enable_face', 'on') == 'on',
-                'motion_threshold': int(request.POST.get('motion_threshold', 25)),
-                'min_contour_area': int(request.POST.get('min_contour_area', 500)),
-                'save_images': request.POST.get('save_images', 'on') == 'on',
-                'detection_interval': int(request.POST.get('detection_interval', 1)),
-                'is_active': True,
-            }
-        )
-        
-        if not created:
-            settings.camera_index = int(request.POST.get('camera_index', 0))
-            settings.enable_motion_detection = request.POST.get('enable_motion', 'on') == 'on'
-            settings.enable_face_detection = request.POST.get('enable_face', 'on') == 'on'
-            settings.motion_threshold = int(request.POST.get('motion_threshold', 25))
-            settings.min_contour_area = int(request.POST.get('min_contour_area', 500))
-            settings.save_images = request.POST.get('save_images', 'on') == 'on'
-            settings.detection_interval = int(request.POST.get('detection_interval', 1))
+        try:
+            for field, value in _settings_from_post(request.POST).items():
+                setattr(settings, field, value)
+            # choices (moteur) et bornes (échelles, historique) du modèle
+            settings.full_clean()
+        except ValueError:
+            errors.append('Valeur numérique invalide')
+        except ValidationError as e:
+            errors.extend(f'{field}: {" ".join(field_errors)}' for field, field_errors in e.message_dict.items())
+        else:
             settings.save()
-        
-        # Recharger les paramètres dans le détecteur
-        detector.load_settings()
+            # Le détecteur (de ce processus et des autres) voit la nouvelle version
+            # et recharge entre deux frames
+            detector.request_settings_reload()
     
     # Récupérer les paramètres actuels
     current_settings = CameraSettings.objects.filter(is_active=True).first()
@@ -238,5 +267,8 @@ def settings_view(request):
     context = {
         'title': 'Paramètres',
         'settings': current_settings,
+        'errors': errors,
+        'motion_engines': MOTION_ENGINES,
+        'analysis_scales': [(1.0, 'Full (100%)'), (0.75, '75%'), (0.5, 'Half (50%)'), (0.25, 'Quarter (25%)')],
     }
-    return render(request, 'mouvment_detection/settings.html', context)
+    return render(request, 'mouvment_detection/settings.html', context, status=400 if errors else 200)
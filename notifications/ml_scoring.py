@@ -3,6 +3,7 @@ ML-based Notification Scoring and Priority System
 Uses XGBoost for intelligent alert prioritization
 """
 from django.utils import timezone
+from django.db.models import Avg
 from datetime import timedelta
 import logging
 import pickle
@@ -37,9 +38,17 @@ class NotificationScorer:
         'user_history': 0.10,       # Historique utilisateur
     }
     
-    # Objets à haut risque
-    HIGH_RISK_OBJECTS = ['gun', 'weapon', 'knife', 'fire', 'person_unknown']
-    MEDIUM_RISK_OBJECTS = ['person', 'scissors', 'broken_glass', 'crowbar']
+    # Points de risque par niveau (analytics.risk_taxonomy)
+    OBJECT_RISK_POINTS = {
+        'high_risk': 25,
+        'suspicious': 15,
+        'monitored': 5,
+        'normal': 5,
+    }
+    # Classes qui ne suivent pas les points de leur niveau
+    OBJECT_CLASS_POINTS = {
+        'person': 15,
+    }
     
     def __init__(self):
         self.model = None
@@ -113,9 +122,8 @@ class NotificationScorer:
         
         # 5. Score de confiance (0-10 points)
         if detection:
-            detection_data = detection.get_detection_data()
-            if detection_data:
-                avg_confidence = sum(obj.get('confidence', 0) for obj in detection_data) / len(detection_data)
+            avg_confidence = self._average_confidence(detection)
+            if avg_confidence is not None:
                 scores['confidence'] = int(avg_confidence * 10)
             else:
                 scores['confidence'] = 5
@@ -187,11 +195,8 @@ class NotificationScorer:
         # Features de détection
         if detection:
             features['objects_count'] = detection.objects_detected
-            detection_data = detection.get_detection_data()
-            if detection_data:
-                features['avg_confidence'] = sum(obj.get('confidence', 0) for obj in detection_data) / len(detection_data)
-            else:
-                features['avg_confidence'] = 0.5
+            avg_confidence = self._average_confidence(detection)
+            features['avg_confidence'] = avg_confidence if avg_confidence is not None else 0.5
         else:
             features['objects_count'] = 0
             features['avg_confidence'] = 0.5
@@ -215,23 +220,20 @@ class NotificationScorer:
             else:
                 return 10
         
-        detection_data = detection.get_detection_data()
-        if not detection_data:
+        object_classes = detection.detected_objects.values_list('object_class', flat=True).distinct()
+        if not object_classes:
             return 10
         
-        max_risk = 0
+        from analytics.risk_taxonomy import classify, normalize
         
-        for obj in detection_data:
-            obj_class = obj.get('class', '').lower()
-            
-            if any(risk_obj in obj_class for risk_obj in self.HIGH_RISK_OBJECTS):
-                max_risk = max(max_risk, 25)
-            elif any(risk_obj in obj_class for risk_obj in self.MEDIUM_RISK_OBJECTS):
-                max_risk = max(max_risk, 15)
-            else:
-                max_risk = max(max_risk, 5)
-        
-        return max_risk
+        return max(
+            self.OBJECT_CLASS_POINTS.get(normalize(obj_class)) or self.OBJECT_RISK_POINTS[classify(obj_class)]
+            for obj_class in object_classes
+        )
+    
+    def _average_confidence(self, detection):
+        """Confiance moyenne des objets de la détection (None si aucun objet)"""
+        return detection.detected_objects.aggregate(avg=Avg('confidence'))['avg']
     
     def _calculate_frequency_score(self, alert):
         """Score basé sur la fréquence de détections similaires"""
@@ -344,16 +346,15 @@ class FalseAlertFilter:
         # 1. Vérifier si objet commun pendant heures normales
         if detection:
             hour = detection.uploaded_at.hour
-            detection_data = detection.get_detection_data()
+            object_classes = detection.detected_objects.values_list('object_class', flat=True)
             
-            if detection_data:
-                for obj in detection_data:
-                    obj_class = obj.get('class', '').lower()
-                    
-                    if obj_class in self.false_positive_patterns['frequent_objects']:
-                        if hour in self.false_positive_patterns['normal_hours']:
-                            false_positive_score += 30
-                            reasons.append(f"Common object ({obj_class}) during normal hours")
+            for obj_class in object_classes:
+                obj_class = obj_class.lower()
+                
+                if obj_class in self.false_positive_patterns['frequent_objects']:
+                    if hour in self.false_positive_patterns['normal_hours']:
+                        false_positive_score += 30
+                        reasons.append(f"Common object ({obj_class}) during normal hours")
         
         # 2. Vérifier si l'utilisateur a déjà marqué des alertes similaires comme fausses
         if user_history:
@@ -367,9 +368,8 @@ class FalseAlertFilter:
         
         # 4. Confiance de détection faible
         if detection:
-            detection_data = detection.get_detection_data()
-            if detection_data:
-                avg_confidence = sum(obj.get('confidence', 0) for obj in detection_data) / len(detection_data)
+            avg_confidence = detection.detected_objects.aggregate(avg=Avg('confidence'))['avg']
+            if avg_confidence is not None:
                 if avg_confidence < 0.5:
                     false_positive_score += 25
                     reasons.append(f"Low detection confidence ({avg_confidence:.2f})")
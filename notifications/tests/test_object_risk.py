@@ -0,0 +1,44 @@
+"""
+Tests for the object risk points of NotificationScorer
+"""
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from detection.models import DetectionResult
+import json
+
+User = get_user_model()
+
+
+class ObjectRiskScoreTests(TestCase):
+    """Points de risque objet de NotificationScorer (taxonomie analytics.risk_taxonomy)"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='scoreuser', password='test123')
+    
+    def create_detection(self, classes, confidence=0.9):
+        return DetectionResult.objects.create(
+            user=self.user,
+            original_image='detections/original/score.jpg',
+            objects_detected=len(classes),
+            detection_data=json.dumps([{'class': obj, 'confidence': confidence} for obj in classes]),
+        )
+    
+    def object_risk(self, *classes):
+        from notifications.ml_scoring import NotificationScorer
+        
+        return NotificationScorer()._calculate_object_risk(None, self.create_detection(classes))
+    
+    def test_points_per_class(self):
+        self.assertEqual(self.object_risk('knife', 'car'), 25)
+        self.assertEqual(self.object_risk('person'), 15)
+        self.assertEqual(self.object_risk('scissors'), 15)
+        self.assertEqual(self.object_risk('car', 'dog'), 5)
+        self.assertEqual(self.object_risk('chair'), 5)
+    
+    def test_average_confidence_reads_detected_objects(self):
+        from notifications.ml_scoring import NotificationScorer
+        
+        scorer = NotificationScorer()
+        self.assertAlmostEqual(scorer._average_confidence(self.create_detection(['car', 'dog'], 0.4)), 0.4)
+        self.assertIsNone(scorer._average_confidence(self.create_detection([])))
+        self.assertEqual(scorer._calculate_object_risk(None, self.create_detection([])), 10)